@@ -0,0 +1,54 @@
+"""Benchmark - memory per event of wire dicts versus EventColumns.
+
+Decodes a synthetic window-bucket payload into Python dicts, then packs the
+same events into the columnar container, and reports traced bytes per event and
+conversion time both ways.
+
+Usage:
+    python benchmarks/bench_columnar.py [--events 1000000]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from mcp_server_activitywatch.columnar import EventColumns
+from synthetic import synthetic_events
+
+
+def traced(fn):
+    """Run ``fn`` and return its result, the bytes it left allocated and its wall time."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return result, allocated, elapsed
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    payload = json.dumps(synthetic_events(args.events))
+
+    wire, wire_bytes, decode_s = traced(lambda: json.loads(payload))
+    columns, columnar_bytes, pack_s = traced(lambda: EventColumns.from_wire(wire))
+    _, _, unpack_s = traced(lambda: sum(1 for _ in columns))
+
+    print(f"events:            {args.events:,}")
+    print(f"wire dicts:        {wire_bytes / args.events:8.1f} B/event  (json.loads {decode_s:.2f}s)")
+    print(
+        f"EventColumns:      {columnar_bytes / args.events:8.1f} B/event  (pack {pack_s:.2f}s, lazy unpack {unpack_s:.2f}s)"
+    )
+    print(f"nbytes() estimate: {columns.nbytes() / args.events:8.1f} B/event")
+    print(f"reduction:         {wire_bytes / columnar_bytes:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Benchmark - bytes saved and CPU cost per compression codec.
+
+Generates a synthetic window-bucket event payload, serializes it the way the
+tools do, and reports compressed size and compress/decompress CPU time for every
+codec available in this environment (install the "compression" extra to include
+zstd and brotli).
+
+Usage:
+    python benchmarks/bench_compression.py [--events 100000] [--repeat 3]
+"""
+
+import argparse
+import json
+import time
+
+from mcp_server_activitywatch.compression import CODECS
+from synthetic import synthetic_events
+
+
+def measure(fn, data: bytes, repeat: int) -> tuple[bytes, float]:
+    """Run ``fn(data)`` ``repeat`` times and return the output and best CPU seconds."""
+    best = float("inf")
+    output = b""
+    for _ in range(repeat):
+        started = time.process_time()
+        output = fn(data)
+        best = min(best, time.process_time() - started)
+    return output, best
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payloads = {
+        "compact": json.dumps(synthetic_events(args.events)).encode("utf-8"),
+        "indent=2": json.dumps(synthetic_events(args.events), indent=2).encode("utf-8"),
+    }
+
+    print(f"{'payload':<10} {'codec':<6} {'raw MB':>8} {'comp MB':>8} {'saved':>7} {'comp ms':>9} {'decomp ms':>10}")
+    for payload_name, raw in payloads.items():
+        for codec in CODECS.values():
+            compressed, compress_s = measure(codec.compress, raw, args.repeat)
+            _, decompress_s = measure(codec.decompress, compressed, args.repeat)
+            saved = 1 - len(compressed) / len(raw)
+            print(
+                f"{payload_name:<10} {codec.name:<6} {len(raw) / 1e6:>8.2f} {len(compressed) / 1e6:>8.2f} "
+                f"{saved:>6.1%} {compress_s * 1000:>9.1f} {decompress_s * 1000:>10.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark - tail latency of small calls while large JSON payloads are processed.
+
+Simulates one tool call that decodes and re-encodes a large events response
+while a stream of small calls (tiny decode + encode) runs on the same event
+loop, and reports small-call latency percentiles for each JSON offload mode.
+
+Usage:
+    python benchmarks/bench_event_loop.py [--events 200000] [--small-interval-ms 2]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from mcp_server_activitywatch.jsonio import JsonCodec
+from synthetic import synthetic_events
+
+
+async def large_call(codec: JsonCodec, payload: bytes, repeat: int) -> None:
+    """Decode and pretty-print ``payload`` ``repeat`` times, like get_events does."""
+    for _ in range(repeat):
+        events = await codec.loads(payload)
+        await codec.dumps(events, size_hint=len(payload))
+
+
+async def small_calls(codec: JsonCodec, payload: bytes, interval: float, stop: asyncio.Event) -> list[float]:
+    """Issue small calls every ``interval`` seconds until ``stop`` is set and return their latencies."""
+    latencies = []
+    while not stop.is_set():
+        scheduled = time.perf_counter()
+        await asyncio.sleep(interval)
+        events = await codec.loads(payload)
+        await codec.dumps(events, size_hint=len(payload))
+        # Latency beyond the intended sleep is time spent waiting for the loop
+        latencies.append(time.perf_counter() - scheduled - interval)
+    return latencies
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``values``."""
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1] if len(values) > 1 else values[0]
+
+
+async def run_mode(mode: str, large: bytes, small: bytes, interval: float, repeat: int) -> None:
+    """Run the scenario with one offload mode and print a row."""
+    codec = JsonCodec(threshold=64 * 1024, mode=mode)
+    # Warm the pool up so worker start-up is not measured
+    await codec.loads(large)
+
+    stop = asyncio.Event()
+    small_task = asyncio.create_task(small_calls(codec, small, interval, stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await large_call(codec, large, repeat)
+    large_s = time.perf_counter() - started
+    stop.set()
+    latencies = [value * 1000 for value in await small_task]
+    codec.close()
+
+    print(
+        f"{mode:<8} {large_s:>8.2f} {len(latencies):>7} {percentile(latencies, 50):>8.2f} "
+        f"{percentile(latencies, 95):>8.2f} {percentile(latencies, 99):>8.2f} {max(latencies):>9.2f}"
+    )
+
+
+async def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--small-interval-ms", type=float, default=2.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    large = json.dumps(synthetic_events(args.events)).encode("utf-8")
+    small = json.dumps(synthetic_events(5)).encode("utf-8")
+    print(f"large payload: {len(large) / 1e6:.1f} MB x {args.repeat}, small calls every {args.small_interval_ms} ms")
+    print(f"{'mode':<8} {'large s':>8} {'calls':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>9}")
+    for mode in ("inline", "thread", "process"):
+        await run_mode(mode, large, small, args.small_interval_ms / 1000, args.repeat)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,242 @@
+"""Benchmark - throughput, latency and upstream load under concurrent MCP clients.
+
+Starts a synthetic aw-server stand-in and the MCP server, then runs N
+simulated agents, each with its own MCP session, calling a weighted mix of
+tools and resource reads over the days of synthetic data for a fixed
+duration. Reports throughput, p50/p95/p99 latency per operation and the
+requests that reached the stand-in, so deployments can be sized and the
+effect of caching and coalescing on upstream load checked.
+
+With ``--mode http`` all agents share one server over streamable HTTP; with
+``--mode stdio`` every agent starts its own server process, as agent hosts
+do. Options after ``--`` are passed to the server, e.g. ``-- --workers 4``
+or ``-- --cache-backend sqlite``.
+
+Usage:
+    python benchmarks/bench_load.py [--agents 8] [--duration 20] [--mode http|stdio] [--events 50000]
+        [--mix list_buckets=1,get_events=3,run_query=2,read_buckets=1,read_events=3] [-- server options]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+import httpx
+from fastmcp import Client
+from fastmcp.client.transports import StdioTransport
+from standin import WINDOW_BUCKET, StandIn, free_port
+
+DEFAULT_MIX = "list_buckets=1,get_events=3,run_query=2,read_buckets=1,read_events=3"
+
+QUERY = f'events = query_bucket("{WINDOW_BUCKET}"); events = merge_events_by_keys(events, ["app"]); RETURN = sort_by_duration(events);'
+
+# Tools report failures as text rather than MCP errors.
+FAILURE_PREFIXES = ("Failed", "Query failed", "Bucket not found")
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    """Parse ``name=weight,...`` into operation weights."""
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation '{name}' (available: {', '.join(OPERATIONS)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def next_day(day: str) -> str:
+    """Return the ISO date after ``day``."""
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+
+
+async def list_buckets(client: Client, day: str) -> str:
+    """Call activitywatch-list-buckets."""
+    result = await client.call_tool("activitywatch-list-buckets", {})
+    return result.content[0].text
+
+
+async def get_events(client: Client, day: str) -> str:
+    """Fetch a day of window events with activitywatch-get-events."""
+    arguments = {"bucket_id": WINDOW_BUCKET, "start": f"{day}T00:00:00+00:00", "end": f"{next_day(day)}T00:00:00+00:00"}
+    result = await client.call_tool("activitywatch-get-events", arguments)
+    return result.content[0].text
+
+
+async def run_query(client: Client, day: str) -> str:
+    """Query a day of window events with activitywatch-run-query."""
+    arguments = {"timeperiods": [f"{day}/{next_day(day)}"], "query": [QUERY]}
+    result = await client.call_tool("activitywatch-run-query", arguments)
+    return result.content[0].text
+
+
+async def read_buckets(client: Client, day: str) -> str:
+    """Read the buckets resource."""
+    contents = await client.read_resource("activitywatch://buckets")
+    return contents[0].text
+
+
+async def read_events(client: Client, day: str) -> str:
+    """Read a day of window events from the bucket events resource."""
+    uri = f"activitywatch://events/{WINDOW_BUCKET}?start={day}T00:00:00Z&end={next_day(day)}T00:00:00Z"
+    contents = await client.read_resource(uri)
+    return contents[0].text
+
+
+OPERATIONS = {
+    "list_buckets": list_buckets,
+    "get_events": get_events,
+    "run_query": run_query,
+    "read_buckets": read_buckets,
+    "read_events": read_events,
+}
+
+
+async def agent(
+    client: Client,
+    weights: dict[str, float],
+    days: list[str],
+    deadline: float,
+    think: float,
+    seed: int,
+    latencies: dict[str, list[float]],
+    errors: dict[str, int],
+) -> None:
+    """Call random operations on random days until ``deadline``, recording latencies and failures."""
+    rng = random.Random(seed)
+    names, shares = list(weights), list(weights.values())
+    while time.monotonic() < deadline:
+        name = rng.choices(names, shares)[0]
+        started = time.perf_counter()
+        try:
+            text = await OPERATIONS[name](client, rng.choice(days))
+            failed = text.startswith(FAILURE_PREFIXES)
+        except Exception:
+            failed = True
+        latencies[name].append(time.perf_counter() - started)
+        errors[name] += failed
+        if think:
+            await asyncio.sleep(rng.expovariate(1 / think))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the ``pct`` percentile of ``values``."""
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1] if len(values) > 1 else values[0]
+
+
+async def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    """Wait until the HTTP server accepts connections."""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            if process.poll() is not None:
+                raise SystemExit(f"The MCP server exited with status {process.returncode}")
+            try:
+                await client.get(f"http://127.0.0.1:{port}/")
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise SystemExit("The MCP server did not start listening in time") from None
+                await asyncio.sleep(0.1)
+
+
+async def run(args: argparse.Namespace, server_args: list[str], standin: StandIn) -> None:
+    """Start the server and the agents, then print the report."""
+    weights = parse_mix(args.mix)
+    days = standin.days()
+    command = [sys.executable, "-m", "mcp_server_activitywatch", "--api-base", standin.api_base]
+    command += ["--cache-snapshot", "off", *server_args]
+
+    process = None
+    if args.mode == "http":
+        port = free_port()
+        process = subprocess.Popen(
+            [*command, "--transport", "http", "--port", str(port)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        await wait_for_port(port, process)
+        clients = [Client(f"http://127.0.0.1:{port}/mcp", timeout=args.timeout) for _ in range(args.agents)]
+    else:
+        log_file = open(os.devnull, "w")  # noqa: SIM115
+        clients = [
+            Client(StdioTransport(command[0], command[1:], log_file=log_file), timeout=args.timeout)
+            for _ in range(args.agents)
+        ]
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    try:
+        for client in clients:
+            await client.__aenter__()
+        # Session set-up and server start-up are not part of the measurement.
+        standin.requests.clear()
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(
+                agent(client, weights, days, deadline, args.think_ms / 1000, index, latencies, errors)
+                for index, client in enumerate(clients)
+            )
+        )
+        elapsed = time.monotonic() - started
+        upstream = dict(standin.requests)
+    finally:
+        for client in clients:
+            await client.__aexit__(None, None, None)
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    calls = sum(len(values) for values in latencies.values())
+    upstream_total = sum(upstream.values())
+    print(
+        f"mode: {args.mode}, agents: {args.agents}, duration: {elapsed:.1f}s, days: {len(days)}, events: {args.events:,}"
+    )
+    print(f"server options: {' '.join(server_args) or '(defaults)'}")
+    print()
+    print(f"{'operation':<14} {'calls':>7} {'errors':>7} {'calls/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name in weights:
+        values = [value * 1000 for value in latencies.get(name, [])]
+        if not values:
+            continue
+        print(
+            f"{name:<14} {len(values):>7} {errors[name]:>7} {len(values) / elapsed:>8.1f} "
+            f"{percentile(values, 50):>8.1f} {percentile(values, 95):>8.1f} {percentile(values, 99):>8.1f}"
+        )
+    print(f"{'total':<14} {calls:>7} {sum(errors.values()):>7} {calls / elapsed:>8.1f}")
+    print()
+    print(f"upstream requests: {upstream_total} ({upstream_total / max(calls, 1):.2f} per call)")
+    for route, count in sorted(upstream.items(), key=lambda item: -item[1]):
+        print(f"  {route:<34} {count:>7}")
+
+
+def main() -> None:
+    """Parse the options, start the stand-in and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", type=int, default=8, help="Concurrent simulated agents")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run")
+    parser.add_argument("--mode", choices=["http", "stdio"], default="http")
+    parser.add_argument("--events", type=int, default=50_000, help="Synthetic events in the window bucket")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Weighted operations, e.g. 'get_events=3,run_query=1'")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Mean pause between an agent's calls")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds before a call is abandoned")
+    args, server_args = parser.parse_known_args()
+    if server_args[:1] == ["--"]:
+        server_args = server_args[1:]
+
+    standin = StandIn(args.events)
+    standin.start()
+    try:
+        asyncio.run(run(args, server_args, standin))
+    finally:
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Benchmark - peak memory of the event-returning tools, with budgets.
+
+Serves a synthetic window-bucket payload from a mock aw-server and calls
+``get_events``, ``bucket_events_resource`` and ``run_query`` on it, tracing
+the peak allocation of each call. The response bytes are copied per request,
+as a network read would allocate them, while the payload itself is built
+before tracing starts.
+
+Peaks are compared to a budget expressed as a multiple of the payload size:
+the decoded events take about four and a half times their JSON, so an extra
+full copy of the event list, or of its text, shows up as a step of one or
+more and fails the run: the script exits with status 1.
+
+Usage:
+    python benchmarks/bench_memory.py [--events 100000 1000000] [--slack 1.0]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tracemalloc
+from types import SimpleNamespace
+
+import httpx
+
+from mcp_server_activitywatch.resources.bucket_events import bucket_events_resource
+from mcp_server_activitywatch.tools.get_events import get_events
+from mcp_server_activitywatch.tools.run_query import run_query
+from synthetic import synthetic_events
+
+API_BASE = "http://localhost:5600/api/0"
+BUCKET_ID = "aw-watcher-window_bench"
+
+# Peak traced bytes allowed per payload byte.
+BUDGETS = {
+    "get_events": 8.5,
+    "bucket_events_resource": 7.0,
+    "run_query": 8.75,
+}
+
+
+def mock_server(payload: bytearray, count: int) -> httpx.MockTransport:
+    """Answer event reads and queries with a fresh copy of ``payload``."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/events/count"):
+            return httpx.Response(200, json=count)
+        if request.url.path.endswith("/query/"):
+            return httpx.Response(200, content=b"[" + bytes(payload) + b"]")
+        return httpx.Response(200, content=bytes(payload))
+
+    return httpx.MockTransport(handler)
+
+
+async def call(name: str, ctx: SimpleNamespace) -> object:
+    """Call one of the measured tools or resources on the benchmark bucket."""
+    if name == "get_events":
+        return await get_events(bucket_id=BUCKET_ID, ctx=ctx)
+    if name == "bucket_events_resource":
+        return await bucket_events_resource(bucket_id=BUCKET_ID, ctx=ctx)
+    return await run_query(
+        timeperiods=["2024-02-01/2024-03-01"],
+        query=[f'events = query_bucket("{BUCKET_ID}"); RETURN = events;'],
+        ctx=ctx,
+    )
+
+
+async def traced_peak(name: str, ctx: SimpleNamespace) -> int:
+    """Return the peak traced bytes of one call above what was allocated before it."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    result = await call(name, ctx)
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+async def measure(count: int) -> tuple[int, dict[str, int]]:
+    """Return the payload size for ``count`` events and the peak of every measured call."""
+    payload = bytearray(json.dumps(synthetic_events(count)).encode())
+    peaks = {}
+    async with httpx.AsyncClient(transport=mock_server(payload, count)) as client:
+        ctx = SimpleNamespace(lifespan_context={"api_base": API_BASE, "http_client": client})
+        for name in BUDGETS:
+            # Warm up once, so imports and lazily built state are not counted.
+            await call(name, ctx)
+            peaks[name] = await traced_peak(name, ctx)
+    return len(payload), peaks
+
+
+def main() -> None:
+    """Run the benchmark, print a table and exit with status 1 if a budget is exceeded."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--slack", type=float, default=1.0, help="Multiply every budget by this factor")
+    args = parser.parse_args()
+
+    failures = []
+    print(
+        f"{'call':<24} {'events':>10} {'payload MB':>11} {'peak MB':>9} {'B/event':>9} {'x payload':>10} {'budget':>7}"
+    )
+    for count in args.events:
+        payload_bytes, peaks = asyncio.run(measure(count))
+        for name, peak in peaks.items():
+            ratio = peak / payload_bytes
+            budget = BUDGETS[name] * args.slack
+            status = "" if ratio <= budget else "  OVER BUDGET"
+            if status:
+                failures.append(f"{name} at {count:,} events: {ratio:.2f}x payload, budget {budget:.2f}x")
+            print(
+                f"{name:<24} {count:>10,} {payload_bytes / 1e6:>11.1f} {peak / 1e6:>9.1f} "
+                f"{peak / count:>9.0f} {ratio:>10.2f} {budget:>7.2f}{status}"
+            )
+
+    if failures:
+        print("\nMemory budgets exceeded:\n  " + "\n  ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
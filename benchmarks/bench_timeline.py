@@ -0,0 +1,51 @@
+"""Benchmark - timeline binning with numpy versus the pure-Python loop.
+
+Bins a synthetic window bucket into 5-minute bins with per-app and per-category
+seconds, once with array operations and once with the per-event loop, and
+checks that both agree.
+
+Usage:
+    python benchmarks/bench_timeline.py [--events 200000] [--bin-size 300]
+"""
+
+import argparse
+import time
+
+from mcp_server_activitywatch.columnar import EventColumns
+from mcp_server_activitywatch.timeline import HAS_NUMPY, Categorizer, bin_chunks
+from synthetic import synthetic_events
+
+
+def main() -> None:
+    """Run the benchmark and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--bin-size", type=int, default=300)
+    args = parser.parse_args()
+
+    chunk = EventColumns.from_wire(synthetic_events(args.events)).sorted_by_start()
+    bin_us = args.bin_size * 1_000_000
+    origin = chunk.starts[0] - chunk.starts[0] % bin_us
+    nbins = (max(chunk.ends()) - origin) // bin_us + 1
+    categorizer = Categorizer({"Browsing": "firefox", "Coding": "code|terminal", "Project 3": "project 3"})
+
+    timings = {}
+    results = {}
+    for vectorized in [True, False] if HAS_NUMPY else [False]:
+        started = time.perf_counter()
+        results[vectorized] = bin_chunks([chunk], origin, bin_us, nbins, categorizer=categorizer, vectorized=vectorized)
+        timings[vectorized] = time.perf_counter() - started
+
+    print(f"events:  {args.events:,}")
+    print(f"bins:    {nbins:,} x {args.bin_size}s")
+    print(f"python:  {timings[False]:.3f}s")
+    if HAS_NUMPY:
+        print(f"numpy:   {timings[True]:.3f}s ({timings[False] / timings[True]:.1f}x faster)")
+        difference = max(abs(a - b) for a, b in zip(results[True].active, results[False].active, strict=True))
+        print(f"max active difference: {difference:.6f}s")
+    else:
+        print("numpy:   not installed (pip install 'activitywatch-mcp-server-py[timeline]')")
+
+
+if __name__ == "__main__":
+    main()
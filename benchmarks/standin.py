@@ -0,0 +1,169 @@
+"""Synthetic aw-server stand-in shared by the benchmarks that run the server.
+
+Serves the subset of the aw-server REST API the MCP server uses - bucket
+metadata, events by time range, event counts and queries - over synthetic
+window and AFK buckets, and counts every request it answers.
+"""
+
+import bisect
+import re
+import socket
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from synthetic import synthetic_events
+
+WINDOW_BUCKET = "aw-watcher-window_loadtest"
+AFK_BUCKET = "aw-watcher-afk_loadtest"
+
+QUERY_BUCKET = re.compile(r'query_bucket\(\s*"([^"]+)"')
+
+
+def parse_time(value: str) -> datetime:
+    """Parse an ISO timestamp, reading one without an offset as UTC."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def afk_events(window: list[dict]) -> list[dict]:
+    """Derive AFK events from window events: every tenth one is spent away."""
+    return [
+        {
+            "id": event["id"],
+            "timestamp": event["timestamp"],
+            "duration": event["duration"],
+            "data": {"status": "afk" if event["id"] % 10 == 9 else "not-afk"},
+        }
+        for event in window
+    ]
+
+
+class StandIn:
+    """aw-server stand-in over synthetic buckets, running in a thread with its own event loop."""
+
+    def __init__(self, events: int, seed: int = 42):
+        window = synthetic_events(events, seed)
+        self.first_day = datetime.fromisoformat(window[0]["timestamp"]).date()
+        self.last_day = datetime.fromisoformat(window[-1]["timestamp"]).date()
+        self.buckets = {WINDOW_BUCKET: window, AFK_BUCKET: afk_events(window)}
+        self._starts = {
+            bucket_id: [datetime.fromisoformat(event["timestamp"]) for event in bucket_events]
+            for bucket_id, bucket_events in self.buckets.items()
+        }
+        self.requests: Counter[str] = Counter()
+        self.port = free_port()
+        self._server: uvicorn.Server | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def api_base(self) -> str:
+        """Return the API base URL to point the MCP server at."""
+        return f"http://127.0.0.1:{self.port}/api/0"
+
+    def days(self) -> list[str]:
+        """Return the dates covered by the synthetic events, in ISO format."""
+        count = (self.last_day - self.first_day).days + 1
+        return [(self.first_day + timedelta(days=offset)).isoformat() for offset in range(count)]
+
+    def metadata(self) -> dict[str, dict]:
+        """Return the bucket metadata aw-server lists at /buckets."""
+        return {
+            bucket_id: {
+                "id": bucket_id,
+                "type": "currentwindow" if bucket_id == WINDOW_BUCKET else "afkstatus",
+                "client": bucket_id.split("_")[0],
+                "hostname": "loadtest",
+                "created": bucket_events[0]["timestamp"],
+                "last_updated": bucket_events[-1]["timestamp"],
+            }
+            for bucket_id, bucket_events in self.buckets.items()
+        }
+
+    def select(self, bucket_id: str, start: str | None, end: str | None) -> list[dict]:
+        """Return the events of a bucket starting in ``[start, end)``, newest first like aw-server."""
+        starts = self._starts[bucket_id]
+        low = bisect.bisect_left(starts, parse_time(start)) if start else 0
+        high = bisect.bisect_left(starts, parse_time(end)) if end else len(starts)
+        return self.buckets[bucket_id][low:high][::-1]
+
+    async def list_buckets(self, request: Request) -> JSONResponse:
+        """Answer GET /buckets."""
+        return JSONResponse(self.metadata())
+
+    async def events(self, request: Request) -> JSONResponse:
+        """Answer GET /buckets/{bucket_id}/events with the start, end and limit parameters."""
+        bucket_id = request.path_params["bucket_id"]
+        if bucket_id not in self.buckets:
+            return JSONResponse({"message": "There's no bucket named " + bucket_id}, status_code=404)
+        events = self.select(bucket_id, request.query_params.get("start"), request.query_params.get("end"))
+        limit = int(request.query_params.get("limit", "-1"))
+        return JSONResponse(events[:limit] if limit >= 0 else events)
+
+    async def count(self, request: Request) -> JSONResponse:
+        """Answer GET /buckets/{bucket_id}/events/count with the start and end parameters."""
+        bucket_id = request.path_params["bucket_id"]
+        if bucket_id not in self.buckets:
+            return JSONResponse({"message": "There's no bucket named " + bucket_id}, status_code=404)
+        return JSONResponse(
+            len(self.select(bucket_id, request.query_params.get("start"), request.query_params.get("end")))
+        )
+
+    async def query(self, request: Request) -> JSONResponse:
+        """Answer a query with the events of its first bucket in every period; the query is not evaluated."""
+        body = await request.json()
+        match = QUERY_BUCKET.search(" ".join(body["query"]))
+        bucket_id = match.group(1) if match else WINDOW_BUCKET
+        if bucket_id not in self.buckets:
+            return JSONResponse({"message": "There's no bucket named " + bucket_id}, status_code=500)
+        return JSONResponse([self.select(bucket_id, *period.split("/")) for period in body["timeperiods"]])
+
+    def app(self) -> Callable:
+        """Build the ASGI app, counting requests per route."""
+        routes = Starlette(
+            routes=[
+                Route("/api/0/buckets", self.list_buckets),
+                Route("/api/0/buckets/", self.list_buckets),
+                Route("/api/0/buckets/{bucket_id}/events", self.events),
+                Route("/api/0/buckets/{bucket_id}/events/count", self.count),
+                Route("/api/0/query/", self.query, methods=["POST"]),
+            ]
+        )
+
+        async def app(scope: dict, receive: Callable, send: Callable) -> None:
+            if scope["type"] == "http":
+                route = re.sub(r"/buckets/[^/]+", "/buckets/{id}", scope["path"].removeprefix("/api/0"))
+                self.requests[f"{scope['method']} {route}"] += 1
+            await routes(scope, receive, send)
+
+        return app
+
+    def start(self) -> None:
+        """Serve in a background thread and wait until it accepts connections."""
+        config = uvicorn.Config(self.app(), host="127.0.0.1", port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, name="aw-standin", daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        """Shut the server down."""
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join()
+
+
+def free_port() -> int:
+    """Return a TCP port on the loopback interface nothing listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
@@ -0,0 +1,25 @@
+"""Synthetic ActivityWatch data shared by the benchmarks."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+APPS = ["Firefox", "Code", "Slack", "Terminal", "Spotify", "Zoom", "Obsidian", "Thunderbird"]
+TITLES = [f"Document {i} - Project {i % 7}" for i in range(200)]
+
+
+def synthetic_events(count: int, seed: int = 42) -> list[dict]:
+    """Build ``count`` window events resembling aw-watcher-window output."""
+    rng = random.Random(seed)
+    start = datetime(2024, 2, 1, tzinfo=timezone.utc)
+    events = []
+    for i in range(count):
+        start += timedelta(seconds=rng.randint(1, 30))
+        events.append(
+            {
+                "id": i,
+                "timestamp": start.isoformat(),
+                "duration": round(rng.uniform(0.5, 120.0), 3),
+                "data": {"app": rng.choice(APPS), "title": rng.choice(TITLES)},
+            }
+        )
+    return events
@@ -1,11 +1,19 @@
 """ActivityWatch MCP Server - Main entry point."""
 
-from .server import mcp
+import os
+
+from .server import build_parser, mcp
 
 
 def main() -> None:
-    """Run the ActivityWatch MCP server."""
-    mcp.run()
+    """Run the ActivityWatch MCP server over stdio, or over streamable HTTP with ``--transport http``."""
+    args = build_parser().parse_args()
+    if (args.transport or os.getenv("AW_TRANSPORT", "stdio")) == "http":
+        from .serving import serve_http
+
+        serve_http(args)
+    else:
+        mcp.run()
 
 
 if __name__ == "__main__":
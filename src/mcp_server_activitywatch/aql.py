@@ -0,0 +1,296 @@
+"""ActivityWatch MCP Server - ActivityWatch query language (AQL) parser.
+
+A query is a sequence of assignments separated by semicolons, one of which
+must assign ``RETURN``::
+
+    events = query_bucket("aw-watcher-window_host");
+    RETURN = sort_by_duration(merge_events_by_keys(events, ["app"]));
+
+Expressions are strings in single or double quotes, numbers with an optional
+minus sign and exponent, variables, function calls, lists and dicts with
+string keys; ``#`` starts a comment. Queries are parsed locally so malformed
+ones are rejected with the line and column of the problem instead of after a
+round trip to aw-server. Parsing also produces a canonical text, with
+insignificant whitespace and comments dropped, double quotes and sorted dict
+keys, that equivalent queries share and caches use as key.
+
+aw-server accepts more than this subset, e.g. arithmetic, subscripts and
+if/else blocks. Only a missing ``RETURN``, an unterminated string, unbalanced
+brackets and a missing ``;`` between assignments are rejected outright; other
+constructs the parser does not know raise ``AQLUnsupportedError``, and such
+queries are sent to aw-server as they are, without a canonical text.
+"""
+
+import contextlib
+import functools
+import json
+import re
+from dataclasses import dataclass, field
+
+TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<space>\s+|\#[^\n]*)
+    | (?P<placeholder>\{\{\s*[A-Za-z_][A-Za-z0-9_]*\s*\}\})
+    | (?P<number>\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+    | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+    | (?P<punctuation>[;=,:()\[\]{}-])
+    | (?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+class AQLSyntaxError(ValueError):
+    """A malformed query, with the location of the problem."""
+
+    def __init__(self, message: str, query: str, offset: int):
+        self.offset = offset
+        self.line = query.count("\n", 0, offset) + 1
+        line_start = query.rfind("\n", 0, offset) + 1
+        line_end = query.find("\n", offset)
+        self.column = offset - line_start + 1
+        source = query[line_start : line_end if line_end != -1 else len(query)]
+        super().__init__(
+            f"Syntax error at line {self.line}, column {self.column}: {message}\n{source}\n{' ' * (self.column - 1)}^"
+        )
+
+
+class AQLUnsupportedError(AQLSyntaxError):
+    """A query using syntax the local parser does not know, which aw-server may still accept."""
+
+
+@dataclass(frozen=True)
+class Token:
+    """A lexical token and its offset in the query."""
+
+    kind: str
+    text: str
+    offset: int
+
+
+@dataclass
+class ParsedQuery:
+    """A syntactically valid query.
+
+    Attributes:
+        canonical: Canonical text of the query
+        variables: Assigned variable names, in order
+        buckets: Bucket IDs passed as literals to ``query_bucket``
+    """
+
+    canonical: str
+    variables: list[str] = field(default_factory=list)
+    buckets: list[str] = field(default_factory=list)
+
+
+def tokenize(query: str, placeholders: bool = False) -> list[Token]:
+    """Split a query into tokens, dropping whitespace and comments.
+
+    Characters outside the known syntax, such as operators, become ``other`` tokens.
+
+    Args:
+        query: Query text
+        placeholders: Accept ``{{ name }}`` template placeholders as values
+
+    Raises:
+        AQLSyntaxError: At an unterminated string
+    """
+    tokens = []
+    offset = 0
+    while offset < len(query):
+        match = TOKEN_PATTERN.match(query, offset)
+        if match.lastgroup == "other" and match.group() in "\"'":
+            raise AQLSyntaxError("unterminated string", query, offset)
+        if match.lastgroup == "placeholder" and not placeholders:
+            # Without placeholders, '{{' is an (invalid) dict in a dict; let the parser report it.
+            match = TOKEN_PATTERN.match(query, offset, offset + 1)
+        if match.lastgroup != "space":
+            tokens.append(Token(match.lastgroup, match.group(), offset))
+        offset = match.end()
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser producing canonical text."""
+
+    def __init__(self, query: str, placeholders: bool):
+        self.query = query
+        self.tokens = tokenize(query, placeholders)
+        self.position = 0
+        self.result = ParsedQuery("")
+
+    def peek(self) -> Token | None:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def error(self, message: str, token: Token | None = None, unsupported: bool = True) -> AQLSyntaxError:
+        """Return an error at ``token``, by default for syntax the parser does not know."""
+        token = token or self.peek()
+        offset = token.offset if token else len(self.query.rstrip())
+        found = f"'{token.text}'" if token else "end of query"
+        error_type = AQLUnsupportedError if unsupported else AQLSyntaxError
+        return error_type(f"{message}, found {found}", self.query, offset)
+
+    def expect(self, text: str, context: str) -> Token:
+        token = self.peek()
+        if token is None or token.kind != "punctuation" or token.text != text:
+            raise self.error(f"expected '{text}' {context}")
+        self.position += 1
+        return token
+
+    def accept(self, text: str) -> bool:
+        token = self.peek()
+        if token is not None and token.kind == "punctuation" and token.text == text:
+            self.position += 1
+            return True
+        return False
+
+    def parse(self) -> ParsedQuery:
+        statements = []
+        while self.peek() is not None:
+            if self.accept(";"):
+                continue
+            statements.append(self.statement())
+            if self.peek() is not None and not self.accept(";"):
+                # Another assignment means a forgotten ';', anything else an unknown construct.
+                raise self.error("expected ';' between statements", unsupported=not self.at_assignment())
+        if "RETURN" not in self.result.variables:
+            raise AQLSyntaxError("query has no 'RETURN = ...' statement", self.query, len(self.query.rstrip()))
+        self.result.canonical = "; ".join(statements) + ";"
+        return self.result
+
+    def at_assignment(self, position: int | None = None) -> bool:
+        """Return whether the tokens at ``position``, by default the next ones, are a name followed by '='."""
+        position = self.position if position is None else position
+        following = self.tokens[position : position + 2]
+        return [token.kind for token in following] == ["name", "punctuation"] and following[1].text == "="
+
+    def check_structure(self) -> None:
+        """Reject unbalanced brackets and a missing RETURN anywhere in the tokens.
+
+        Raises:
+            AQLSyntaxError: At the first unbalanced bracket, or at the end if RETURN is never assigned
+        """
+        closing = {"(": ")", "[": "]", "{": "}"}
+        open_brackets: list[Token] = []
+        for token in self.tokens:
+            if token.kind != "punctuation":
+                continue
+            if token.text in closing:
+                open_brackets.append(token)
+            elif token.text in closing.values():
+                if not open_brackets or closing[open_brackets[-1].text] != token.text:
+                    raise AQLSyntaxError(f"unbalanced '{token.text}'", self.query, token.offset)
+                open_brackets.pop()
+        if open_brackets:
+            raise AQLSyntaxError(f"'{open_brackets[-1].text}' is never closed", self.query, open_brackets[-1].offset)
+        if not any(token.text == "RETURN" and self.at_assignment(index) for index, token in enumerate(self.tokens)):
+            raise AQLSyntaxError("query has no 'RETURN = ...' statement", self.query, len(self.query.rstrip()))
+
+    def statement(self) -> str:
+        token = self.peek()
+        if token is None or token.kind != "name":
+            raise self.error("expected a variable name to assign")
+        self.position += 1
+        self.expect("=", f"after '{token.text}'")
+        self.result.variables.append(token.text)
+        return f"{token.text}={self.expression()}"
+
+    def expression(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise self.error("expected a value")
+        self.position += 1
+        if token.kind == "string":
+            return _canonical_string(token.text)
+        if token.kind == "number":
+            return token.text
+        if token.text == "-":
+            number = self.peek()
+            if number is None or number.kind != "number":
+                raise self.error("expected a number after '-'")
+            self.position += 1
+            return f"-{number.text}"
+        if token.kind == "placeholder":
+            return "{{" + token.text[2:-2].strip() + "}}"
+        if token.kind == "name":
+            if not self.accept("("):
+                return token.text
+            arguments = self.sequence(")", "in the arguments of " + token.text)
+            if token.text == "query_bucket" and len(arguments) == 1 and arguments[0].startswith('"'):
+                with contextlib.suppress(ValueError):
+                    self.result.buckets.append(json.loads(arguments[0]))
+            return f"{token.text}({','.join(arguments)})"
+        if token.text == "[":
+            return f"[{','.join(self.sequence(']', 'in list'))}]"
+        if token.text == "{":
+            return self.dictionary()
+        raise self.error("expected a value", token)
+
+    def sequence(self, closing: str, context: str) -> list[str]:
+        items: list[str] = []
+        if self.accept(closing):
+            return items
+        while True:
+            items.append(self.expression())
+            if self.accept(closing):
+                return items
+            self.expect(",", f"or '{closing}' {context}")
+
+    def dictionary(self) -> str:
+        items: dict[str, str] = {}
+        if self.accept("}"):
+            return "{}"
+        while True:
+            key = self.peek()
+            if key is None or key.kind != "string":
+                raise self.error("expected a string key in dict")
+            self.position += 1
+            self.expect(":", "after dict key")
+            items[_canonical_string(key.text)] = self.expression()
+            if self.accept("}"):
+                return "{" + ",".join(f"{key}:{value}" for key, value in sorted(items.items())) + "}"
+            self.expect(",", "or '}' in dict")
+
+
+def _canonical_string(literal: str) -> str:
+    """Return a string literal in double quotes."""
+    if literal[0] == '"':
+        return literal
+    content = re.sub(r"\\(.)", lambda match: match.group(1) if match.group(1) == "'" else match.group(), literal[1:-1])
+    return '"' + re.sub(r'(?<!\\)((?:\\\\)*)"', r'\1\\"', content) + '"'
+
+
+def parse_query(query: str, placeholders: bool = False) -> ParsedQuery:
+    """Parse and validate a query.
+
+    Args:
+        query: Query text
+        placeholders: Accept ``{{ name }}`` template placeholders as values
+
+    Raises:
+        AQLUnsupportedError: If the query uses syntax the parser does not know but is otherwise well-formed
+        AQLSyntaxError: If the query is malformed
+    """
+    parser = _Parser(query, placeholders)
+    try:
+        return parser.parse()
+    except AQLUnsupportedError:
+        parser.check_structure()
+        raise
+
+
+@functools.lru_cache(maxsize=256)
+def canonical_query(query: str) -> str | None:
+    """Return the canonical text of a query, parsing each distinct text once.
+
+    Returns:
+        The canonical text, or None if the query uses syntax the parser does not know
+
+    Raises:
+        AQLSyntaxError: If the query is malformed
+    """
+    try:
+        return parse_query(query).canonical
+    except AQLUnsupportedError:
+        return None
@@ -0,0 +1,424 @@
+"""ActivityWatch MCP Server - Event chunk cache backends.
+
+Aggregation tools fetch events one UTC day at a time. Days that ended a while
+ago no longer change, so their events are kept as compact ``EventColumns`` in
+an LRU cache bounded by memory, and repeated or overlapping aggregations over
+past days are answered without going back to aw-server. Per-day summaries
+derived from those events, such as statistics sketches, and the results of
+queries over settled periods share the same budget; anything with an
+``nbytes()`` method can be cached. Short-lived entries, such as bucket
+metadata, are cached with a time to live.
+
+Two backends implement the same interface. ``EventCache`` is an LRU cache
+private to the process. ``SQLiteCache`` puts the same LRU cache in front of a
+SQLite file, so that every server process on the host (one stdio server per
+agent session, or several HTTP workers) reuses what the others fetched.
+Coroutines use the ``aget``/``apeek``/``aput`` variants, which run file access,
+pickling and compression in a thread instead of on the event loop.
+"""
+
+import abc
+import asyncio
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from fastmcp import Context
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+DEFAULT_MAX_DISK_BYTES = 1024 * 1024 * 1024
+
+CACHE_BACKENDS = ("memory", "sqlite")
+
+
+def cache_directory() -> str:
+    """Return the directory of the server's files in the user's cache directory."""
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "activitywatch-mcp")
+
+
+def private_directory(directory: str | Path) -> Path:
+    """Create ``directory`` accessible only to the current user, or check that an existing one is theirs.
+
+    Raises:
+        PermissionError: If the directory belongs to another user
+    """
+    path = Path(directory)
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if hasattr(os, "getuid") and path.stat().st_uid != os.getuid():
+        raise PermissionError(f"Refusing to use {path}: it belongs to another user")
+    return path
+
+
+def open_private(path: Path) -> BinaryIO:
+    """Create a new file ``path`` readable only by the current user and open it for writing."""
+    return os.fdopen(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "wb")
+
+
+def write_private(path: Path, data: bytes) -> None:
+    """Write ``data`` to a new file ``path`` readable only by the current user."""
+    with open_private(path) as file:
+        file.write(data)
+
+
+def default_cache_file() -> str:
+    """Return the default path of the shared cache file."""
+    return os.path.join(cache_directory(), "cache.sqlite3")
+
+
+@dataclass(frozen=True)
+class CachedValue:
+    """A decoded JSON value cached with the size of its encoding."""
+
+    value: Any
+    size: int
+
+    def nbytes(self) -> int:
+        """Return an estimate of the memory held by the value."""
+        return self.size * 4
+
+
+class CacheBackend(abc.ABC):
+    """Interface of the event cache backends.
+
+    Keys are tuples of strings and numbers. Values are anything with an
+    ``nbytes()`` method; shared backends also require them to be picklable.
+    The async variants default to the blocking methods, which suits backends
+    that never leave memory.
+    """
+
+    @abc.abstractmethod
+    def get(self, key: tuple) -> Any:
+        """Return the value cached under ``key``, if any."""
+
+    @abc.abstractmethod
+    def peek(self, key: tuple) -> Any:
+        """Return the value cached under ``key`` without counting a hit or refreshing it."""
+
+    @abc.abstractmethod
+    def put(self, key: tuple, chunk: Any, ttl: float | None = None) -> None:
+        """Cache ``chunk`` under ``key``, for ``ttl`` seconds if given."""
+
+    @abc.abstractmethod
+    def discard(self, key: tuple) -> None:
+        """Remove the value cached under ``key``, if any."""
+
+    @abc.abstractmethod
+    def stats(self) -> dict[str, Any]:
+        """Return cache statistics."""
+
+    async def aget(self, key: tuple) -> Any:
+        """Return the value cached under ``key``, if any, without blocking the event loop."""
+        return self.get(key)
+
+    async def apeek(self, key: tuple) -> Any:
+        """Return the value cached under ``key`` without counting a hit or blocking the event loop."""
+        return self.peek(key)
+
+    async def aput(self, key: tuple, chunk: Any, ttl: float | None = None) -> None:
+        """Cache ``chunk`` under ``key`` without blocking the event loop."""
+        self.put(key, chunk, ttl)
+
+    def close(self) -> None:  # noqa: B027
+        """Release resources held by the backend."""
+
+
+class EventCache(CacheBackend):
+    """In-process LRU cache of event chunks bounded by their estimated memory."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Create a cache.
+
+        Args:
+            max_bytes: Memory budget for cached chunks (0 disables caching)
+        """
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._chunks: OrderedDict[tuple, tuple[Any, int, float | None]] = OrderedDict()
+        # Validated snapshot of a previous run (``snapshot.Snapshot``), consulted on misses.
+        self.snapshot: Any = None
+
+    def _entry(self, key: tuple) -> tuple[Any, int, float | None] | None:
+        """Return the live entry under ``key``, dropping it if it has expired."""
+        entry = self._chunks.get(key)
+        if entry is not None and entry[2] is not None and entry[2] <= time.time():
+            self.discard(key)
+            return None
+        if entry is None and self.snapshot is not None:
+            chunk = self.snapshot.take(key)
+            if chunk is not None:
+                self.put(key, chunk)
+                entry = self._chunks.get(key) or (chunk, 0, None)
+        return entry
+
+    def get(self, key: tuple) -> Any:
+        """Return the chunk cached under ``key``, if any."""
+        entry = self._entry(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._chunks.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def peek(self, key: tuple) -> Any:
+        """Return the entry cached under ``key`` without counting a hit or refreshing it."""
+        entry = self._entry(key)
+        return entry[0] if entry is not None else None
+
+    def put(self, key: tuple, chunk: Any, ttl: float | None = None, expires: float | None = None) -> None:
+        """Cache ``chunk`` under ``key``, evicting least recently used chunks to fit the budget.
+
+        Args:
+            key: Cache key
+            chunk: Value with an ``nbytes()`` method
+            ttl: Seconds after which the entry expires (default: never)
+            expires: Absolute expiry time as a Unix timestamp, instead of ``ttl``
+        """
+        size = chunk.nbytes()
+        if size > self.max_bytes:
+            return
+
+        if ttl is not None:
+            expires = time.time() + ttl
+        self.discard(key)
+        self._chunks[key] = (chunk, size, expires)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._chunks.popitem(last=False)
+            self.size_bytes -= evicted_size
+
+    def discard(self, key: tuple) -> None:
+        """Remove the chunk cached under ``key``, if any."""
+        entry = self._chunks.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= entry[1]
+
+    def items(self) -> list[tuple[tuple, Any]]:
+        """Return the keys and chunks of the entries that do not expire, least recently used first."""
+        return [(key, chunk) for key, (chunk, _, expires) in self._chunks.items() if expires is None]
+
+    def stats(self) -> dict[str, Any]:
+        """Return cache statistics."""
+        return {
+            "backend": "memory",
+            "chunks": len(self._chunks),
+            "snapshot_chunks": len(self.snapshot) if self.snapshot is not None else 0,
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class SQLiteCache(CacheBackend):
+    """LRU cache in front of a SQLite file shared by the server processes of a host.
+
+    Entries are pickled and compressed into one table. Reads first try the
+    in-process LRU cache, then the file, and keep what they load in memory;
+    writes go to both. SQLite's write-ahead log lets several processes read
+    while one writes. The file's least recently used entries are deleted once
+    it exceeds its own budget. Like any pickle, the file must only be writable
+    by the user running the server; its directory is created private.
+
+    The blocking methods touch the file on the calling thread; the async ones
+    answer from memory when they can and otherwise do the file access,
+    unpickling and compression in a thread. The in-process cache and the
+    counters are only updated on the calling thread.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+    ):
+        """Open or create a shared cache.
+
+        Args:
+            path: SQLite file shared by the processes
+            max_bytes: Memory budget of the in-process LRU cache (0 disables it)
+            max_disk_bytes: Budget for the compressed entries in the file
+        """
+        self.path = Path(path)
+        self.max_disk_bytes = max_disk_bytes
+        self.local = EventCache(max_bytes=max_bytes)
+        self.hits = 0
+        self.misses = 0
+        # Entries are unpickled, so the file must not be writable by other users.
+        private_directory(self.path.parent)
+        os.close(os.open(self.path, os.O_WRONLY | os.O_CREAT, 0o600))
+        if hasattr(os, "getuid") and self.path.stat().st_uid != os.getuid():
+            raise PermissionError(f"Refusing to use {self.path}: it belongs to another user")
+        self.path.chmod(0o600)
+        # Serializes use of the connection by the threads of the async methods.
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "expires REAL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    @staticmethod
+    def _key(key: tuple) -> str:
+        return repr(key)
+
+    def _read(self, key: tuple, touch: bool) -> tuple[Any, float | None] | None:
+        """Return the live chunk under ``key`` in the file and its expiry time."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, expires FROM entries WHERE key = ? AND (expires IS NULL OR expires > ?)",
+                (self._key(key), time.time()),
+            ).fetchone()
+            if row is None:
+                return None
+            try:
+                chunk = pickle.loads(zlib.decompress(row[0]))
+            except Exception:
+                # Written by an incompatible version; drop it and fetch again.
+                self._db.execute("DELETE FROM entries WHERE key = ?", (self._key(key),))
+                return None
+            if touch:
+                self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), self._key(key)))
+        return chunk, row[1]
+
+    def _write(self, key: tuple, chunk: Any, expires: float | None) -> None:
+        """Store ``chunk`` under ``key`` in the file, evicting its least recently used entries."""
+        value = zlib.compress(pickle.dumps(chunk, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        if len(value) > self.max_disk_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                (self._key(key), value, len(value), expires, now),
+            )
+            self._db.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?", (now,))
+            (size,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+            if size > self.max_disk_bytes:
+                self._db.execute(
+                    "DELETE FROM entries WHERE key IN ("
+                    "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY accessed DESC) AS kept FROM entries) "
+                    "WHERE kept > ?)",
+                    (self.max_disk_bytes,),
+                )
+
+    def _loaded(self, key: tuple, entry: tuple[Any, float | None] | None, count: bool) -> Any:
+        """Keep a chunk read from the file in memory and return it, counting a hit or miss if ``count``."""
+        chunk = None
+        if entry is not None:
+            chunk, expires = entry
+            self.local.put(key, chunk, expires=expires)
+        if count:
+            if chunk is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return chunk
+
+    def get(self, key: tuple) -> Any:
+        """Return the chunk cached under ``key`` in this process or by any other, if any."""
+        if self.local.peek(key) is not None:
+            self.hits += 1
+            return self.local.get(key)
+        return self._loaded(key, self._read(key, touch=True), count=True)
+
+    async def aget(self, key: tuple) -> Any:
+        """Return the chunk cached under ``key`` in this process or by any other, reading the file in a thread."""
+        if self.local.peek(key) is not None:
+            self.hits += 1
+            return self.local.get(key)
+        return self._loaded(key, await asyncio.to_thread(self._read, key, True), count=True)
+
+    def peek(self, key: tuple) -> Any:
+        """Return the entry cached under ``key`` without counting a hit or refreshing it."""
+        chunk = self.local.peek(key)
+        return chunk if chunk is not None else self._loaded(key, self._read(key, touch=False), count=False)
+
+    async def apeek(self, key: tuple) -> Any:
+        """Return the entry cached under ``key`` without counting a hit or refreshing it, reading the file in a thread."""
+        chunk = self.local.peek(key)
+        if chunk is not None:
+            return chunk
+        return self._loaded(key, await asyncio.to_thread(self._read, key, False), count=False)
+
+    def put(self, key: tuple, chunk: Any, ttl: float | None = None) -> None:
+        """Cache ``chunk`` under ``key`` for every process, evicting the file's least recently used entries."""
+        expires = time.time() + ttl if ttl is not None else None
+        self.local.put(key, chunk, expires=expires)
+        self._write(key, chunk, expires)
+
+    async def aput(self, key: tuple, chunk: Any, ttl: float | None = None) -> None:
+        """Cache ``chunk`` under ``key`` for every process, pickling and writing it in a thread."""
+        expires = time.time() + ttl if ttl is not None else None
+        self.local.put(key, chunk, expires=expires)
+        await asyncio.to_thread(self._write, key, chunk, expires)
+
+    def discard(self, key: tuple) -> None:
+        """Remove the chunk cached under ``key`` for every process."""
+        self.local.discard(key)
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (self._key(key),))
+
+    def stats(self) -> dict[str, Any]:
+        """Return cache statistics, of this process and of the shared file."""
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            "backend": "sqlite",
+            "path": str(self.path),
+            "entries": entries,
+            "disk_bytes": size,
+            "max_disk_bytes": self.max_disk_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "local": self.local.stats(),
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+
+def create_cache(
+    backend: str,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    path: str | None = None,
+    max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES,
+) -> CacheBackend:
+    """Create a cache backend by name.
+
+    Args:
+        backend: ``memory`` or ``sqlite``
+        max_bytes: Memory budget of the in-process cache
+        path: SQLite file of the shared cache (default: ``default_cache_file()``)
+        max_disk_bytes: Budget of the shared cache file
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend == "memory":
+        return EventCache(max_bytes=max_bytes)
+    if backend == "sqlite":
+        return SQLiteCache(path or default_cache_file(), max_bytes=max_bytes, max_disk_bytes=max_disk_bytes)
+    raise ValueError(f"Unknown cache backend '{backend}'. Available: {', '.join(CACHE_BACKENDS)}")
+
+
+def get_event_cache(ctx: Context | None) -> CacheBackend | None:
+    """Return the event cache from the lifespan context, if one is configured."""
+    return ctx.lifespan_context.get("event_cache") if ctx else None
@@ -0,0 +1,200 @@
+"""ActivityWatch MCP Server - Day-chunked event fetching.
+
+Aggregation tools walk a time range one UTC day at a time so that memory stays
+bounded by a single day of events, however long the range is. Each chunk is
+clipped to its window, so events crossing midnight are not counted twice, and
+sorted by start time. Days that have settled are served from and stored in the
+event cache, unclipped, so they can also answer raw event requests.
+"""
+
+import re
+import time
+from collections.abc import AsyncIterator
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+from fastmcp import Context
+
+from .cache import get_event_cache
+from .client import DEFAULT_API_BASE, upstream_client
+from .columnar import EventColumns, from_epoch_us, to_epoch_us
+from .jsonio import get_json_codec
+from .progress import Progress
+
+DAY_US = 86_400 * 1_000_000
+
+# Days ending less than this long ago may still receive late events and are not cached.
+SETTLE_US = 3_600 * 1_000_000
+
+LAST_DAYS = re.compile(r"last_(\d+)_days")
+
+
+def now_us() -> int:
+    """Return the current time in epoch microseconds."""
+    return time.time_ns() // 1_000
+
+
+def resolve_range(start: str, end: str | None) -> tuple[int, int]:
+    """Convert an ISO range to epoch microseconds; a missing end means now.
+
+    Raises:
+        ValueError: If a timestamp is malformed or the range is empty
+    """
+    start_us = to_epoch_us(start)
+    end_us = to_epoch_us(end) if end else now_us()
+    if end_us <= start_us:
+        raise ValueError(f"Empty time range: {start} to {end or 'now'}")
+    return start_us, end_us
+
+
+def resolve_period(period: str, today: date | None = None) -> str:
+    """Resolve a period shorthand to an explicit UTC date range; 'start/end' ranges pass through.
+
+    Shorthands are 'today', 'yesterday', 'last_N_days', 'this_week' and
+    'last_week', where weeks start on Monday and the current ones end tomorrow.
+
+    Raises:
+        ValueError: If ``period`` is neither a shorthand nor a 'start/end' range
+    """
+    today = today or datetime.now(timezone.utc).date()
+    tomorrow = today + timedelta(days=1)
+    monday = today - timedelta(days=today.weekday())
+    ranges = {
+        "today": (today, tomorrow),
+        "yesterday": (today - timedelta(days=1), today),
+        "this_week": (monday, tomorrow),
+        "last_week": (monday - timedelta(days=7), monday),
+    }
+    last_days = LAST_DAYS.fullmatch(period)
+    if last_days:
+        ranges[period] = (tomorrow - timedelta(days=int(last_days.group(1))), tomorrow)
+    if period in ranges:
+        start, end = ranges[period]
+        return f"{start.isoformat()}/{end.isoformat()}"
+    if "/" not in period:
+        raise ValueError(
+            f"Invalid period '{period}': use 'start/end', 'today', 'yesterday', 'last_N_days', 'this_week' or 'last_week'"
+        )
+    return period
+
+
+def get_compact_gap(ctx: Context | None) -> float | None:
+    """Return the gap in seconds within which day chunks are compacted, or None if they are not."""
+    return ctx.lifespan_context.get("compact_gap") if ctx else None
+
+
+def chunk_cache_key(ctx: Context | None, bucket_id: str, day_start: int, compacted: bool = True) -> tuple:
+    """Return the event cache key of a day of ``bucket_id``.
+
+    Compacted days are keyed with their gap, so a cache shared or restored
+    under another setting does not serve them. With ``compacted`` False, the
+    key of the uncompacted day is returned whatever the setting.
+    """
+    api_base = ctx.lifespan_context.get("api_base", DEFAULT_API_BASE) if ctx else DEFAULT_API_BASE
+    gap = get_compact_gap(ctx) if compacted else None
+    if gap is None:
+        return (api_base, bucket_id, day_start)
+    return (api_base, bucket_id, day_start, int(gap * 1_000_000))
+
+
+def day_windows(start_us: int, end_us: int) -> list[tuple[int, int, int]]:
+    """Split a range at UTC midnights.
+
+    Returns:
+        ``(day_start, window_start, window_end)`` for every day the range touches
+    """
+    windows = []
+    day_start = start_us - start_us % DAY_US
+    while day_start < end_us:
+        windows.append((day_start, max(start_us, day_start), min(end_us, day_start + DAY_US)))
+        day_start += DAY_US
+    return windows
+
+
+async def load_day_chunk(
+    ctx: Context | None,
+    client: httpx.AsyncClient,
+    bucket_id: str,
+    day_start: int,
+    window_start: int,
+    window_end: int,
+    settled_before: int,
+    compacted: bool = True,
+) -> EventColumns:
+    """Return the events of ``bucket_id`` overlapping a window of one day, unclipped and start-sorted.
+
+    Settled days are served from and stored in the event cache as a whole day,
+    so the result may hold events outside the window; clip it before summing.
+    With a compaction gap configured, runs of identical events are merged
+    before the chunk is cached, unless ``compacted`` is False, e.g. for a
+    caller that compacts with a gap of its own.
+    """
+    api_base = ctx.lifespan_context.get("api_base", DEFAULT_API_BASE) if ctx else DEFAULT_API_BASE
+    cache = get_event_cache(ctx)
+    day_end = day_start + DAY_US
+    cacheable = cache is not None and day_end <= settled_before
+    key = chunk_cache_key(ctx, bucket_id, day_start, compacted)
+
+    chunk = await cache.aget(key) if cacheable else None
+    if chunk is None:
+        fetch_start, fetch_end = (day_start, day_end) if cacheable else (window_start, window_end)
+        response = await client.get(
+            f"{api_base}/buckets/{bucket_id}/events",
+            params={"start": from_epoch_us(fetch_start), "end": from_epoch_us(fetch_end)},
+            timeout=30.0,
+        )
+        response.raise_for_status()
+        events = await get_json_codec(ctx).loads(response.content)
+        chunk = EventColumns.from_wire(events).sorted_by_start()
+        del events
+        gap = get_compact_gap(ctx)
+        if gap is not None and compacted:
+            chunk = chunk.compact(int(gap * 1_000_000))
+        if cacheable:
+            await cache.aput(key, chunk)
+    return chunk
+
+
+async def iter_event_chunks(
+    ctx: Context | None,
+    client: httpx.AsyncClient,
+    bucket_id: str,
+    start_us: int,
+    end_us: int,
+    progress: Progress | None = None,
+    clip: bool = True,
+) -> AsyncIterator[EventColumns]:
+    """Yield the events of ``bucket_id`` in ``[start_us, end_us)`` one day at a time.
+
+    Args:
+        ctx: MCP context with lifespan data containing api_base and the event cache
+        client: HTTP client used for the upstream requests
+        bucket_id: Bucket to read
+        start_us: Range start in epoch microseconds
+        end_us: Range end in epoch microseconds
+        progress: Advanced by one step per day read
+        clip: Trim events to the range and to each day; otherwise yield every event once,
+            unclipped, in the day it starts in
+
+    Yields:
+        Start-sorted chunks, in chronological order
+    """
+    settled_before = now_us() - SETTLE_US
+    for day_start, window_start, window_end in day_windows(start_us, end_us):
+        chunk = await load_day_chunk(ctx, client, bucket_id, day_start, window_start, window_end, settled_before)
+        if clip:
+            chunk = chunk.clip(window_start, window_end)
+        elif chunk.starts and (chunk.starts[0] < window_start or chunk.starts[-1] >= window_end):
+            chunk = chunk.take([row for row, start in enumerate(chunk.starts) if window_start <= start < window_end])
+        if progress is not None:
+            await progress.advance(events=len(chunk))
+        yield chunk
+
+
+async def fetch_event_chunks(
+    ctx: Context | None, bucket_id: str, start_us: int, end_us: int
+) -> AsyncIterator[EventColumns]:
+    """Like ``iter_event_chunks`` but gets its own HTTP client."""
+    async with upstream_client(ctx) as client:
+        async for chunk in iter_event_chunks(ctx, client, bucket_id, start_us, end_us):
+            yield chunk
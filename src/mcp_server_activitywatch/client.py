@@ -0,0 +1,205 @@
+"""ActivityWatch MCP Server - Upstream HTTP client.
+
+This module centralizes how the server talks to aw-server so that every tool
+and resource negotiates the same transfer encodings.
+
+The lifespan creates one shared client, whose connection pool every request
+reuses and whose transport bounds the concurrent requests and the request
+rate sent upstream, however many MCP clients the server serves.
+
+Bucket metadata is read through the event cache for a few seconds, so that
+tools and processes listing buckets at about the same time share one request.
+"""
+
+import asyncio
+import contextlib
+import importlib
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+import httpx
+from fastmcp import Context
+
+from .cache import CachedValue, get_event_cache
+from .jsonio import get_json_codec
+
+DEFAULT_API_BASE = "http://localhost:5600/api/0"
+
+DEFAULT_UPSTREAM_CONCURRENCY = 16
+
+# Seconds bucket metadata is reused; ``last_updated`` moves with every heartbeat.
+BUCKETS_TTL = 5.0
+
+# Preferred content codings, best ratio first. Only codings httpx can decode in
+# this environment are advertised (brotli and zstd need the "compression" extra).
+ENCODING_PREFERENCE = ("zstd", "br", "gzip", "deflate")
+
+# Packages httpx decodes each coding with; gzip and deflate need none.
+DECODER_PACKAGES = {"zstd": ("zstandard",), "br": ("brotli", "brotlicffi"), "gzip": (), "deflate": ()}
+
+
+def _importable(packages: tuple[str, ...]) -> bool:
+    """Return True if no package is needed or any of ``packages`` can be imported."""
+    if not packages:
+        return True
+    for package in packages:
+        try:
+            importlib.import_module(package)
+        except ImportError:
+            continue
+        return True
+    return False
+
+
+ACCEPT_ENCODING = ", ".join(encoding for encoding in ENCODING_PREFERENCE if _importable(DECODER_PACKAGES[encoding]))
+
+
+def create_client(**kwargs: Any) -> httpx.AsyncClient:
+    """Create an HTTP client for the ActivityWatch API.
+
+    The client advertises every compressed encoding it can decode so that
+    aw-server, or a reverse proxy in front of it, can compress the highly
+    repetitive event JSON on the wire.
+
+    Args:
+        **kwargs: Extra keyword arguments forwarded to ``httpx.AsyncClient``
+
+    Returns:
+        A configured ``httpx.AsyncClient``
+    """
+    headers = {"Accept-Encoding": ACCEPT_ENCODING, **kwargs.pop("headers", {})}
+    return httpx.AsyncClient(headers=headers, **kwargs)
+
+
+class UpstreamLimiter:
+    """Bounds the concurrent requests and, optionally, the request rate sent to aw-server."""
+
+    def __init__(self, concurrency: int = DEFAULT_UPSTREAM_CONCURRENCY, rate: float = 0.0):
+        """Create a limiter.
+
+        Args:
+            concurrency: Maximum requests in flight, including reading their response bodies
+            rate: Maximum requests started per second, with bursts of up to one second's worth (0 is unlimited)
+        """
+        self.concurrency = concurrency
+        self.rate = rate
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._lock = asyncio.Lock()
+        self._tokens = max(rate, 1.0)
+        self._updated: float | None = None
+
+    async def acquire(self) -> None:
+        """Wait for a free request slot and, if rate limited, a token."""
+        await self._semaphore.acquire()
+        if self.rate <= 0:
+            return
+        try:
+            async with self._lock:
+                loop = asyncio.get_running_loop()
+                now = loop.time()
+                if self._updated is not None:
+                    self._tokens = min(max(self.rate, 1.0), self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    self._tokens, self._updated = 1.0, loop.time()
+                self._tokens -= 1
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self) -> None:
+        """Free a request slot."""
+        self._semaphore.release()
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its request slot once closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Callable[[], None] | None = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                self._release, release = None, self._release
+                release()
+
+
+class LimitedTransport(httpx.AsyncBaseTransport):
+    """Transport that holds an ``UpstreamLimiter`` slot from sending a request until its body is closed."""
+
+    def __init__(self, limiter: UpstreamLimiter, transport: httpx.AsyncBaseTransport | None = None):
+        self.limiter = limiter
+        self._transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self.limiter.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            self.limiter.release()
+            raise
+        if response.is_closed:
+            # The body was already read into memory, so it holds no connection.
+            self.limiter.release()
+            return response
+        response.stream = _ReleasingStream(response.stream, self.limiter.release)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_shared_client(limiter: UpstreamLimiter, max_connections: int | None = None) -> httpx.AsyncClient:
+    """Create the client shared by all requests of a server process.
+
+    Args:
+        limiter: Bounds on the requests sent upstream
+        max_connections: Size of the connection pool (default: the limiter's concurrency)
+    """
+    connections = max_connections or limiter.concurrency
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections)
+    )
+    return create_client(transport=LimitedTransport(limiter, transport), follow_redirects=True)
+
+
+@contextlib.asynccontextmanager
+async def upstream_client(ctx: Context | None) -> AsyncIterator[httpx.AsyncClient]:
+    """Yield the shared client from the lifespan context, or a short-lived one if there is none."""
+    shared = ctx.lifespan_context.get("http_client") if ctx else None
+    if shared is not None:
+        yield shared
+        return
+    async with create_client(follow_redirects=True) as client:
+        yield client
+
+
+def buckets_cache_key(api_base: str) -> tuple:
+    """Return the event cache key of the bucket metadata of ``api_base``."""
+    return ("buckets", api_base)
+
+
+async def fetch_buckets(ctx: Context | None, client: httpx.AsyncClient) -> dict[str, Any]:
+    """Return the metadata of every bucket, from the event cache if it was fetched in the last few seconds."""
+    api_base = ctx.lifespan_context.get("api_base", DEFAULT_API_BASE) if ctx else DEFAULT_API_BASE
+    cache = get_event_cache(ctx)
+    key = buckets_cache_key(api_base)
+    cached = await cache.aget(key) if cache is not None else None
+    if cached is not None:
+        return cached.value
+
+    response = await client.get(f"{api_base}/buckets", timeout=10.0)
+    response.raise_for_status()
+    buckets = await get_json_codec(ctx).loads(response.content)
+    if cache is not None:
+        await cache.aput(key, CachedValue(buckets, len(response.content)), ttl=BUCKETS_TTL)
+    return buckets
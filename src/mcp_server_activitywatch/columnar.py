@@ -0,0 +1,247 @@
+"""ActivityWatch MCP Server - Compact columnar event storage.
+
+Events on the wire are dicts with a timestamp string, a duration float and a
+``data`` dict whose ``app``/``title``/``url`` strings repeat thousands of
+times. ``EventColumns`` stores the same events in typed arrays instead: epoch
+microseconds and ids as int64, durations as float64, and every data key as a
+dictionary-encoded int32 column pointing into a table of distinct (interned)
+values. That is a few dozen bytes per event rather than several hundred, so
+caches and aggregation paths can hold millions of heartbeats.
+
+Events are converted from and to the wire format lazily, one at a time.
+"""
+
+import json
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from .events import parse_timestamp
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MISSING = -1
+
+
+def to_epoch_us(timestamp: str) -> int:
+    """Convert an ISO 8601 timestamp to integer microseconds since the epoch."""
+    delta = parse_timestamp(timestamp) - EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_epoch_us(epoch_us: int) -> str:
+    """Convert microseconds since the epoch to an ISO 8601 UTC timestamp."""
+    return (EPOCH + timedelta(microseconds=epoch_us)).isoformat()
+
+
+def hashable(value: Any) -> Any:
+    """Return ``value``, or its canonical JSON if it is a list or dict."""
+    return json.dumps(value, sort_keys=True) if isinstance(value, list | dict) else value
+
+
+class EventColumns:
+    """Array-backed, dictionary-encoded container of events."""
+
+    __slots__ = ("ids", "starts", "durations", "columns", "_values", "_codes", "_shared")
+
+    def __init__(self) -> None:
+        """Create an empty container."""
+        self.ids = array("q")
+        self.starts = array("q")
+        self.durations = array("d")
+        self.columns: dict[str, array] = {}
+        self._values: dict[str, list[Any]] = {}
+        self._codes: dict[str, dict[Any, int]] = {}
+        # Set while the dictionaries are shared with the container this one was taken from
+        self._shared = False
+
+    @classmethod
+    def from_wire(cls, events: Iterable[dict[str, Any]]) -> "EventColumns":
+        """Build a container from wire-format events."""
+        columns = cls()
+        columns.extend(events)
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> dict[str, Any]:
+        """Materialize the event at ``index`` in wire format."""
+        return self.event(index)
+
+    def event(self, index: int, keys: Iterable[str] | None = None) -> dict[str, Any]:
+        """Materialize the event at ``index`` in wire format, with only the data ``keys`` if given."""
+        if index < 0:
+            index += len(self)
+        event: dict[str, Any] = {}
+        if self.ids[index] != MISSING:
+            event["id"] = self.ids[index]
+        event["timestamp"] = from_epoch_us(self.starts[index])
+        event["duration"] = self.durations[index]
+        columns = self.columns.items()
+        if keys is not None:
+            columns = [(key, self.columns[key]) for key in keys if key in self.columns]
+        event["data"] = {key: self._values[key][codes[index]] for key, codes in columns if codes[index] != MISSING}
+        return event
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """Yield the events in wire format, one at a time."""
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, event: dict[str, Any]) -> None:
+        """Add one wire-format event."""
+        if self._shared:
+            self._values = {key: list(values) for key, values in self._values.items()}
+            self._codes = {key: dict(codes) for key, codes in self._codes.items()}
+            self._shared = False
+        row = len(self)
+        event_id = event.get("id")
+        self.ids.append(event_id if isinstance(event_id, int) else MISSING)
+        self.starts.append(to_epoch_us(event["timestamp"]))
+        self.durations.append(float(event.get("duration", 0.0)))
+
+        data = event.get("data") or {}
+        for key in data:
+            if key not in self.columns:
+                self.columns[key] = array("i", [MISSING]) * row
+                self._values[key] = []
+                self._codes[key] = {}
+        for key, codes in self.columns.items():
+            codes.append(self._encode(key, data[key]) if key in data else MISSING)
+
+    def extend(self, events: Iterable[dict[str, Any]]) -> None:
+        """Add wire-format events."""
+        for event in events:
+            self.append(event)
+
+    def to_wire(self) -> list[dict[str, Any]]:
+        """Materialize every event in wire format."""
+        return list(self)
+
+    def take(self, rows: Iterable[int]) -> "EventColumns":
+        """Return a new container holding the given rows, in the given order.
+
+        The value dictionaries are shared with ``self`` until either container
+        is appended to.
+        """
+        taken = EventColumns()
+        taken._values = self._values
+        taken._codes = self._codes
+        taken._shared = self._shared = True
+        taken.columns = {key: array("i") for key in self.columns}
+        for row in rows:
+            taken.ids.append(self.ids[row])
+            taken.starts.append(self.starts[row])
+            taken.durations.append(self.durations[row])
+            for key, codes in self.columns.items():
+                taken.columns[key].append(codes[row])
+        return taken
+
+    def sorted_by_start(self) -> "EventColumns":
+        """Return the events in ascending start order (``self`` if already sorted)."""
+        starts = self.starts
+        if all(starts[i] <= starts[i + 1] for i in range(len(starts) - 1)):
+            return self
+        return self.take(sorted(range(len(starts)), key=starts.__getitem__))
+
+    def clip(self, start_us: int, end_us: int) -> "EventColumns":
+        """Return the events overlapping ``[start_us, end_us)``, trimmed to that window.
+
+        Clipping makes adjacent windows partition time exactly, so events
+        crossing a window boundary are not counted twice.
+        """
+        rows = [
+            row
+            for row, (start, duration) in enumerate(zip(self.starts, self.durations, strict=True))
+            if start < end_us and (start >= start_us or start + duration * 1_000_000 > start_us)
+        ]
+        clipped = self.take(rows)
+        for index, (start, duration) in enumerate(zip(clipped.starts, clipped.durations, strict=True)):
+            end = start + int(duration * 1_000_000)
+            if start < start_us or end > end_us:
+                start, end = max(start, start_us), min(end, end_us)
+                clipped.starts[index] = start
+                clipped.durations[index] = max(end - start, 0) / 1_000_000
+        return clipped
+
+    def compact(self, gap_us: int) -> "EventColumns":
+        """Merge runs of consecutive events with identical data that overlap, touch or are at most ``gap_us`` apart.
+
+        Events must be sorted by start. A merged event keeps the id and start
+        of its first event and ends with the last one, so the time covered is
+        unchanged except for the gaps filled. Returns ``self`` if no event is
+        merged.
+        """
+        columns = list(self.columns.values())
+        rows: list[int] = []
+        ends: list[int] = []
+        merged: set[int] = set()
+        for row, (start, duration) in enumerate(zip(self.starts, self.durations, strict=True)):
+            end = start + int(duration * 1_000_000)
+            if rows and start - ends[-1] <= gap_us and all(codes[row] == codes[rows[-1]] for codes in columns):
+                ends[-1] = max(ends[-1], end)
+                merged.add(len(rows) - 1)
+            else:
+                rows.append(row)
+                ends.append(end)
+        if not merged:
+            return self
+        compacted = self.take(rows)
+        for index in merged:
+            compacted.durations[index] = (ends[index] - compacted.starts[index]) / 1_000_000
+        return compacted
+
+    def values(self, key: str) -> list[Any]:
+        """Return the distinct values of data ``key``, indexed by code."""
+        return self._values.get(key, [])
+
+    def ends(self) -> array:
+        """Return the end of every event in epoch microseconds."""
+        return array(
+            "q",
+            (start + int(duration * 1_000_000) for start, duration in zip(self.starts, self.durations, strict=True)),
+        )
+
+    def durations_by(self, key: str) -> dict[Any, float]:
+        """Sum event durations per distinct value of data ``key``.
+
+        Events without ``key`` are skipped. The sum runs over integer codes, so
+        no event is materialized. Lists and dicts, which cannot be dict keys,
+        are keyed by their canonical JSON.
+        """
+        codes = self.columns.get(key)
+        if codes is None:
+            return {}
+
+        totals: dict[int, float] = {}
+        for code, duration in zip(codes, self.durations, strict=True):
+            if code != MISSING:
+                totals[code] = totals.get(code, 0.0) + duration
+        values = self._values[key]
+        return {hashable(values[code]): total for code, total in totals.items()}
+
+    def nbytes(self) -> int:
+        """Estimate the memory held by this container in bytes."""
+        arrays = [self.ids, self.starts, self.durations, *self.columns.values()]
+        size = sum(a.itemsize * len(a) for a in arrays)
+        for values in self._values.values():
+            size += sys.getsizeof(values) + sum(sys.getsizeof(value) for value in values)
+        return size
+
+    def _encode(self, key: str, value: Any) -> int:
+        """Return the code of ``value`` in the dictionary of ``key``, adding it if new."""
+        codes = self._codes[key]
+        if isinstance(value, str):
+            lookup: Any = value
+        elif isinstance(value, int | float | bool | None):
+            # Keep True, 1 and 1.0 apart even though they compare equal
+            lookup = (type(value).__name__, value)
+        else:
+            lookup = ("json", json.dumps(value, sort_keys=True))
+        code = codes.get(lookup)
+        if code is None:
+            code = codes[lookup] = len(self._values[key])
+            self._values[key].append(sys.intern(value) if isinstance(value, str) else value)
+        return code
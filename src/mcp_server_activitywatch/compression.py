@@ -0,0 +1,81 @@
+"""ActivityWatch MCP Server - Compression codecs.
+
+This module provides the codecs used to store large results on disk. gzip is
+always available; zstd and brotli are used when the optional packages from the
+"compression" extra are installed.
+"""
+
+import gzip
+from collections.abc import Callable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Codec:
+    """A named compression codec."""
+
+    name: str
+    extension: str
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+CODECS: dict[str, Codec] = {
+    "gzip": Codec(
+        name="gzip",
+        extension="gz",
+        compress=lambda data: gzip.compress(data, compresslevel=6),
+        decompress=gzip.decompress,
+    ),
+}
+
+try:
+    import zstandard
+
+    CODECS["zstd"] = Codec(
+        name="zstd",
+        extension="zst",
+        compress=lambda data: zstandard.ZstdCompressor(level=3).compress(data),
+        decompress=lambda data: zstandard.ZstdDecompressor().decompress(data),
+    )
+except ImportError:
+    pass
+
+try:
+    import brotli
+
+    CODECS["br"] = Codec(
+        name="br",
+        extension="br",
+        compress=lambda data: brotli.compress(data, quality=5),
+        decompress=brotli.decompress,
+    )
+except ImportError:
+    pass
+
+
+def default_codec() -> str:
+    """Return the name of the best available codec."""
+    for name in ("zstd", "br", "gzip"):
+        if name in CODECS:
+            return name
+    return "gzip"
+
+
+def get_codec(name: str) -> Codec:
+    """Look up a codec by name.
+
+    Args:
+        name: Codec name ("gzip", "zstd" or "br")
+
+    Returns:
+        The matching codec
+
+    Raises:
+        ValueError: If the codec is unknown or its package is not installed
+    """
+    try:
+        return CODECS[name]
+    except KeyError:
+        available = ", ".join(sorted(CODECS))
+        raise ValueError(f"Unsupported codec '{name}' (available: {available})") from None
@@ -0,0 +1,191 @@
+"""ActivityWatch MCP Server - Delta "since" tokens.
+
+A since token lets a caller fetch only the events that were added or updated
+after a previous call. It records a cursor, the start of the latest event
+seen, and the durations of the events that still overlap that cursor.
+
+aw-server returns every event that ends at or after the requested ``start``,
+so fetching from the cursor returns the tail of the previous response plus
+anything new. Tail events whose duration grew were extended in place by
+heartbeats and are reported as updated; events not seen before are new.
+
+A watch token holds a since token per bucket, plus the bucket's
+``last_updated`` when it was read, so a long-poll only fetches events again
+once the bucket metadata shows a change.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from typing import Any
+
+from .events import event_end, event_key, event_start, parse_timestamp
+
+TOKEN_VERSION = 1
+
+
+@dataclass
+class SinceToken:
+    """Position in a bucket's event stream."""
+
+    cursor: str | None = None
+    seen: dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "SinceToken":
+        """Build a token from its decoded payload."""
+        return cls(cursor=payload.get("c"), seen=payload.get("s", {}))
+
+    def payload(self) -> dict[str, Any]:
+        """Return the payload the token is encoded from."""
+        return {"c": self.cursor, "s": self.seen}
+
+    @classmethod
+    def decode(cls, token: str) -> "SinceToken":
+        """Decode a token returned by a previous call.
+
+        An empty token starts a new delta stream.
+
+        Raises:
+            ValueError: If the token is malformed or from an incompatible version
+        """
+        if not token:
+            return cls()
+
+        return cls.from_payload(_decode_payload(token))
+
+    def encode(self) -> str:
+        """Encode the token for the caller."""
+        return _encode_payload(self.payload())
+
+    def start_for(self, start: str | None) -> str | None:
+        """Return the ``start`` to fetch from: the later of the cursor and the caller's start."""
+        if self.cursor is None:
+            return start
+        if start is None or parse_timestamp(self.cursor) > parse_timestamp(start):
+            return self.cursor
+        return start
+
+    def diff(self, events: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], list[str]]:
+        """Split a response fetched from the cursor into changes.
+
+        Args:
+            events: Events fetched with ``start_for``
+
+        Returns:
+            The added or updated events, and the keys of the updated ones
+        """
+        changed = []
+        updated = []
+        for event in events:
+            key = event_key(event)
+            if key not in self.seen:
+                changed.append(event)
+            elif event.get("duration", 0.0) != self.seen[key]:
+                changed.append(event)
+                updated.append(key)
+        return changed, updated
+
+    def page(
+        self, events: list[dict[str, Any]], limit: int | None
+    ) -> tuple[list[dict[str, Any]], list[str], "SinceToken"]:
+        """Split a response fetched from the cursor into at most ``limit`` changes, oldest first.
+
+        The next token only moves past the changes returned, so those beyond the
+        limit are returned by the next call rather than skipped.
+
+        Args:
+            events: Events fetched with ``start_for``, without an upstream limit
+            limit: Maximum number of changes returned (None for all)
+
+        Returns:
+            The added or updated events, the keys of the updated ones and the next token
+        """
+        changed, updated = self.diff(events)
+        if limit is None or len(changed) <= limit:
+            return changed, updated, self.advance(events)
+
+        kept = {event_key(event) for event in sorted(changed, key=event_start)[:limit]}
+        held = {event_key(event) for event in changed} - kept
+        following = self.advance([event for event in events if event_key(event) not in held])
+        # Held back updates keep their previous duration, so they are still reported as updates.
+        following = SinceToken(
+            cursor=following.cursor,
+            seen={**following.seen, **{key: self.seen[key] for key in held if key in self.seen}},
+        )
+        return (
+            [event for event in changed if event_key(event) in kept],
+            [key for key in updated if key in kept],
+            following,
+        )
+
+    def advance(self, events: list[dict[str, Any]]) -> "SinceToken":
+        """Return the token following a response fetched with ``start_for``."""
+        if not events:
+            return self
+
+        latest = max(events, key=event_start)
+        latest_start = event_start(latest)
+        return SinceToken(
+            cursor=latest["timestamp"],
+            seen={event_key(event): event.get("duration", 0.0) for event in events if event_end(event) >= latest_start},
+        )
+
+
+@dataclass
+class WatchToken:
+    """Position of a watch call in several buckets."""
+
+    buckets: dict[str, SinceToken] = field(default_factory=dict)
+    versions: dict[str, str | None] = field(default_factory=dict)
+
+    @classmethod
+    def decode(cls, token: str) -> "WatchToken":
+        """Decode a token returned by a previous watch call; an empty token starts a new watch.
+
+        Raises:
+            ValueError: If the token is malformed or from an incompatible version
+        """
+        if not token:
+            return cls()
+        buckets = _decode_payload(token).get("w")
+        if not isinstance(buckets, dict) or not all(isinstance(position, dict) for position in buckets.values()):
+            raise ValueError("Invalid since_token")
+        return cls(
+            buckets={bucket_id: SinceToken.from_payload(position) for bucket_id, position in buckets.items()},
+            versions={bucket_id: position.get("u") for bucket_id, position in buckets.items()},
+        )
+
+    def encode(self) -> str:
+        """Encode the token for the caller."""
+        return _encode_payload(
+            {
+                "w": {
+                    bucket_id: {**since.payload(), "u": self.versions.get(bucket_id)}
+                    for bucket_id, since in self.buckets.items()
+                }
+            }
+        )
+
+
+def _encode_payload(payload: dict[str, Any]) -> str:
+    """Encode a versioned token payload as URL-safe base64 JSON."""
+    payload = {"v": TOKEN_VERSION, **payload}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode("utf-8")).decode("ascii")
+
+
+def _decode_payload(token: str) -> dict[str, Any]:
+    """Decode a token encoded by ``_encode_payload``.
+
+    Raises:
+        ValueError: If the token is malformed or from an incompatible version
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (binascii.Error, UnicodeError, json.JSONDecodeError):
+        raise ValueError("Invalid since_token") from None
+
+    if not isinstance(payload, dict) or payload.get("v") != TOKEN_VERSION:
+        raise ValueError("Invalid since_token")
+    return payload
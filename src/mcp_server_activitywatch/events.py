@@ -0,0 +1,83 @@
+"""ActivityWatch MCP Server - Event helpers.
+
+Small helpers shared by the tools that work on ActivityWatch events in their
+wire format: ``{"id", "timestamp", "duration", "data"}``.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+
+def parse_timestamp(timestamp: str) -> datetime:
+    """Parse an ActivityWatch ISO 8601 timestamp into an aware datetime.
+
+    Naive timestamps are assumed to be UTC, like aw-server does.
+
+    Args:
+        timestamp: ISO 8601 string such as '2024-02-19T10:00:00.000Z'
+
+    Returns:
+        Timezone-aware datetime
+    """
+    parsed = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def event_start(event: dict[str, Any]) -> datetime:
+    """Return the start of ``event``."""
+    return parse_timestamp(event["timestamp"])
+
+
+def event_end(event: dict[str, Any]) -> datetime:
+    """Return the end of ``event`` (start plus duration)."""
+    return event_start(event) + timedelta(seconds=event.get("duration", 0.0))
+
+
+def event_key(event: dict[str, Any]) -> str:
+    """Return a stable identity for ``event``: its id, or its timestamp if it has none."""
+    return str(event.get("id", event["timestamp"]))
+
+
+def compact_events(events: list[dict[str, Any]], gap: float = 0.0) -> list[dict[str, Any]]:
+    """Merge runs of consecutive events with identical data that overlap, touch or are at most ``gap`` seconds apart.
+
+    Watchers send heartbeats, so window and AFK buckets hold long runs of
+    events with the same data; merging them loses no information but their
+    ids. A merged event keeps the id and timestamp of its first event and
+    lasts until the end of the last one. The pass is linear; events are
+    returned in their original order, oldest or newest first.
+
+    Args:
+        events: Events sorted by start, ascending or descending like aw-server returns them
+        gap: Largest gap in seconds between two events that are merged
+
+    Returns:
+        The compacted events; merged events are new dicts, the others are not copied
+    """
+    newest_first = len(events) > 1 and parse_timestamp(events[0]["timestamp"]) > parse_timestamp(
+        events[-1]["timestamp"]
+    )
+    ordered = reversed(events) if newest_first else events
+    compacted: list[dict[str, Any]] = []
+    run_start = run_end = None
+    merged = False
+    for event in ordered:
+        start = event_start(event)
+        end = start + timedelta(seconds=event.get("duration", 0.0))
+        last = compacted[-1] if compacted else None
+        if last is not None and last.get("data") == event.get("data") and (start - run_end).total_seconds() <= gap:
+            run_end = max(run_end, end)
+            merged = True
+            continue
+        if merged:
+            compacted[-1] = {**last, "duration": (run_end - run_start).total_seconds()}
+            merged = False
+        compacted.append(event)
+        run_start, run_end = start, end
+    if merged:
+        compacted[-1] = {**compacted[-1], "duration": (run_end - run_start).total_seconds()}
+    if newest_first:
+        compacted.reverse()
+    return compacted
@@ -0,0 +1,234 @@
+"""ActivityWatch MCP Server - Streaming bulk export to local files.
+
+Exports read each bucket one UTC day at a time through the event cache, and
+write every day to the file as soon as it is read, so memory is bounded by a
+day of events however long the range is. Each event is written once, in the
+day it starts in, unclipped; buckets are written one after the other in
+chronological order.
+
+Two formats are supported:
+
+- ``ndjson``: one compact JSON event per line, with its ``bucket_id``.
+- ``columnar``: the file starts with ``COLUMNAR_MAGIC`` and a format version,
+  followed by one row group per bucket and day, then an empty row group. A row
+  group is the size of its JSON header, the header (bucket, rows and the
+  distinct values of every data key), then little-endian arrays of ids
+  (int64, -1 if missing), start times (int64 epoch microseconds), durations
+  (float64 seconds) and, per data key in header order, int32 codes into its
+  values (-1 if missing), then a CRC-32 of the header and arrays.
+  ``read_columnar`` reads it back.
+
+Files are written to the export directory under a temporary name and renamed
+once complete; the result reports the rows and a SHA-256 per bucket and for the
+whole file. The directory is created private to the user, as the files are
+their activity history, and files are created readable by the user only.
+"""
+
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import uuid
+import zlib
+from array import array
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from fastmcp import Context
+
+from .cache import cache_directory, open_private, private_directory
+from .columnar import EventColumns
+
+EXPORT_FORMATS = {"ndjson": "ndjson", "columnar": "awcol"}
+
+COLUMNAR_MAGIC = b"AWMCPCOL"
+
+COLUMNAR_VERSION = 1
+
+HEADER = struct.Struct(">8sI")
+GROUP = struct.Struct(">I")
+CHECKSUM = struct.Struct(">I")
+
+FILENAME_PATTERN = re.compile(r"^[\w][\w.-]*$")
+
+
+def default_export_dir() -> str:
+    """Return the default directory exports are written to."""
+    return os.path.join(cache_directory(), "exports")
+
+
+def get_export_dir(ctx: Context | None) -> Path:
+    """Return the export directory from the lifespan context, or the default one."""
+    directory = ctx.lifespan_context.get("export_dir") if ctx else None
+    return Path(directory or default_export_dir())
+
+
+def _little_endian(values: array) -> bytes:
+    """Return the bytes of ``values`` in little-endian order."""
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _native(data: bytes, typecode: str) -> array:
+    """Read little-endian bytes into an array."""
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class ExportWriter:
+    """Writer of one export file, with row counts and checksums per bucket."""
+
+    def __init__(self, path: Path, export_format: str):
+        """Open a temporary file next to ``path``.
+
+        Args:
+            path: Final path of the export
+            export_format: "ndjson" or "columnar"
+
+        Raises:
+            PermissionError: If the directory of ``path`` belongs to another user
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format '{export_format}' (available: {', '.join(EXPORT_FORMATS)})")
+        self.path = path
+        self.format = export_format
+        self.buckets: dict[str, dict[str, Any]] = {}
+        self._digest = hashlib.sha256()
+        self._bucket_digests: dict[str, Any] = {}
+        private_directory(path.parent)
+        self._temporary = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        self._file: BinaryIO = open_private(self._temporary)
+        if export_format == "columnar":
+            self._write(None, HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION))
+
+    def _write(self, bucket_id: str | None, data: bytes) -> None:
+        """Write ``data``, adding it to the file checksum and to that of ``bucket_id``."""
+        self._file.write(data)
+        self._digest.update(data)
+        if bucket_id is not None:
+            self._bucket_digests[bucket_id].update(data)
+
+    def write(self, bucket_id: str, chunk: EventColumns) -> None:
+        """Append the events of ``chunk`` to the export."""
+        if bucket_id not in self.buckets:
+            self.buckets[bucket_id] = {"rows": 0}
+            self._bucket_digests[bucket_id] = hashlib.sha256()
+        if not len(chunk):
+            return
+        if self.format == "ndjson":
+            lines = [
+                json.dumps({"bucket_id": bucket_id, **event}, separators=(",", ":"), ensure_ascii=False)
+                for event in chunk
+            ]
+            self._write(bucket_id, ("\n".join(lines) + "\n").encode("utf-8"))
+        else:
+            self._write(bucket_id, encode_row_group(bucket_id, chunk))
+        self.buckets[bucket_id]["rows"] += len(chunk)
+
+    def close(self) -> dict[str, Any]:
+        """Finish the file, move it to its final path and return its summary."""
+        if self.format == "columnar":
+            self._write(None, GROUP.pack(0))
+        self._file.close()
+        os.replace(self._temporary, self.path)
+        for bucket_id, summary in self.buckets.items():
+            summary["sha256"] = self._bucket_digests[bucket_id].hexdigest()
+        return {
+            "path": str(self.path),
+            "format": self.format,
+            "rows": sum(summary["rows"] for summary in self.buckets.values()),
+            "bytes": self.path.stat().st_size,
+            "sha256": self._digest.hexdigest(),
+            "buckets": self.buckets,
+        }
+
+    def abort(self) -> None:
+        """Close and delete the unfinished file."""
+        self._file.close()
+        self._temporary.unlink(missing_ok=True)
+
+
+def encode_row_group(bucket_id: str, chunk: EventColumns) -> bytes:
+    """Encode one row group of the columnar format."""
+    keys = list(chunk.columns)
+    header = json.dumps(
+        {"bucket_id": bucket_id, "rows": len(chunk), "keys": keys, "values": [chunk.values(key) for key in keys]},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    body = b"".join(
+        [
+            header,
+            _little_endian(chunk.ids),
+            _little_endian(chunk.starts),
+            _little_endian(chunk.durations),
+            *(_little_endian(chunk.columns[key]) for key in keys),
+        ]
+    )
+    return GROUP.pack(len(header)) + body + CHECKSUM.pack(zlib.crc32(body))
+
+
+def read_columnar(path: str | Path) -> Iterator[tuple[str, EventColumns]]:
+    """Read a columnar export back, one row group at a time.
+
+    Yields:
+        The bucket and events of every row group, in file order
+
+    Raises:
+        ValueError: If the file is not a columnar export of this version, is truncated or corrupt
+    """
+    with Path(path).open("rb") as file:
+        magic, version = HEADER.unpack(file.read(HEADER.size))
+        if magic != COLUMNAR_MAGIC or version != COLUMNAR_VERSION:
+            raise ValueError(f"Not a columnar export of version {COLUMNAR_VERSION}: {path}")
+        while True:
+            prefix = file.read(GROUP.size)
+            if len(prefix) < GROUP.size:
+                raise ValueError(f"Truncated columnar export: {path}")
+            (header_size,) = GROUP.unpack(prefix)
+            if header_size == 0:
+                return
+            header_bytes = file.read(header_size)
+            header = json.loads(header_bytes)
+            rows, keys = header["rows"], header["keys"]
+            sizes = [8 * rows, 8 * rows, 8 * rows, *(4 * rows for _ in keys)]
+            arrays = file.read(sum(sizes))
+            (checksum,) = CHECKSUM.unpack(file.read(CHECKSUM.size))
+            if len(arrays) < sum(sizes) or zlib.crc32(header_bytes + arrays) != checksum:
+                raise ValueError(f"Corrupt row group in columnar export: {path}")
+
+            chunk = EventColumns()
+            offset = 0
+            parts = []
+            for size, typecode in zip(sizes, ["q", "q", "d", *("i" for _ in keys)], strict=True):
+                parts.append(_native(arrays[offset : offset + size], typecode))
+                offset += size
+            chunk.ids, chunk.starts, chunk.durations = parts[:3]
+            for key, codes, values in zip(keys, parts[3:], header["values"], strict=True):
+                chunk.columns[key] = codes
+                chunk._values[key] = []
+                chunk._codes[key] = {}
+                # Values are distinct, so they get back the codes they were written with.
+                for value in values:
+                    chunk._encode(key, value)
+            yield header["bucket_id"], chunk
+
+
+def export_path(ctx: Context | None, filename: str | None, export_format: str) -> Path:
+    """Return the path to export to: ``filename`` in the export directory, or a generated name.
+
+    Raises:
+        ValueError: If ``filename`` is not a plain file name
+    """
+    if filename is None:
+        filename = f"activitywatch-{uuid.uuid4().hex}.{EXPORT_FORMATS.get(export_format, export_format)}"
+    elif not FILENAME_PATTERN.match(filename) or filename.endswith(".tmp"):
+        raise ValueError(f"Invalid file name '{filename}': use letters, digits, '_', '-' and '.', without a directory")
+    return get_export_dir(ctx) / filename
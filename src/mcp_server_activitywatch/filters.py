@@ -0,0 +1,172 @@
+"""ActivityWatch MCP Server - Event projection and filters.
+
+``EventFilter`` keeps the events whose data matches key/value and regex
+filters and trims their data to the requested fields. It is applied while a
+response is streamed, element by element, so events that are dropped and data
+that is projected away are never collected or re-serialized, and to cached
+columnar chunks, where only the requested fields are materialized.
+"""
+
+import json
+import re
+from collections.abc import Callable, Iterable
+from contextlib import aclosing
+from typing import Any
+
+import httpx
+
+from .columnar import MISSING, EventColumns
+from .jsonio import JsonArrayParser
+from .progress import Progress
+
+STREAM_TIMEOUT = 10.0
+
+
+class EventFilter:
+    """Projection of event data to some keys plus equality and regex filters on data values."""
+
+    def __init__(
+        self,
+        fields: Iterable[str] | None = None,
+        where: dict[str, Any] | None = None,
+        match: dict[str, str] | None = None,
+    ):
+        """Create a filter.
+
+        Args:
+            fields: Data keys to keep; ``id``, ``timestamp`` and ``duration`` are always kept
+            where: Data key to the value it must equal
+            match: Data key to a regex searched case-insensitively in its value
+
+        Raises:
+            ValueError: If a regex is invalid
+        """
+        self.fields = list(fields) if fields is not None else None
+        self.where = dict(where or {})
+        self.match = dict(match or {})
+        self._tests: list[tuple[str, Callable[[Any], bool]]] = [
+            (key, lambda value, expected=expected: value == expected) for key, expected in self.where.items()
+        ]
+        for key, pattern in self.match.items():
+            try:
+                regex = re.compile(pattern, re.IGNORECASE)
+            except re.error as error:
+                raise ValueError(f"Invalid regex for '{key}': {error}") from error
+            self._tests.append((key, lambda value, regex=regex: regex.search(str(value)) is not None))
+
+    @classmethod
+    def from_query(cls, fields: str | None, where: str | None, match: str | None) -> "EventFilter":
+        """Create a filter from URI query parameters.
+
+        Args:
+            fields: Comma-separated data keys, e.g. 'app,title'
+            where: JSON object of data key to value, e.g. '{"app": "Firefox"}'
+            match: JSON object of data key to regex, e.g. '{"title": "github"}'
+
+        Raises:
+            ValueError: If ``where`` or ``match`` is not a JSON object
+        """
+
+        def parse_object(name: str, text: str | None) -> dict[str, Any] | None:
+            if not text:
+                return None
+            try:
+                parsed = json.loads(text)
+            except json.JSONDecodeError as error:
+                raise ValueError(f"{name} must be a JSON object: {error}") from error
+            if not isinstance(parsed, dict):
+                raise ValueError(f'{name} must be a JSON object, e.g. {{"app": "Firefox"}}')
+            return parsed
+
+        keys = [key.strip() for key in fields.split(",") if key.strip()] if fields else None
+        return cls(keys, parse_object("where", where), parse_object("match", match))
+
+    @property
+    def active(self) -> bool:
+        """Return True if the filter projects or drops anything."""
+        return self.fields is not None or bool(self._tests)
+
+    @property
+    def selective(self) -> bool:
+        """Return True if the filter can drop events."""
+        return bool(self._tests)
+
+    def matches(self, data: dict[str, Any]) -> bool:
+        """Return True if event ``data`` passes every filter."""
+        return all(key in data and test(data[key]) for key, test in self._tests)
+
+    def __call__(self, event: dict[str, Any]) -> dict[str, Any] | None:
+        """Return ``event`` projected to ``fields``, or None if it is filtered out."""
+        data = event.get("data") or {}
+        if not self.matches(data):
+            return None
+        if self.fields is not None:
+            event["data"] = {key: data[key] for key in self.fields if key in data}
+        return event
+
+    def mask(self, chunk: EventColumns) -> list[bool] | None:
+        """Return whether each row of ``chunk`` passes, testing every distinct value once, or None if all do."""
+        if not self._tests:
+            return None
+        mask = [True] * len(chunk)
+        for key, test in self._tests:
+            codes = chunk.columns.get(key)
+            if codes is None:
+                return [False] * len(chunk)
+            passes = [test(value) for value in chunk.values(key)]
+            mask = [kept and code != MISSING and passes[code] for kept, code in zip(mask, codes, strict=True)]
+        return mask
+
+
+async def stream_events(
+    client: httpx.AsyncClient,
+    url: str,
+    event_filter: EventFilter,
+    limit: int | None = None,
+    progress: Progress | None = None,
+) -> tuple[list[dict[str, Any]], int]:
+    """Fetch events, filtering and projecting each one as it is decoded from the stream.
+
+    Args:
+        client: HTTP client
+        url: Events URL including its query string
+        event_filter: Filter to apply to every event
+        limit: Stop reading once this many events passed the filter
+        progress: Advanced by the events decoded from every block received
+
+    Returns:
+        The events that passed and the number of bytes read
+
+    Raises:
+        httpx.HTTPStatusError: If aw-server answers with an error
+    """
+    events: list[dict[str, Any]] = []
+    received = 0
+    async with client.stream("GET", url, timeout=STREAM_TIMEOUT) as response:
+        if response.is_error:
+            # Read the body so error handlers can show its details.
+            await response.aread()
+            response.raise_for_status()
+
+        async def decoded():
+            nonlocal received
+            parser = JsonArrayParser()
+            async for data in response.aiter_bytes():
+                received += len(data)
+                items = parser.feed(data)
+                if progress is not None and items:
+                    await progress.advance(len(items))
+                for item in items:
+                    yield item
+            for item in parser.close():
+                yield item
+
+        async with aclosing(decoded()) as items:
+            async for event in items:
+                projected = event_filter(event)
+                if projected is None:
+                    continue
+                events.append(projected)
+                if limit is not None and len(events) >= limit:
+                    break
+    return events, received
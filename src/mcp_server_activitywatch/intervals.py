@@ -0,0 +1,50 @@
+"""ActivityWatch MCP Server - Time range helpers.
+
+Ranges are ``(start, end)`` tuples of epoch microseconds, half-open.
+"""
+
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+
+
+def merge_ranges(ranges: Iterable[tuple[int, int]], gap: int = 0) -> list[tuple[int, int]]:
+    """Sort ranges and merge those that overlap or are at most ``gap`` apart."""
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + gap:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def intersect_ranges(left: list[tuple[int, int]], right: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Intersect two sorted, merged range lists, dropping empty intersections."""
+    result = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        start = max(left[i][0], right[j][0])
+        end = min(left[i][1], right[j][1])
+        if start < end:
+            result.append((start, end))
+        if left[i][1] < right[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def clip_to_ranges(
+    start: int, end: int, ranges: list[tuple[int, int]], range_starts: list[int]
+) -> Iterator[tuple[int, int]]:
+    """Yield the non-empty parts of ``[start, end)`` within sorted, merged ``ranges``.
+
+    ``range_starts`` are the starts of ``ranges``, used to find the first candidate by binary search.
+    """
+    index = max(bisect_right(range_starts, start) - 1, 0)
+    while index < len(ranges) and ranges[index][0] < end:
+        clipped_start, clipped_end = max(start, ranges[index][0]), min(end, ranges[index][1])
+        if clipped_start < clipped_end:
+            yield clipped_start, clipped_end
+        index += 1
@@ -0,0 +1,175 @@
+"""ActivityWatch MCP Server - Size-aware JSON decoding and encoding.
+
+Decoding a multi-megabyte events response or pretty-printing it again blocks
+the event loop, and with it every other concurrent MCP request. ``JsonCodec``
+keeps small payloads inline, where a worker hand-off would cost more than the
+work itself, and runs payloads above a configurable threshold in a worker
+thread or process pool.
+
+``JsonArrayParser`` decodes a JSON array incrementally, element by element, so
+a streamed response can be filtered without holding the whole body.
+"""
+
+import asyncio
+import codecs
+import functools
+import io
+import json
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+from fastmcp import Context
+
+DEFAULT_THRESHOLD = 256 * 1024
+
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def encode(obj: Any, indent: int | None = 2) -> str:
+    """Encode ``obj`` like ``json.dumps``, writing indented output piece by piece.
+
+    ``json.dumps`` with an indent keeps every token in a list until it joins
+    them, which peaks at several times the size of the text; a ``StringIO``
+    only grows by the text itself.
+    """
+    if indent is None:
+        return json.dumps(obj)
+    buffer = io.StringIO()
+    for chunk in json.JSONEncoder(indent=indent).iterencode(obj):
+        buffer.write(chunk)
+    return buffer.getvalue()
+
+
+class JsonCodec:
+    """JSON decoder and encoder that moves large payloads off the event loop."""
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD, mode: str = "thread", workers: int = 2):
+        """Create a codec.
+
+        Args:
+            threshold: Payload size in bytes above which work is offloaded (0 offloads everything)
+            mode: "thread" for a thread pool, "process" for a process pool, or "inline" to never offload
+            workers: Number of pool workers
+        """
+        if mode not in ("thread", "process", "inline"):
+            raise ValueError(f"Unsupported JSON offload mode '{mode}' (available: thread, process, inline)")
+        self.threshold = threshold
+        self.mode = mode
+        self.workers = workers
+        self._executor: Executor | None = None
+
+    def _offloads(self, size: int) -> bool:
+        """Return True if a payload of ``size`` bytes should leave the event loop."""
+        return self.mode != "inline" and size > self.threshold
+
+    def _get_executor(self) -> Executor:
+        """Return the worker pool, creating it on first use."""
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="aw-json")
+        return self._executor
+
+    async def _run(self, fn: Any, *args: Any) -> Any:
+        """Run ``fn(*args)`` in the worker pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+
+    async def loads(self, content: bytes) -> Any:
+        """Decode a JSON document, such as ``response.content``."""
+        if self._offloads(len(content)):
+            return await self._run(json.loads, content)
+        return json.loads(content)
+
+    async def dumps(self, obj: Any, size_hint: int, indent: int | None = 2) -> str:
+        """Encode ``obj`` as JSON.
+
+        Args:
+            obj: The object to encode
+            size_hint: Expected encoded size in bytes, usually the size of the response it was decoded from
+            indent: Indentation passed to ``json.dumps``
+
+        Returns:
+            The JSON text
+        """
+        if self._offloads(size_hint):
+            return await self._run(functools.partial(encode, indent=indent), obj)
+        return encode(obj, indent=indent)
+
+    def close(self) -> None:
+        """Shut the worker pool down."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class JsonArrayParser:
+    """Incremental decoder of a top-level JSON array fed in arbitrary byte chunks."""
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._opened = False
+        self._closed = False
+
+    def feed(self, data: bytes) -> list[Any]:
+        """Add the next bytes of the document and return the elements completed by them."""
+        self._buffer += self._utf8.decode(data)
+        return self._drain(final=False)
+
+    def close(self) -> list[Any]:
+        """Return the remaining elements once the whole document has been fed.
+
+        Raises:
+            ValueError: If the document is not a complete JSON array
+        """
+        self._buffer += self._utf8.decode(b"", final=True)
+        items = self._drain(final=True)
+        if not self._closed:
+            raise ValueError("Truncated JSON array")
+        return items
+
+    def _drain(self, final: bool) -> list[Any]:
+        """Decode every complete element in the buffer."""
+        items = []
+        buffer, pos = self._buffer, 0
+        while True:
+            pos = _SEPARATORS.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            if not self._opened:
+                if buffer[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                self._opened = True
+                pos += 1
+                continue
+            if self._closed:
+                raise ValueError("Extra data after JSON array")
+            if buffer[pos] == "]":
+                self._closed = True
+                pos += 1
+                continue
+            try:
+                item, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break
+            # A number or literal at the end of the buffer may continue in the next chunk.
+            if end == len(buffer) and not final and buffer[end - 1] not in '}]"':
+                break
+            items.append(item)
+            pos = end
+        self._buffer = buffer[pos:]
+        return items
+
+
+_default_codec = JsonCodec()
+
+
+def get_json_codec(ctx: Context | None) -> JsonCodec:
+    """Return the JSON codec configured in the lifespan context, or the default one."""
+    codec = ctx.lifespan_context.get("json_codec") if ctx else None
+    return codec or _default_codec
@@ -0,0 +1,204 @@
+"""ActivityWatch MCP Server - Named, parameterized queries.
+
+Operators register AQL templates in a JSON file passed with ``--queries-file``
+or ``AW_QUERIES_FILE``::
+
+    {
+      "queries": {
+        "app-usage": {
+          "description": "Time per app, optionally only some apps",
+          "query": "events = query_bucket({{ window }}); events = filter_keyvals(events, \\"app\\", {{ apps }}); ...",
+          "params": {
+            "window": {"type": "bucket", "default": "aw-watcher-window_*"},
+            "apps": {"type": "string_list", "description": "Apps to keep"}
+          },
+          "timeperiods": ["today"]
+        }
+      }
+    }
+
+Templates are parsed and brought to canonical form once, when the file is loaded.
+Parameters are rendered as JSON literals, so values cannot inject statements,
+and list values are sorted, so equivalent calls render the same query text
+and share cached results.
+"""
+
+import fnmatch
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastmcp import Context
+
+from .aql import AQLSyntaxError, AQLUnsupportedError, parse_query
+from .chunks import resolve_period
+
+PARAM_TYPES = ("string", "number", "string_list", "bucket")
+
+PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+
+
+@dataclass(frozen=True)
+class QueryParam:
+    """A typed template parameter.
+
+    Attributes:
+        type: One of ``PARAM_TYPES``; a bucket is an ID or a glob pattern such as 'aw-watcher-window_*'
+        description: Shown to clients listing the query
+        default: Value used when the parameter is not given; required if None
+    """
+
+    type: str
+    description: str = ""
+    default: Any = None
+
+    def check(self, name: str, value: Any) -> Any:
+        """Return ``value`` validated and normalized for this parameter.
+
+        Raises:
+            ValueError: If the value does not have the parameter's type
+        """
+        if self.type in ("string", "bucket"):
+            valid = isinstance(value, str)
+        elif self.type == "number":
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+        else:
+            valid = isinstance(value, list) and all(isinstance(item, str) for item in value)
+            if valid:
+                value = sorted(set(value))
+        if not valid:
+            raise ValueError(f"Parameter '{name}' must be a {self.type.replace('_', ' ')}, got {value!r}")
+        return value
+
+
+@dataclass(frozen=True)
+class NamedQuery:
+    """A validated query template."""
+
+    name: str
+    query: str
+    params: dict[str, QueryParam] = field(default_factory=dict)
+    description: str = ""
+    timeperiods: tuple[str, ...] = ()
+
+    @classmethod
+    def from_config(cls, name: str, config: dict[str, Any]) -> "NamedQuery":
+        """Build and validate a template from its configuration.
+
+        Raises:
+            ValueError: If the template is malformed or its placeholders do not match its parameters
+        """
+        if not isinstance(config.get("query"), str):
+            raise ValueError(f"Named query '{name}' needs a query string")
+        params = {}
+        for param_name, param_config in config.get("params", {}).items():
+            param_type = param_config.get("type", "string")
+            if param_type not in PARAM_TYPES:
+                raise ValueError(
+                    f"Parameter '{param_name}' of '{name}' has unknown type '{param_type}' "
+                    f"(available: {', '.join(PARAM_TYPES)})"
+                )
+            param = QueryParam(param_type, param_config.get("description", ""), param_config.get("default"))
+            if param.default is not None:
+                param.check(param_name, param.default)
+            params[param_name] = param
+
+        try:
+            query = parse_query(config["query"], placeholders=True).canonical
+        except AQLUnsupportedError:
+            # Left for aw-server to parse.
+            query = config["query"]
+        except AQLSyntaxError as error:
+            raise ValueError(f"Named query '{name}' is malformed: {error}") from error
+        used = set(PLACEHOLDER.findall(query))
+        undeclared, unused = sorted(used - params.keys()), sorted(params.keys() - used)
+        if undeclared:
+            raise ValueError(f"Named query '{name}' uses undeclared parameters: {', '.join(undeclared)}")
+        if unused:
+            raise ValueError(f"Named query '{name}' declares unused parameters: {', '.join(unused)}")
+        for period in config.get("timeperiods", []):
+            resolve_period(period)
+        return cls(name, query, params, config.get("description", ""), tuple(config.get("timeperiods", ())))
+
+    def bind(self, values: dict[str, Any]) -> dict[str, Any]:
+        """Return the value of every parameter, checked, with defaults filled in.
+
+        Raises:
+            ValueError: If a parameter is unknown, missing or of the wrong type
+        """
+        unknown = values.keys() - self.params.keys()
+        if unknown:
+            raise ValueError(f"Unknown parameters for '{self.name}': {', '.join(sorted(unknown))}")
+        bound = {}
+        for name, param in self.params.items():
+            value = values.get(name, param.default)
+            if value is None:
+                raise ValueError(f"Missing required parameter '{name}' for '{self.name}'")
+            bound[name] = param.check(name, value)
+        return bound
+
+    def render(self, bound: dict[str, Any]) -> str:
+        """Return the query text with bound, already resolved parameter values filled in."""
+        return PLACEHOLDER.sub(lambda match: json.dumps(bound[match.group(1)], separators=(",", ":")), self.query)
+
+    def describe(self) -> dict[str, Any]:
+        """Return the template's name, description, parameters and default periods."""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "params": {
+                name: {"type": param.type, "description": param.description, "default": param.default}
+                for name, param in self.params.items()
+            },
+            "timeperiods": list(self.timeperiods),
+        }
+
+
+class QueryRegistry:
+    """Named queries by name."""
+
+    def __init__(self, queries: list[NamedQuery] | None = None):
+        self.queries = {query.name: query for query in queries or []}
+
+    @classmethod
+    def load(cls, path: str) -> "QueryRegistry":
+        """Load and validate the named queries of a JSON file.
+
+        Raises:
+            ValueError: If the file is not valid JSON or a template is malformed
+        """
+        with open(path, encoding="utf-8") as file:
+            try:
+                config = json.load(file)
+            except json.JSONDecodeError as error:
+                raise ValueError(f"Invalid named queries file {path}: {error}") from error
+        return cls([NamedQuery.from_config(name, query) for name, query in config.get("queries", {}).items()])
+
+    def get(self, name: str) -> NamedQuery:
+        """Return the named query.
+
+        Raises:
+            KeyError: If there is no query of that name
+        """
+        return self.queries[name]
+
+
+def resolve_bucket(pattern: str, buckets: dict[str, Any]) -> str:
+    """Resolve a bucket ID or glob pattern to the ID of the most recently updated matching bucket.
+
+    Raises:
+        ValueError: If no bucket matches
+    """
+    if pattern in buckets:
+        return pattern
+    matches = [bucket_id for bucket_id in buckets if fnmatch.fnmatchcase(bucket_id, pattern)]
+    if not matches:
+        raise ValueError(f"No bucket matches '{pattern}'")
+    return max(matches, key=lambda bucket_id: (buckets[bucket_id].get("last_updated") or "", bucket_id))
+
+
+def get_query_registry(ctx: Context | None) -> QueryRegistry:
+    """Return the named queries configured in the lifespan context, or an empty registry."""
+    registry = ctx.lifespan_context.get("query_registry") if ctx else None
+    return registry or QueryRegistry()
@@ -0,0 +1,105 @@
+"""ActivityWatch MCP Server - Large result offloading.
+
+Results larger than a configurable threshold are written to a compressed file
+and replaced by a small JSON stub that references them via the
+``activitywatch://results/{result_id}`` resource, instead of being inlined into
+the tool response.
+"""
+
+import asyncio
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import Any
+
+from fastmcp import Context
+
+from .cache import cache_directory, private_directory, write_private
+from .compression import CODECS, get_codec
+
+RESULT_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def default_offload_dir() -> str:
+    """Return the default directory offloaded results are written to, in the user's cache directory."""
+    return os.path.join(cache_directory(), "results")
+
+
+class ResultStore:
+    """Directory of compressed results that were too large to inline."""
+
+    def __init__(self, directory: str | Path, threshold: int, codec: str = "gzip"):
+        """Create a result store.
+
+        Args:
+            directory: Directory the compressed results are written to
+            threshold: Size in bytes above which results are offloaded (0 disables offloading)
+            codec: Compression codec name (see ``compression.CODECS``)
+        """
+        self.directory = Path(directory)
+        self.threshold = threshold
+        self.codec = get_codec(codec)
+
+    def should_offload(self, text: str) -> bool:
+        """Return True if ``text`` encodes to more UTF-8 bytes than the threshold."""
+        if self.threshold <= 0:
+            return False
+        # A character encodes to 1 to 4 bytes, so only texts near the threshold are encoded to decide.
+        if len(text) > self.threshold or len(text) * 4 <= self.threshold:
+            return len(text) > self.threshold
+        return len(text.encode("utf-8")) > self.threshold
+
+    def save(self, text: str) -> dict[str, Any]:
+        """Compress ``text`` to a new file and return a stub describing it."""
+        private_directory(self.directory)
+        result_id = uuid.uuid4().hex
+        raw = text.encode("utf-8")
+        compressed = self.codec.compress(raw)
+        path = self.directory / f"{result_id}.json.{self.codec.extension}"
+        write_private(path, compressed)
+
+        return {
+            "offloaded": True,
+            "uri": f"activitywatch://results/{result_id}",
+            "path": str(path),
+            "codec": self.codec.name,
+            "size_bytes": len(raw),
+            "compressed_bytes": len(compressed),
+            "hint": "The result was too large to inline. Read the resource URI to retrieve it.",
+        }
+
+    def load(self, result_id: str) -> str:
+        """Load and decompress a previously offloaded result.
+
+        Raises:
+            FileNotFoundError: If no result with this id exists
+        """
+        if not RESULT_ID_PATTERN.match(result_id):
+            raise FileNotFoundError(result_id)
+
+        for path in self.directory.glob(f"{result_id}.json.*"):
+            codec = next((c for c in CODECS.values() if path.name.endswith(f".{c.extension}")), None)
+            if codec is not None:
+                return codec.decompress(path.read_bytes()).decode("utf-8")
+
+        raise FileNotFoundError(result_id)
+
+
+async def offload_if_large(text: str, ctx: Context | None) -> str:
+    """Offload ``text`` to the result store if it exceeds the configured threshold.
+
+    Args:
+        text: Serialized tool result
+        ctx: MCP context with lifespan data containing the result store
+
+    Returns:
+        The original text, or a JSON stub referencing the offloaded result
+    """
+    store: ResultStore | None = ctx.lifespan_context.get("result_store") if ctx else None
+    if store is None or not store.should_offload(text):
+        return text
+
+    stub = await asyncio.to_thread(store.save, text)
+    return json.dumps(stub, indent=2)
@@ -0,0 +1,416 @@
+"""ActivityWatch MCP Server - Cost-based fetch planning.
+
+Tools that read a time range can get their data in several ways:
+
+- ``direct``: one request to aw-server for the whole range
+- ``cache``: whole days already held in the event cache, without any request
+- ``sharded``: one request per uncached day, run concurrently; settled days are
+  cached as a side effect, so later requests over them become ``cache`` plans
+- ``pushdown``: an aggregation run by aw-server's ``/query/`` endpoint, so only
+  the small result is transferred
+
+The planner estimates the size of a range from the event cache and aw-server's
+per-bucket event count, prices every applicable strategy with a simple
+``CostModel`` and picks the cheapest. Tools expose the plan, with its
+estimates and timings, in an explain mode, so the model can be tuned.
+"""
+
+import asyncio
+import json
+import math
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import httpx
+from fastmcp import Context
+
+from .aql import AQLSyntaxError, canonical_query, parse_query
+from .cache import get_event_cache
+from .chunks import SETTLE_US, chunk_cache_key, day_windows, load_day_chunk, now_us
+from .client import DEFAULT_API_BASE
+from .columnar import MISSING, EventColumns, from_epoch_us, hashable, to_epoch_us
+from .filters import EventFilter
+from .jsonio import get_json_codec
+from .progress import Progress, gather
+
+DIRECT = "direct"
+CACHE = "cache"
+SHARDED = "sharded"
+PUSHDOWN = "pushdown"
+
+# Requests with a limit up to this size are served directly without estimating the range.
+DIRECT_LIMIT = 10_000
+
+
+@dataclass
+class CostModel:
+    """Estimated costs, in milliseconds, that the planner compares.
+
+    Attributes:
+        request_ms: Round trip of a request; concurrent requests overlap
+        request_overhead_ms: Work per request that does not overlap
+        query_ms: Fixed cost of running a query on aw-server
+        remote_us_per_event: aw-server reading and sending one event; overlaps across requests
+        decode_us_per_event: Decoding one event locally
+        local_us_per_event: Reading one cached event
+        pushdown_us_per_event: aw-server aggregating one event in a query
+        shard_concurrency: Concurrent requests of a sharded fetch
+    """
+
+    request_ms: float = 20.0
+    request_overhead_ms: float = 2.0
+    query_ms: float = 50.0
+    remote_us_per_event: float = 15.0
+    decode_us_per_event: float = 5.0
+    local_us_per_event: float = 1.0
+    pushdown_us_per_event: float = 4.0
+    shard_concurrency: int = 4
+
+    def direct(self, events: int) -> float:
+        """Cost of fetching ``events`` in one request."""
+        return (
+            self.request_ms
+            + self.request_overhead_ms
+            + events * (self.remote_us_per_event + self.decode_us_per_event) / 1000
+        )
+
+    def sharded(self, days: int, events: int, cached_events: int) -> float:
+        """Cost of fetching ``events`` in ``days`` concurrent requests plus reading ``cached_events``."""
+        concurrency = max(min(self.shard_concurrency, days), 1)
+        return (
+            math.ceil(days / concurrency) * self.request_ms
+            + days * self.request_overhead_ms
+            + events * (self.remote_us_per_event / concurrency + self.decode_us_per_event) / 1000
+            + cached_events * self.local_us_per_event / 1000
+        )
+
+    def cache(self, cached_events: int) -> float:
+        """Cost of reading ``cached_events`` from the event cache."""
+        return cached_events * self.local_us_per_event / 1000
+
+    def pushdown(self, events: int) -> float:
+        """Cost of aggregating ``events`` on aw-server."""
+        return self.query_ms + events * self.pushdown_us_per_event / 1000
+
+
+@dataclass
+class Plan:
+    """The strategy chosen for a request and what it was based on."""
+
+    strategy: str
+    reason: str
+    estimated_events: int | None = None
+    days: int = 0
+    cached_days: int = 0
+    costs: dict[str, float] = field(default_factory=dict)
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def choose(self, costs: dict[str, float]) -> None:
+        """Pick the cheapest of ``costs``."""
+        self.costs = {strategy: round(cost, 3) for strategy, cost in costs.items()}
+        self.strategy = min(costs, key=costs.__getitem__)
+        self.reason = f"lowest estimated cost ({self.costs[self.strategy]} ms)"
+
+    def explain(self) -> dict[str, Any]:
+        """Return the plan as a JSON-serializable dict."""
+        return asdict(self)
+
+
+class Timer:
+    """Records the duration of planning and execution phases on a plan, in milliseconds."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+
+    def lap(self, plan: Plan, phase: str) -> None:
+        """Record the time since the previous lap as ``phase``."""
+        now = time.perf_counter()
+        plan.timings[f"{phase}_ms"] = round((now - self.started) * 1000, 3)
+        self.started = now
+
+
+def get_cost_model(ctx: Context | None) -> CostModel:
+    """Return the cost model from the lifespan context, or the default model."""
+    model = ctx.lifespan_context.get("cost_model") if ctx else None
+    return model or CostModel()
+
+
+async def count_events(
+    ctx: Context | None, client: httpx.AsyncClient, bucket_id: str, start_us: int, end_us: int
+) -> int | None:
+    """Return aw-server's count of events in a range, or None if it cannot tell.
+
+    Raises:
+        httpx.HTTPStatusError: If the bucket does not exist
+    """
+    api_base = ctx.lifespan_context.get("api_base", DEFAULT_API_BASE) if ctx else DEFAULT_API_BASE
+    try:
+        response = await client.get(
+            f"{api_base}/buckets/{bucket_id}/events/count",
+            params={"start": from_epoch_us(start_us), "end": from_epoch_us(end_us)},
+            timeout=10.0,
+        )
+        response.raise_for_status()
+        return int(response.json())
+    except httpx.HTTPStatusError as error:
+        if error.response.status_code == 404:
+            raise
+        return None
+    except (httpx.RequestError, ValueError, TypeError):
+        return None
+
+
+async def cached_days(
+    ctx: Context | None, bucket_id: str, windows: list[tuple[int, int, int]], compacted: bool = True
+) -> tuple[int, int]:
+    """Return how many days of ``windows`` are in the event cache and how many events they hold.
+
+    ``compacted`` selects the days compacted with the server's gap or the uncompacted ones, as for ``load_day_chunk``.
+    """
+    cache = get_event_cache(ctx)
+    if cache is None:
+        return 0, 0
+    days = events = 0
+    for day_start, _, _ in windows:
+        chunk = await cache.apeek(chunk_cache_key(ctx, bucket_id, day_start, compacted))
+        if chunk is not None:
+            days += 1
+            events += len(chunk)
+    return days, events
+
+
+async def plan_events(
+    ctx: Context | None,
+    client: httpx.AsyncClient,
+    bucket_id: str,
+    start: str | None,
+    end: str | None,
+    limit: int | None,
+    compacted: bool = True,
+) -> Plan:
+    """Plan a raw event fetch: ``direct``, ``cache`` or ``sharded``.
+
+    ``compacted`` is passed on to ``cached_days``, as the plan is executed with it.
+    """
+    if not start:
+        return Plan(DIRECT, "no start time; one request returns the newest events")
+    if limit is not None and limit <= DIRECT_LIMIT:
+        return Plan(DIRECT, f"limit of {limit} events is served by one request")
+
+    start_us = to_epoch_us(start)
+    end_us = to_epoch_us(end) if end else now_us()
+    windows = day_windows(start_us, end_us)
+    cached, cached_events = await cached_days(ctx, bucket_id, windows, compacted)
+    plan = Plan(DIRECT, "", days=len(windows), cached_days=cached)
+    model = get_cost_model(ctx)
+
+    if cached == len(windows):
+        plan.estimated_events = cached_events
+        plan.choose({CACHE: model.cache(cached_events)})
+        plan.reason = "every day of the range is cached"
+        return plan
+    if len(windows) == 1:
+        plan.reason = "range within one day"
+        return plan
+
+    estimated = await count_events(ctx, client, bucket_id, start_us, end_us)
+    if estimated is None:
+        plan.reason = "event count unavailable"
+        return plan
+    plan.estimated_events = estimated
+    uncached_events = max(estimated - cached_events, 0)
+    plan.choose(
+        {
+            DIRECT: model.direct(estimated if limit is None else min(estimated, limit)),
+            SHARDED: model.sharded(len(windows) - cached, uncached_events, cached_events),
+        }
+    )
+    return plan
+
+
+async def plan_aggregate(
+    ctx: Context | None, client: httpx.AsyncClient, bucket_id: str, start_us: int, end_us: int
+) -> Plan:
+    """Plan an aggregation over a range: ``cache``, ``sharded`` or ``pushdown``."""
+    windows = day_windows(start_us, end_us)
+    cached, cached_events = await cached_days(ctx, bucket_id, windows)
+    plan = Plan(SHARDED, "", days=len(windows), cached_days=cached)
+    model = get_cost_model(ctx)
+
+    if cached == len(windows):
+        plan.estimated_events = cached_events
+        plan.choose({CACHE: model.cache(cached_events)})
+        plan.reason = "every day of the range is cached"
+        return plan
+
+    estimated = await count_events(ctx, client, bucket_id, start_us, end_us)
+    if estimated is None:
+        plan.reason = "event count unavailable"
+        return plan
+    plan.estimated_events = estimated
+    uncached_events = max(estimated - cached_events, 0)
+    plan.choose(
+        {
+            # Local aggregation reads every event once more after fetching it.
+            SHARDED: model.sharded(len(windows) - cached, uncached_events, cached_events)
+            + model.cache(uncached_events),
+            PUSHDOWN: model.pushdown(estimated),
+        }
+    )
+    return plan
+
+
+def query_cache_key(api_base: str, query: str, timeperiods: list[str]) -> tuple | None:
+    """Return the cache key of a query, or None if a period may still change or the query has no canonical text."""
+    settled_before = now_us() - SETTLE_US
+    for period in timeperiods:
+        try:
+            period_end = to_epoch_us(period.split("/")[-1])
+        except ValueError:
+            return None
+        if period_end > settled_before:
+            return None
+    try:
+        canonical = canonical_query(query)
+    except AQLSyntaxError:
+        return None
+    return ("query", api_base, canonical, tuple(timeperiods)) if canonical is not None else None
+
+
+async def plan_query(
+    ctx: Context | None,
+    client: httpx.AsyncClient,
+    query: str,
+    timeperiods: list[str],
+    estimate: bool = False,
+) -> Plan:
+    """Plan a query: ``cache`` if its result over settled periods is cached, else ``pushdown``.
+
+    Args:
+        estimate: Also estimate the events the query scans, which costs a request per bucket
+    """
+    api_base = ctx.lifespan_context.get("api_base", DEFAULT_API_BASE) if ctx else DEFAULT_API_BASE
+    cache = get_event_cache(ctx)
+    key = query_cache_key(api_base, query, timeperiods)
+    plan = Plan(PUSHDOWN, "query results are not cached for unsettled periods or syntax not parsed locally")
+
+    if estimate:
+        total = 0
+        try:
+            buckets = parse_query(query).buckets
+        except AQLSyntaxError:
+            buckets = []
+        for bucket_id in sorted(set(buckets)):
+            for period in timeperiods:
+                try:
+                    start, end = (to_epoch_us(part) for part in period.split("/"))
+                except ValueError:
+                    continue
+                total += await count_events(ctx, client, bucket_id, start, end) or 0
+        plan.estimated_events = total
+
+    if key is not None and cache is not None:
+        if await cache.apeek(key) is not None:
+            plan.strategy, plan.reason = CACHE, "result of the same query over settled periods is cached"
+        else:
+            plan.reason = "not cached yet; the result will be cached"
+    return plan
+
+
+async def fetch_events_sharded(
+    ctx: Context | None,
+    client: httpx.AsyncClient,
+    bucket_id: str,
+    start: str,
+    end: str | None,
+    limit: int | None,
+    event_filter: EventFilter | None = None,
+    progress: Progress | None = None,
+    compacted: bool = True,
+) -> list[dict[str, Any]]:
+    """Fetch a range one day at a time, concurrently, and merge it like aw-server's events endpoint.
+
+    Cached days are read from the event cache, so this also executes ``cache`` plans.
+    With ``event_filter``, ``limit`` counts the events that pass it. ``progress``
+    is advanced by one step per day read; if one day fails, the others are cancelled.
+    With ``compacted`` False, days are read uncompacted whatever the server's gap.
+    """
+    start_us = to_epoch_us(start)
+    end_us = to_epoch_us(end) if end else now_us()
+    settled_before = now_us() - SETTLE_US
+    semaphore = asyncio.Semaphore(get_cost_model(ctx).shard_concurrency)
+
+    async def load(day_start: int, window_start: int, window_end: int) -> EventColumns:
+        async with semaphore:
+            chunk = await load_day_chunk(
+                ctx, client, bucket_id, day_start, window_start, window_end, settled_before, compacted
+            )
+        if progress is not None:
+            await progress.advance(events=len(chunk))
+        return chunk
+
+    chunks = await gather(*(load(*window) for window in day_windows(start_us, end_us)))
+    return select_events(chunks, start_us, end_us, limit, event_filter)
+
+
+def select_events(
+    chunks: list[EventColumns],
+    start_us: int,
+    end_us: int,
+    limit: int | None = None,
+    event_filter: EventFilter | None = None,
+) -> list[dict[str, Any]]:
+    """Return the events of ``chunks`` overlapping a range, unclipped, deduplicated and newest first.
+
+    Events crossing midnight are held by the chunks of both days; they are
+    returned once. Rows failing ``event_filter`` are skipped before any event
+    is materialized, and only its fields are.
+    """
+    seen = set()
+    rows = []
+    for chunk in chunks:
+        mask = event_filter.mask(chunk) if event_filter else None
+        for row, (event_start, event_end) in enumerate(zip(chunk.starts, chunk.ends(), strict=True)):
+            if event_start > end_us or event_end < start_us or (mask is not None and not mask[row]):
+                continue
+            event_id = chunk.ids[row]
+            key = event_id if event_id != MISSING else (event_start, chunk.durations[row])
+            if key in seen:
+                continue
+            seen.add(key)
+            rows.append((event_start, chunk, row))
+
+    rows.sort(key=lambda item: item[0], reverse=True)
+    if limit is not None:
+        rows = rows[:limit]
+    fields = event_filter.fields if event_filter else None
+    return [chunk.event(row, fields) for _, chunk, row in rows]
+
+
+async def pushdown_durations_by(
+    ctx: Context | None, client: httpx.AsyncClient, bucket_id: str, key: str, start_us: int, end_us: int
+) -> dict[Any, float]:
+    """Sum durations per value of a data key on aw-server with ``merge_events_by_keys``.
+
+    Values are keyed as by ``EventColumns.durations_by``.
+    """
+    api_base = ctx.lifespan_context.get("api_base", DEFAULT_API_BASE) if ctx else DEFAULT_API_BASE
+    query = (
+        f"events = query_bucket({json.dumps(bucket_id)}); "
+        f"events = merge_events_by_keys(events, [{json.dumps(key)}]); "
+        "RETURN = events;"
+    )
+    response = await client.post(
+        f"{api_base}/query/",
+        json={"query": [query], "timeperiods": [f"{from_epoch_us(start_us)}/{from_epoch_us(end_us)}"]},
+        timeout=60.0,
+    )
+    response.raise_for_status()
+    (events,) = await get_json_codec(ctx).loads(response.content)
+    totals: dict[Any, float] = {}
+    for event in events:
+        if key in event["data"]:
+            value = hashable(event["data"][key])
+            totals[value] = totals.get(value, 0.0) + event["duration"]
+    return totals
@@ -0,0 +1,91 @@
+"""ActivityWatch MCP Server - Progress and cancellation of long calls.
+
+Long calls read a range one day at a time, sometimes several days or periods
+concurrently. ``Progress`` turns the days done and events processed into MCP
+progress notifications for clients that asked for them with a progress
+token, at most a few per second.
+
+When a client cancels a request, or gives up on it, the task running the tool
+is cancelled and the upstream request it is awaiting is aborted with its
+connection. ``gather`` extends that to fan-out: concurrent shards are
+cancelled with the call, and the others are cancelled as soon as one fails,
+so no upstream request outlives the call that made it.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable
+from typing import Any
+
+from fastmcp import Context
+
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between two progress notifications, except the last one.
+PROGRESS_INTERVAL = 0.25
+
+
+class Progress:
+    """Progress of one tool call, reported through its MCP context."""
+
+    def __init__(
+        self,
+        ctx: Context | None,
+        total: float | None = None,
+        unit: str = "days",
+        interval: float = PROGRESS_INTERVAL,
+    ):
+        """Create a progress tracker.
+
+        Args:
+            ctx: MCP context of the call; nothing is reported without one
+            total: Number of steps, if known
+            unit: What a step is, for the messages
+            interval: Minimum seconds between two notifications
+        """
+        self.ctx = ctx
+        self.total = total
+        self.unit = unit
+        self.interval = interval
+        self.done = 0.0
+        self.events = 0
+        self._reported: float | None = None
+
+    async def advance(self, steps: float = 1, events: int = 0) -> None:
+        """Count ``steps`` more steps done and ``events`` more events processed."""
+        self.done += steps
+        self.events += events
+        finished = self.total is not None and self.done >= self.total
+        now = time.monotonic()
+        if finished or self._reported is None or now - self._reported >= self.interval:
+            self._reported = now
+            await self.report()
+
+    async def report(self, message: str | None = None) -> None:
+        """Send a progress notification with the current counts."""
+        report_progress = getattr(self.ctx, "report_progress", None)
+        if report_progress is None:
+            return
+        if message is None:
+            total = f"/{self.total:g}" if self.total is not None else ""
+            message = f"{self.done:g}{total} {self.unit}"
+            if self.events and self.unit != "events":
+                message += f", {self.events} events"
+        try:
+            await report_progress(self.done, self.total, message)
+        except Exception as error:
+            # Progress is best effort; a closed session must not fail the call.
+            logger.debug("Progress notification failed: %s", error)
+
+
+async def gather(*awaitables: Awaitable[Any]) -> list[Any]:
+    """Like ``asyncio.gather``, but cancel and wait for the others when one fails or the call is cancelled."""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
@@ -6,8 +6,13 @@ This package exports the resource functions primarily for testing purposes.
 
 from .buckets import buckets_resource
 from .bucket_events import bucket_events_resource
+from .results import result_resource
+from .subscriptions import subscribe_resource, unsubscribe_resource
 
 __all__ = [
     "buckets_resource",
     "bucket_events_resource",
+    "result_resource",
+    "subscribe_resource",
+    "unsubscribe_resource",
 ]
@@ -7,11 +7,17 @@ Resource templates are parameterized resources that accept values in the URI.
 import httpx
 from fastmcp import Context
 
+from ..chunks import get_compact_gap
+from ..client import upstream_client
+from ..delta import SinceToken
+from ..events import compact_events
+from ..filters import EventFilter, stream_events
+from ..jsonio import get_json_codec
 from ..server import mcp
 
 
 @mcp.resource(
-    uri="activitywatch://events/{bucket_id}",
+    uri="activitywatch://events/{bucket_id}{?start,end,limit,since_token,fields,where,match,compact}",
     name="Bucket Events",
     description="Retrieves events from a specific ActivityWatch bucket. Use this to get raw event data from buckets like afk, window, or editor.",
 )
@@ -20,6 +26,11 @@ async def bucket_events_resource(
     start: str | None = None,
     end: str | None = None,
     limit: int | None = None,
+    since_token: str | None = None,
+    fields: str | None = None,
+    where: str | None = None,
+    match: str | None = None,
+    compact: float | None = None,
     ctx: Context | None = None,
 ) -> str:
     """Fetch events from a specific bucket as a resource.
@@ -31,14 +42,41 @@ async def bucket_events_resource(
         bucket_id: The bucket identifier to fetch events from
         start: Start datetime in ISO format (optional)
         end: End datetime in ISO format (optional)
-        limit: Maximum number of events to return (optional)
+        limit: Maximum number of events to return; with where or match, of matching events (optional)
+        since_token: Only return events added or updated since the read that returned
+            this token; an empty string starts a new delta stream (optional)
+        fields: Comma-separated event data keys to return, e.g. 'app,title' (optional)
+        where: JSON object of data key to the value it must equal, e.g. '{"app": "Firefox"}' (optional)
+        match: JSON object of data key to a regex searched case-insensitively, e.g. '{"title": "github"}'
+            (optional)
+        compact: Merge runs of consecutive events with identical data at most this many seconds
+            apart, e.g. 0 or 1 (optional; default: the server's --compact-gap)
         ctx: MCP context with lifespan data containing api_base
 
     Returns:
         JSON string with bucket events
     """
+    try:
+        event_filter = EventFilter.from_query(fields, where, match)
+    except ValueError as error:
+        return {
+            "error": str(error),
+            "hint": "fields is a comma-separated list of data keys; where and match are JSON objects",
+        }
+
+    if compact is not None and compact < 0:
+        return {
+            "error": f"compact must be a gap of 0 seconds or more, got {compact}",
+            "hint": "compact is the largest gap in seconds between merged events, e.g. 0 or 1",
+        }
+
     try:
         api_base = ctx.lifespan_context.get("api_base", "http://localhost:5600/api/0")
+        gap = compact if compact is not None else get_compact_gap(ctx)
+
+        since = SinceToken.decode(since_token) if since_token is not None else None
+        if since is not None:
+            start = since.start_for(start)
 
         # Build query parameters
         params = {}
@@ -46,15 +84,36 @@ async def bucket_events_resource(
             params["start"] = start
         if end:
             params["end"] = end
-        if limit:
+        # In delta mode the limit applies to the oldest changes, so the whole cursor window is fetched.
+        upstream_limit = limit if since is None else None
+        if upstream_limit and not event_filter.selective:
             params["limit"] = str(limit)
 
-        async with httpx.AsyncClient() as client:
+        async with upstream_client(ctx) as client:
             url = f"{api_base}/buckets/{bucket_id}/events"
-            response = await client.get(url, params=params, timeout=10.0)
-            response.raise_for_status()
-            events = response.json()
+            if event_filter.active:
+                events, _ = await stream_events(
+                    client, str(httpx.URL(url, params=params)), event_filter, upstream_limit
+                )
+            else:
+                response = await client.get(url, params=params, timeout=10.0)
+                response.raise_for_status()
+                events = await get_json_codec(ctx).loads(response.content)
+
+        if since is not None:
+            changed, updated, following = since.page(events, limit)
+            if gap is not None:
+                changed = compact_events(changed, gap)
+            return {
+                "bucket_id": bucket_id,
+                "events": changed,
+                "count": len(changed),
+                "updated_ids": updated,
+                "since_token": following.encode(),
+            }
 
+        if gap is not None:
+            events = compact_events(events, gap)
         return {
             "bucket_id": bucket_id,
             "events": events,
@@ -71,6 +130,12 @@ async def bucket_events_resource(
             "error": f"HTTP error: {error.response.status_code}",
         }
 
+    except ValueError as error:
+        return {
+            "error": str(error),
+            "hint": "Pass the since_token returned by the previous read, or an empty string to start over",
+        }
+
     except httpx.RequestError:
         return {
             "error": "Failed to fetch bucket events",
@@ -7,6 +7,7 @@ Resources allow clients to read data without invoking tools.
 import httpx
 from fastmcp import Context
 
+from ..client import fetch_buckets, upstream_client
 from ..server import mcp
 
 
@@ -28,12 +29,8 @@ async def buckets_resource(ctx: Context | None = None) -> str:
         JSON string with bucket information
     """
     try:
-        api_base = ctx.lifespan_context.get("api_base", "http://localhost:5600/api/0")
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{api_base}/buckets", timeout=10.0)
-            response.raise_for_status()
-            buckets_data = response.json()
+        async with upstream_client(ctx) as client:
+            buckets_data = await fetch_buckets(ctx, client)
 
         # Format as a simple list
         bucket_list = []
@@ -75,12 +72,8 @@ async def buckets_by_type_resource(bucket_type: str, ctx: Context | None = None)
         JSON string with filtered bucket information
     """
     try:
-        api_base = ctx.lifespan_context.get("api_base", "http://localhost:5600/api/0")
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{api_base}/buckets", timeout=10.0)
-            response.raise_for_status()
-            buckets_data = response.json()
+        async with upstream_client(ctx) as client:
+            buckets_data = await fetch_buckets(ctx, client)
 
         # Filter by type (case-insensitive)
         bucket_list = []
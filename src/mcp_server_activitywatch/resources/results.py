@@ -0,0 +1,40 @@
+"""ActivityWatch MCP Server - Offloaded Results Resource.
+
+This module provides an MCP resource template for reading tool results that
+were too large to inline and were offloaded to a compressed file.
+"""
+
+from fastmcp import Context
+
+from ..server import mcp
+
+
+@mcp.resource(
+    uri="activitywatch://results/{result_id}",
+    name="Offloaded Result",
+    description="Retrieves a large tool result that was offloaded to a compressed file. The URI is returned by tools in place of the inline result.",
+)
+async def result_resource(result_id: str, ctx: Context | None = None) -> str:
+    """Read back an offloaded result.
+
+    Args:
+        result_id: The result identifier from the offload stub
+        ctx: MCP context with lifespan data containing the result store
+
+    Returns:
+        The original JSON result text
+    """
+    store = ctx.lifespan_context.get("result_store") if ctx else None
+    if store is None:
+        return {
+            "error": "Result offloading is not enabled",
+            "hint": "Start the server with --offload-threshold to enable it",
+        }
+
+    try:
+        return store.load(result_id)
+    except FileNotFoundError:
+        return {
+            "error": f"Result '{result_id}' not found",
+            "hint": "Offloaded results are removed when their directory is cleaned up",
+        }
@@ -0,0 +1,64 @@
+"""ActivityWatch MCP Server - Resource Subscriptions.
+
+This module registers the MCP ``resources/subscribe`` and
+``resources/unsubscribe`` handlers. Subscriptions are served by the shared
+bucket watcher from the lifespan context, which emits resource-updated
+notifications when the underlying buckets change, so clients no longer need to
+re-read resources to detect changes. With several HTTP workers sessions are
+stateless and end with each request, so subscribing is rejected.
+"""
+
+from pydantic import AnyUrl
+
+from ..server import mcp
+
+# FastMCP has no public API for resources/subscribe, so the handlers are
+# registered on its underlying MCP SDK server. pyproject.toml pins the FastMCP
+# major version, and tests/test_watcher.py checks that the handlers and the
+# subscribe capability are in place, so an upgrade breaking this fails loudly.
+_low_level_server = mcp._mcp_server
+
+
+@_low_level_server.subscribe_resource()
+async def subscribe_resource(uri: AnyUrl) -> None:
+    """Subscribe the requesting session to updates of ``uri``.
+
+    Args:
+        uri: The resource URI, e.g. activitywatch://events/{bucket_id}
+
+    Raises:
+        ValueError: If sessions are stateless
+    """
+    request_context = _low_level_server.request_context
+    if request_context.lifespan_context.get("stateless"):
+        raise ValueError("Subscriptions are not available when the server runs several HTTP workers")
+    watcher = request_context.lifespan_context.get("bucket_watcher")
+    if watcher is not None:
+        watcher.subscribe(str(uri), request_context.session)
+
+
+@_low_level_server.unsubscribe_resource()
+async def unsubscribe_resource(uri: AnyUrl) -> None:
+    """Remove the requesting session's subscription to ``uri``.
+
+    Args:
+        uri: The resource URI that was previously subscribed to
+    """
+    request_context = _low_level_server.request_context
+    watcher = request_context.lifespan_context.get("bucket_watcher")
+    if watcher is not None:
+        watcher.unsubscribe(str(uri), request_context.session)
+
+
+_get_capabilities = _low_level_server.get_capabilities
+
+
+def _get_capabilities_with_subscribe(*args, **kwargs):
+    """Advertise resource subscription support, which the SDK reports as off by default."""
+    capabilities = _get_capabilities(*args, **kwargs)
+    if capabilities.resources is not None:
+        capabilities.resources.subscribe = True
+    return capabilities
+
+
+_low_level_server.get_capabilities = _get_capabilities_with_subscribe
@@ -1,21 +1,33 @@
 """ActivityWatch MCP Server - FastMCP implementation."""
 
 import argparse
+import asyncio
+import contextlib
 import os
 import sys
 from typing import Any
 
-from fastmcp import FastMCP, Context
+from fastmcp import FastMCP
 from fastmcp.server.lifespan import lifespan
 
+from .cache import CACHE_BACKENDS, DEFAULT_MAX_BYTES, DEFAULT_MAX_DISK_BYTES, create_cache
+from .client import DEFAULT_UPSTREAM_CONCURRENCY, UpstreamLimiter, create_shared_client
+from .compression import default_codec
+from .export import default_export_dir
+from .jsonio import DEFAULT_THRESHOLD, JsonCodec
+from .named_queries import QueryRegistry
+from .offload import ResultStore, default_offload_dir
+from .snapshot import default_snapshot_file, restore_snapshot, save_snapshot
+from .text_index import TextIndex
+from .watcher import BucketWatcher
 
-@lifespan
-async def app_lifespan(server: FastMCP) -> Any:
-    """Application lifespan managing api_base configuration.
 
-    Parses command line arguments and environment variables to configure
-    the ActivityWatch API base URL, then yields it in the context.
-    """
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the parser of the command line options shared by ``main`` and the lifespan."""
     parser = argparse.ArgumentParser(
         description="ActivityWatch MCP server - connect to your ActivityWatch time tracking data"
     )
@@ -24,15 +36,228 @@ async def app_lifespan(server: FastMCP) -> Any:
         type=str,
         help="ActivityWatch API base URL (default: http://localhost:5600/api/0)",
     )
+    parser.add_argument(
+        "--offload-threshold",
+        type=int,
+        help="Offload results larger than this many bytes to a compressed file (default: 0, disabled)",
+    )
+    parser.add_argument(
+        "--offload-dir",
+        type=str,
+        help="Directory for offloaded results (default: ~/.cache/activitywatch-mcp/results)",
+    )
+    parser.add_argument(
+        "--offload-codec",
+        type=str,
+        help="Codec for offloaded results: zstd, br or gzip (default: best available)",
+    )
+    parser.add_argument(
+        "--export-dir",
+        type=str,
+        help="Directory activitywatch-export writes files to (default: ~/.cache/activitywatch-mcp/exports)",
+    )
+    parser.add_argument(
+        "--json-offload-threshold",
+        type=int,
+        help=f"Decode and encode JSON larger than this many bytes in a worker pool (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--json-offload-mode",
+        type=str,
+        choices=["thread", "process", "inline"],
+        help="Worker pool used for large JSON payloads (default: thread)",
+    )
+    parser.add_argument(
+        "--event-cache-mb",
+        type=int,
+        help=f"Memory budget in MB for cached past-day events (default: {DEFAULT_MAX_BYTES // 2**20}, 0 disables)",
+    )
+    parser.add_argument(
+        "--compact-gap",
+        type=float,
+        help="Merge consecutive events with identical data at most this many seconds apart (default: off)",
+    )
+    parser.add_argument(
+        "--cache-backend",
+        type=str,
+        choices=list(CACHE_BACKENDS),
+        help=(
+            "Event cache private to the process, or shared by the processes of the host "
+            "(default: memory, or sqlite with several workers)"
+        ),
+    )
+    parser.add_argument(
+        "--cache-file",
+        type=str,
+        help="SQLite file of the sqlite cache backend (default: ~/.cache/activitywatch-mcp/cache.sqlite3)",
+    )
+    parser.add_argument(
+        "--cache-disk-mb",
+        type=int,
+        help=f"Size budget in MB of the sqlite cache file (default: {DEFAULT_MAX_DISK_BYTES // 2**20})",
+    )
+    parser.add_argument(
+        "--cache-snapshot",
+        type=str,
+        help="File the memory cache is saved to on shutdown and restored from on start, or 'off' "
+        "(default: ~/.cache/activitywatch-mcp/snapshot.bin)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        help="Longest seconds between bucket change checks for subscriptions and watch calls (default: 5)",
+    )
+    parser.add_argument(
+        "--poll-min-interval",
+        type=float,
+        help="Seconds between bucket change checks while buckets keep changing (default: 1)",
+    )
+    parser.add_argument(
+        "--queries-file",
+        type=str,
+        help="JSON file of named query templates for activitywatch-run-named-query",
+    )
+    parser.add_argument(
+        "--transport",
+        type=str,
+        choices=["stdio", "http"],
+        help="Serve one client over stdio, or many over streamable HTTP (default: stdio)",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        help=f"Address to listen on with the http transport (default: {DEFAULT_HOST})",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        help=f"Port to listen on with the http transport (default: {DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help=(
+            "Worker processes with the http transport; more than one serves stateless sessions "
+            "without subscriptions or watch, and defaults to the sqlite cache backend (default: 1)"
+        ),
+    )
+    parser.add_argument(
+        "--upstream-concurrency",
+        type=int,
+        help=(
+            "Maximum concurrent requests to ActivityWatch, split across workers "
+            f"(default: {DEFAULT_UPSTREAM_CONCURRENCY})"
+        ),
+    )
+    parser.add_argument(
+        "--upstream-rate",
+        type=float,
+        help="Maximum requests per second to ActivityWatch, split across workers (default: 0, unlimited)",
+    )
+    return parser
+
+
+def worker_count(args: argparse.Namespace) -> int:
+    """Return the number of worker processes serving requests: 1 unless several serve the http transport."""
+    if (args.transport or os.getenv("AW_TRANSPORT", "stdio")) != "http":
+        return 1
+    return max(args.workers or int(os.getenv("AW_WORKERS", "1")), 1)
+
+
+@lifespan
+async def app_lifespan(server: FastMCP) -> Any:
+    """Application lifespan managing api_base, the upstream client, caching, search indexing, JSON and result offloading, named queries and the bucket watcher.
 
-    args = parser.parse_args()
+    Parses command line arguments and environment variables to configure
+    the ActivityWatch API base URL, the shared upstream client and its limits,
+    the event cache and event compaction, the JSON worker pool, the large
+    result store, the export directory and the named queries file, starts
+    the shared bucket watcher that serves resource subscriptions and the
+    restore of the cache snapshot, then yields them in the context. On
+    shutdown the memory cache is saved to its snapshot.
+    """
+    args = build_parser().parse_args()
     api_base = args.api_base or os.getenv("AW_API_BASE", "http://localhost:5600/api/0")
+    offload_threshold = args.offload_threshold
+    if offload_threshold is None:
+        offload_threshold = int(os.getenv("AW_OFFLOAD_THRESHOLD", "0"))
+    offload_dir = args.offload_dir or os.getenv("AW_OFFLOAD_DIR", default_offload_dir())
+    offload_codec = args.offload_codec or os.getenv("AW_OFFLOAD_CODEC", default_codec())
+    result_store = ResultStore(offload_dir, threshold=offload_threshold, codec=offload_codec)
+    export_dir = args.export_dir or os.getenv("AW_EXPORT_DIR", default_export_dir())
+    json_offload_threshold = args.json_offload_threshold
+    if json_offload_threshold is None:
+        json_offload_threshold = int(os.getenv("AW_JSON_OFFLOAD_THRESHOLD", str(DEFAULT_THRESHOLD)))
+    json_offload_mode = args.json_offload_mode or os.getenv("AW_JSON_OFFLOAD_MODE", "thread")
+    json_codec = JsonCodec(threshold=json_offload_threshold, mode=json_offload_mode)
+    event_cache_mb = args.event_cache_mb
+    if event_cache_mb is None:
+        event_cache_mb = int(os.getenv("AW_EVENT_CACHE_MB", str(DEFAULT_MAX_BYTES // 2**20)))
+    compact_gap = args.compact_gap
+    if compact_gap is None and os.getenv("AW_COMPACT_GAP"):
+        compact_gap = float(os.environ["AW_COMPACT_GAP"])
+    workers = worker_count(args)
+    # Workers are separate processes; only the sqlite backend lets them share what each fetched.
+    cache_backend = args.cache_backend or os.getenv("AW_CACHE_BACKEND", "sqlite" if workers > 1 else "memory")
+    cache_disk_mb = args.cache_disk_mb
+    if cache_disk_mb is None:
+        cache_disk_mb = int(os.getenv("AW_CACHE_DISK_MB", str(DEFAULT_MAX_DISK_BYTES // 2**20)))
+    event_cache = create_cache(
+        cache_backend,
+        max_bytes=event_cache_mb * 2**20,
+        path=args.cache_file or os.getenv("AW_CACHE_FILE"),
+        max_disk_bytes=cache_disk_mb * 2**20,
+    )
+    cache_snapshot = args.cache_snapshot or os.getenv("AW_CACHE_SNAPSHOT") or default_snapshot_file()
+    if cache_snapshot == "off" or cache_backend != "memory":
+        cache_snapshot = None
+    upstream_concurrency = args.upstream_concurrency or int(
+        os.getenv("AW_UPSTREAM_CONCURRENCY", str(DEFAULT_UPSTREAM_CONCURRENCY))
+    )
+    upstream_rate = args.upstream_rate
+    if upstream_rate is None:
+        upstream_rate = float(os.getenv("AW_UPSTREAM_RATE", "0"))
+    # Every worker process runs this lifespan with its own client, so each gets a share of the limits.
+    limiter = UpstreamLimiter(concurrency=max(1, upstream_concurrency // workers), rate=upstream_rate / workers)
+    http_client = create_shared_client(limiter)
+    poll_interval = args.poll_interval or float(os.getenv("AW_POLL_INTERVAL", "5"))
+    poll_min_interval = args.poll_min_interval or float(os.getenv("AW_POLL_MIN_INTERVAL", "1"))
+    bucket_watcher = BucketWatcher(
+        api_base, interval=poll_interval, client=http_client, cache=event_cache, min_interval=poll_min_interval
+    )
+    queries_file = args.queries_file or os.getenv("AW_QUERIES_FILE")
+    query_registry = QueryRegistry.load(queries_file) if queries_file else QueryRegistry()
 
     # Print startup banner to stderr
     print("ActivityWatch MCP Server", file=sys.stderr)
     print("=" * 50, file=sys.stderr)
     print("Version: 2.1.0 (FastMCP)", file=sys.stderr)
     print(f"API Endpoint: {api_base}", file=sys.stderr)
+    print(
+        f"Upstream limits: {limiter.concurrency} concurrent requests"
+        + (f", {limiter.rate:g} requests/s" if limiter.rate else ""),
+        file=sys.stderr,
+    )
+    if workers > 1:
+        print(f"Workers: {workers}, stateless sessions without subscriptions or watch", file=sys.stderr)
+    if cache_backend != "memory":
+        print(f"Shared cache: {event_cache.stats()['path']}", file=sys.stderr)
+    elif workers > 1:
+        print(
+            "Warning: each worker keeps its own memory cache; use --cache-backend sqlite to share it", file=sys.stderr
+        )
+    if compact_gap is not None:
+        print(f"Compacting identical events at most {compact_gap:g}s apart", file=sys.stderr)
+    if cache_snapshot:
+        print(f"Cache snapshot: {cache_snapshot}", file=sys.stderr)
+    if result_store.threshold > 0:
+        print(
+            f"Offloading results over {result_store.threshold} bytes to {result_store.directory} "
+            f"({result_store.codec.name})",
+            file=sys.stderr,
+        )
+    if query_registry.queries:
+        print(f"Named queries: {', '.join(sorted(query_registry.queries))}", file=sys.stderr)
     print("=" * 50, file=sys.stderr)
     print(
         "For help with query format, use 'activitywatch-query-examples' tool",
@@ -40,7 +265,36 @@ async def app_lifespan(server: FastMCP) -> Any:
     )
     print(file=sys.stderr)
 
-    yield {"api_base": api_base}
+    watcher_task = asyncio.create_task(bucket_watcher.run())
+    background_tasks = [watcher_task]
+    if cache_snapshot:
+        background_tasks.append(
+            asyncio.create_task(restore_snapshot(event_cache, cache_snapshot, api_base, http_client))
+        )
+    try:
+        yield {
+            "api_base": api_base,
+            "http_client": http_client,
+            "result_store": result_store,
+            "export_dir": export_dir,
+            "json_codec": json_codec,
+            "event_cache": event_cache,
+            "compact_gap": compact_gap,
+            "text_index": TextIndex(),
+            "query_registry": query_registry,
+            "bucket_watcher": bucket_watcher,
+            "stateless": workers > 1,
+        }
+    finally:
+        json_codec.close()
+        for task in background_tasks:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        if cache_snapshot:
+            await save_snapshot(event_cache, cache_snapshot, api_base, http_client)
+        await http_client.aclose()
+        event_cache.close()
 
 
 # Create FastMCP instance with lifespan
@@ -54,14 +308,27 @@ from .tools import (  # noqa: E402
     list_buckets,
     get_events,
     run_query,
+    run_named_query,
     get_settings,
     query_examples,
+    top,
+    search,
+    sessions,
+    stats,
+    timeline,
+    compare_periods,
+    export,
+    web_domains,
+    watch,
 )
 
 # Import resources to register them via decorators
 from .resources import (  # noqa: E402
     buckets_resource,
     bucket_events_resource,
+    result_resource,
+    subscribe_resource,
+    unsubscribe_resource,
 )
 
 # Import prompts to register them via decorators
@@ -0,0 +1,43 @@
+"""ActivityWatch MCP Server - Streamable HTTP serving.
+
+With ``--transport http`` one deployment serves many MCP clients. Within a
+worker process every session shares the lifespan state: the upstream client
+and its limits, the caches, the search index and the bucket watcher. With
+several workers, uvicorn runs one process per worker, each with its own
+lifespan. The upstream limits are split evenly between them, so an idle
+worker's share is not lent to a busy one, and the cache defaults to the
+sqlite backend so that the workers share what each fetched. Sessions are
+stateless so that any worker can answer any request; resource subscriptions
+and the watch tool need a session that outlives a request and are rejected.
+"""
+
+import argparse
+import os
+
+from starlette.applications import Starlette
+
+from .server import DEFAULT_HOST, DEFAULT_PORT, build_parser, mcp, worker_count
+
+
+def http_options(args: argparse.Namespace) -> tuple[str, int, int]:
+    """Return the host, port and worker count from the options or environment variables."""
+    host = args.host or os.getenv("AW_HOST", DEFAULT_HOST)
+    port = args.port or int(os.getenv("AW_PORT", str(DEFAULT_PORT)))
+    return host, port, worker_count(args)
+
+
+def create_http_app() -> Starlette:
+    """Build the ASGI app; uvicorn worker processes call this factory."""
+    _, _, workers = http_options(build_parser().parse_args())
+    return mcp.http_app(stateless_http=workers > 1)
+
+
+def serve_http(args: argparse.Namespace) -> None:
+    """Serve MCP over streamable HTTP until interrupted."""
+    import uvicorn
+
+    host, port, workers = http_options(args)
+    if workers > 1:
+        uvicorn.run(f"{__name__}:create_http_app", factory=True, host=host, port=port, workers=workers)
+    else:
+        uvicorn.run(create_http_app(), host=host, port=port)
@@ -0,0 +1,146 @@
+"""ActivityWatch MCP Server - Gap-based sessionization.
+
+Turns a bucket's events into work sessions: contiguous runs of activity
+separated by gaps longer than a threshold. When an AFK bucket is given, window
+events are first clipped to the periods in which the user was not AFK, so AFK
+periods longer than the threshold split sessions too.
+
+Events are consumed in a single pass over start-sorted chunks, carrying only
+the open session between chunks, so months of data take linear time.
+"""
+
+import contextlib
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from fastmcp import Context
+
+from .chunks import iter_event_chunks
+from .columnar import MISSING, EventColumns, hashable
+from .intervals import clip_to_ranges, merge_ranges
+from .timeline import Categorizer
+
+DEFAULT_GAP_SECONDS = 300.0
+
+
+@dataclass
+class Session:
+    """A contiguous run of activity."""
+
+    start: int
+    end: int
+    active: int = 0
+    events: int = 0
+    durations: dict[Any, int] = field(default_factory=dict)
+
+    def dominant(self) -> tuple[Any, int]:
+        """Return the value with the most active time and that time."""
+        if not self.durations:
+            return None, 0
+        return max(self.durations.items(), key=lambda item: item[1])
+
+
+def active_ranges(afk_chunk: EventColumns) -> list[tuple[int, int]]:
+    """Return the merged ranges in which an AFK bucket reports ``not-afk``."""
+    codes = afk_chunk.columns.get("status")
+    if codes is None:
+        return []
+    statuses = afk_chunk.values("status")
+    ends = afk_chunk.ends()
+    return merge_ranges(
+        (afk_chunk.starts[row], ends[row])
+        for row, code in enumerate(codes)
+        if code != MISSING and statuses[code] == "not-afk"
+    )
+
+
+@contextlib.asynccontextmanager
+async def afk_active_ranges(
+    ctx: Context | None, client: httpx.AsyncClient, afk_bucket_id: str | None, start_us: int, end_us: int
+) -> AsyncIterator[Callable[[], Awaitable[list[tuple[int, int]] | None]]]:
+    """Stream the not-AFK ranges of an AFK bucket one day at a time, in step with ``iter_event_chunks``.
+
+    Yields a function returning the ranges of the next day, or None every day
+    if there is no AFK bucket. The stream is closed on exit, so an early error
+    does not leave its fetch pending.
+    """
+    if not afk_bucket_id:
+
+        async def no_ranges() -> None:
+            return None
+
+        yield no_ranges
+        return
+
+    async with contextlib.aclosing(iter_event_chunks(ctx, client, afk_bucket_id, start_us, end_us)) as afk_chunks:
+
+        async def next_ranges() -> list[tuple[int, int]]:
+            return active_ranges(await anext(afk_chunks))
+
+        yield next_ranges
+
+
+class Sessionizer:
+    """Single-pass session builder over start-sorted event chunks."""
+
+    def __init__(self, gap_us: int, key: str = "app", categorizer: Categorizer | None = None):
+        """Create a sessionizer.
+
+        Args:
+            gap_us: Inactivity in microseconds that closes a session
+            key: Event data key whose values are tallied per session
+            categorizer: If given, categories are tallied per session instead of ``key`` values
+        """
+        self.gap_us = gap_us
+        self.key = key
+        self.categorizer = categorizer
+        self.sessions: list[Session] = []
+        self._open: Session | None = None
+
+    def add_chunk(self, chunk: EventColumns, active: list[tuple[int, int]] | None = None) -> None:
+        """Consume a start-sorted chunk that follows all previously added ones.
+
+        Args:
+            chunk: Events to consume
+            active: If given, sorted and merged ranges to clip events to (e.g. not-AFK periods)
+        """
+        if self.categorizer is not None:
+            codes, values = self.categorizer.codes(chunk), self.categorizer.names
+        else:
+            codes, values = chunk.columns.get(self.key), [hashable(value) for value in chunk.values(self.key)]
+        active_starts = [start for start, _ in active] if active is not None else None
+
+        for row, (start, duration) in enumerate(zip(chunk.starts, chunk.durations, strict=True)):
+            end = start + int(duration * 1_000_000)
+            code = codes[row] if codes is not None else MISSING
+            value = values[code] if code != MISSING else None
+            if active is None:
+                self._add(start, end, value)
+                continue
+            for clipped_start, clipped_end in clip_to_ranges(start, end, active, active_starts):
+                self._add(clipped_start, clipped_end, value)
+
+    def _add(self, start: int, end: int, value: Any) -> None:
+        """Extend the open session with an event, or close it and open a new one."""
+        session = self._open
+        if session is None or start - session.end > self.gap_us:
+            if session is not None:
+                self.sessions.append(session)
+            session = self._open = Session(start=start, end=start)
+
+        # Only count time not already covered, in case events overlap.
+        added = end - max(start, session.end)
+        if added > 0:
+            session.active += added
+            session.end = end
+            session.durations[value] = session.durations.get(value, 0) + added
+        session.events += 1
+
+    def finish(self) -> list[Session]:
+        """Close the open session and return all sessions."""
+        if self._open is not None:
+            self.sessions.append(self._open)
+            self._open = None
+        return self.sessions
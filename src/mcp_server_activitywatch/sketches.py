@@ -0,0 +1,146 @@
+"""ActivityWatch MCP Server - Mergeable streaming sketches.
+
+Small summaries of a stream that can be merged with each other, so a long
+range can be answered by merging per-day sketches rather than rescanning
+events, in memory independent of the range length:
+
+- ``KLLSketch`` estimates quantiles (Karnin, Lang and Liberty's KLL sketch)
+- ``HyperLogLog`` estimates the number of distinct values
+"""
+
+import bisect
+import hashlib
+import itertools
+import math
+from typing import Any
+
+DEFAULT_KLL_K = 200
+DEFAULT_HLL_PRECISION = 10
+
+
+def stable_hash(value: Any) -> int:
+    """Return a 64-bit hash of ``value`` that is stable across processes."""
+    return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), "big")
+
+
+class KLLSketch:
+    """Quantile sketch with a rank error of about 1.7% for ``k=200``.
+
+    Items are kept in a hierarchy of compactors. When a level is full it is
+    sorted and every other item is promoted to the next level, where each item
+    stands for twice as many. Levels alternate which half they promote, which
+    keeps the sketch deterministic.
+    """
+
+    def __init__(self, k: int = DEFAULT_KLL_K):
+        self.k = k
+        self.count = 0
+        self.compactors: list[list[float]] = [[]]
+        self._offsets: list[int] = [0]
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+    def _capacity(self, level: int) -> int:
+        """Return the capacity of a level; lower levels are smaller."""
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+
+    def _grow(self) -> None:
+        """Add a level on top and recompute the total capacity."""
+        self.compactors.append([])
+        self._offsets.append(0)
+        self._max_size = sum(self._capacity(level) for level in range(len(self.compactors)))
+
+    def update(self, value: float) -> None:
+        """Add a value."""
+        self.compactors[0].append(value)
+        self.count += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        """Add all values summarized by ``other``, leaving ``other`` unchanged."""
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+        self.count += other.count
+        self._size = sum(len(items) for items in self.compactors)
+        while self._size >= self._max_size:
+            self._compress()
+
+    def _compress(self) -> None:
+        """Compact the lowest full level."""
+        for level in range(len(self.compactors)):
+            items = self.compactors[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 >= len(self.compactors):
+                    self._grow()
+                items.sort()
+                # An odd item out stays at this level.
+                kept = [items.pop()] if len(items) % 2 else []
+                offset = self._offsets[level]
+                self._offsets[level] ^= 1
+                self.compactors[level + 1].extend(items[offset::2])
+                self.compactors[level] = kept
+                self._size = sum(len(items) for items in self.compactors)
+                if self._size < self._max_size:
+                    return
+
+    def quantiles(self, fractions: list[float]) -> list[float | None]:
+        """Estimate the values at the given fractions (0 to 1) of the sorted stream."""
+        weighted = sorted((value, 1 << level) for level, items in enumerate(self.compactors) for value in items)
+        if not weighted:
+            return [None] * len(fractions)
+
+        # Cumulative weights are sorted, so the first value reaching each target is found by bisection.
+        cumulative = list(itertools.accumulate(weight for _, weight in weighted))
+        total = cumulative[-1]
+        last = len(weighted) - 1
+        return [weighted[min(bisect.bisect_left(cumulative, fraction * total), last)][0] for fraction in fractions]
+
+    def nbytes(self) -> int:
+        """Return an estimate of the memory held by the sketch."""
+        return 32 * self._size + 64 * len(self.compactors)
+
+
+class HyperLogLog:
+    """Distinct count sketch with a standard error of about ``1.04 / sqrt(2 ** precision)``."""
+
+    def __init__(self, precision: int = DEFAULT_HLL_PRECISION):
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add_hash(self, hashed: int) -> None:
+        """Add a value by its 64-bit ``stable_hash``."""
+        index = hashed >> (64 - self.precision)
+        rest = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = 64 - self.precision - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add(self, value: Any) -> None:
+        """Add a value."""
+        self.add_hash(stable_hash(value))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Add all values summarized by ``other``, leaving ``other`` unchanged."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        """Estimate the number of distinct values added."""
+        buckets = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / buckets)
+        estimate = alpha * buckets * buckets / sum(2.0**-register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * buckets and zeros:
+            # Linear counting is more accurate for small cardinalities.
+            estimate = buckets * math.log(buckets / zeros)
+        return round(estimate)
+
+    def nbytes(self) -> int:
+        """Return an estimate of the memory held by the sketch."""
+        return len(self.registers) + 64
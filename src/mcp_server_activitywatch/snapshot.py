@@ -0,0 +1,273 @@
+"""ActivityWatch MCP Server - Event cache snapshots for warm starts.
+
+Agent hosts restart the server often, and every restart used to throw away
+the cached events of settled days, their statistics sketches and the query
+results over settled periods. On shutdown the lifespan writes the cache to a
+snapshot file; on the next start the file is memory-mapped and only its index
+is read. Entries are unpickled one at a time, the first time they are asked
+for.
+
+A snapshot records the ``created`` and ``last_updated`` metadata of every
+bucket at the time it was written. Before any entry is used, the metadata is
+fetched again and the entries of buckets that were deleted, recreated or
+moved back in time (for example after restoring aw-server's database) are
+dropped. The file starts with a format version; files of another version,
+or written for another API base URL, are ignored.
+"""
+
+import json
+import logging
+import mmap
+import os
+import pickle
+import struct
+import uuid
+import zlib
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from .aql import AQLSyntaxError, parse_query
+from .cache import CacheBackend, EventCache, cache_directory, open_private, private_directory
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"AWMCPSNP"
+
+SNAPSHOT_VERSION = 1
+
+# Magic and format version, then the entries, then their JSON index and its size.
+HEADER = struct.Struct(">8sI")
+FOOTER = struct.Struct(">Q")
+
+
+def default_snapshot_file() -> str:
+    """Return the default path of the cache snapshot."""
+    return os.path.join(cache_directory(), "snapshot.bin")
+
+
+def entry_buckets(api_base: str, key: tuple) -> list[str] | None:
+    """Return the buckets an entry was computed from, or None if they are unknown.
+
+    Event chunks are keyed ``(api_base, bucket_id, day_start)``, with the
+    compaction gap appended if they were compacted, statistics
+    sketches ``("stats", api_base, bucket_id, ...)`` and query results
+    ``("query", api_base, query, timeperiods)``.
+    """
+    if key[0] == api_base and len(key) in (3, 4):
+        return [key[1]]
+    if key[0] == "stats" and key[1] == api_base:
+        return [key[2]]
+    if key[0] == "query" and key[1] == api_base:
+        try:
+            buckets = parse_query(key[2]).buckets
+        except AQLSyntaxError:
+            return None
+        return buckets or None
+    return None
+
+
+def _tuple(value: Any) -> Any:
+    """Convert the JSON lists of a decoded key back to tuples."""
+    return tuple(_tuple(item) for item in value) if isinstance(value, list) else value
+
+
+class Snapshot:
+    """Memory-mapped snapshot whose entries are unpickled on first use."""
+
+    def __init__(self, path: Path, index: dict[str, Any], data: mmap.mmap):
+        self.path = path
+        self.api_base: str = index["api_base"]
+        self.buckets: dict[str, dict[str, Any]] = index["buckets"]
+        self._data = data
+        self._entries: dict[tuple, dict[str, Any]] = {_tuple(entry["key"]): entry for entry in index["entries"]}
+
+    @classmethod
+    def open(cls, path: str | Path) -> "Snapshot | None":
+        """Map a snapshot file and read its index, or return None if it is missing or not of this version."""
+        path = Path(path)
+        try:
+            with path.open("rb") as file:
+                if hasattr(os, "getuid") and os.fstat(file.fileno()).st_uid != os.getuid():
+                    logger.warning("Ignoring cache snapshot %s: it belongs to another user", path)
+                    return None
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version = HEADER.unpack_from(data)
+            if magic != MAGIC or version != SNAPSHOT_VERSION:
+                logger.info("Ignoring cache snapshot %s of version %s", path, version)
+                data.close()
+                return None
+            (index_size,) = FOOTER.unpack_from(data, len(data) - FOOTER.size)
+            index_start = len(data) - FOOTER.size - index_size
+            index = json.loads(data[index_start : index_start + index_size])
+        except (OSError, ValueError, struct.error) as error:
+            logger.debug("No usable cache snapshot at %s: %s", path, error)
+            return None
+        return cls(path, index, data)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def validate(self, api_base: str, buckets: dict[str, dict[str, Any]]) -> int:
+        """Drop the entries not valid against the current bucket metadata.
+
+        Returns:
+            The number of entries dropped
+        """
+        if api_base != self.api_base:
+            dropped = len(self._entries)
+            self._entries.clear()
+            return dropped
+
+        valid = {
+            bucket_id
+            for bucket_id, saved in self.buckets.items()
+            if bucket_id in buckets
+            and buckets[bucket_id].get("created") == saved.get("created")
+            and (buckets[bucket_id].get("last_updated") or "") >= (saved.get("last_updated") or "")
+        }
+        stale = [key for key, entry in self._entries.items() if not set(entry["buckets"]) <= valid]
+        for key in stale:
+            del self._entries[key]
+        self.buckets = {bucket_id: buckets[bucket_id] for bucket_id in valid}
+        return len(stale)
+
+    def raw(self, key: tuple) -> bytes | None:
+        """Return the compressed pickle of an entry."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return self._data[entry["offset"] : entry["offset"] + entry["length"]]
+
+    def take(self, key: tuple) -> Any:
+        """Unpickle and remove an entry, or return None if there is none."""
+        raw = self.raw(key)
+        if raw is None:
+            return None
+        del self._entries[key]
+        try:
+            return pickle.loads(zlib.decompress(raw))
+        except Exception as error:
+            logger.debug("Dropping unreadable snapshot entry %r: %s", key, error)
+            return None
+
+    def remaining(self) -> list[tuple[tuple, dict[str, Any]]]:
+        """Return the keys and index entries of the entries not taken yet."""
+        return list(self._entries.items())
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._entries.clear()
+        self._data.close()
+
+
+def write_snapshot(
+    cache: EventCache,
+    path: str | Path,
+    api_base: str,
+    buckets: dict[str, dict[str, Any]],
+) -> int:
+    """Write the cache's entries that do not expire, and those of its snapshot not used yet, to ``path``.
+
+    Entries whose buckets are unknown are skipped, and the compressed entries
+    are kept within the cache's memory budget. The file is readable only by
+    the current user, as it is unpickled on the next start, and is replaced
+    atomically.
+
+    Returns:
+        The number of entries written
+    """
+    path = Path(path)
+    private_directory(path.parent)
+    temporary = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    entries = []
+    cached = cache.items()
+    previous = cache.snapshot
+    with open_private(temporary) as file:
+        file.write(HEADER.pack(MAGIC, SNAPSHOT_VERSION))
+
+        def add(key: tuple, blob: bytes, sources: list[str]) -> None:
+            if file.tell() + len(blob) <= cache.max_bytes:
+                entries.append({"key": key, "offset": file.tell(), "length": len(blob), "buckets": sources})
+                file.write(blob)
+
+        # Most recently used first, then what the previous run left unused, within the cache's budget.
+        for key, chunk in reversed(cached):
+            sources = entry_buckets(api_base, key)
+            if sources is None or not set(sources) <= set(buckets):
+                continue
+            add(key, zlib.compress(pickle.dumps(chunk, protocol=pickle.HIGHEST_PROTOCOL), 1), sources)
+        if previous is not None:
+            cached_keys = {key for key, _ in cached}
+            for key, entry in previous.remaining():
+                if key not in cached_keys and set(entry["buckets"]) <= set(buckets):
+                    add(key, previous.raw(key), entry["buckets"])
+
+        saved_buckets = {
+            bucket_id: {"created": bucket.get("created"), "last_updated": bucket.get("last_updated")}
+            for bucket_id, bucket in buckets.items()
+        }
+        index = json.dumps({"api_base": api_base, "buckets": saved_buckets, "entries": entries}).encode()
+        file.write(index)
+        file.write(FOOTER.pack(len(index)))
+    if previous is not None:
+        cache.snapshot = None
+        previous.close()
+    os.replace(temporary, path)
+    return len(entries)
+
+
+async def fetch_bucket_metadata(client: httpx.AsyncClient, api_base: str) -> dict[str, dict[str, Any]]:
+    """Fetch the metadata of every bucket, bypassing the cache."""
+    response = await client.get(f"{api_base}/buckets", timeout=10.0)
+    response.raise_for_status()
+    return response.json()
+
+
+async def restore_snapshot(cache: CacheBackend, path: str | Path, api_base: str, client: httpx.AsyncClient) -> int:
+    """Validate the snapshot at ``path`` against aw-server and serve its entries from ``cache``.
+
+    Returns:
+        The number of entries restored
+    """
+    if not isinstance(cache, EventCache):
+        # Shared caches keep their entries in a file already.
+        return 0
+    snapshot = Snapshot.open(path)
+    if snapshot is None:
+        return 0
+    try:
+        buckets = await fetch_bucket_metadata(client, api_base)
+    except (httpx.HTTPError, ValueError) as error:
+        logger.info("Not restoring the cache snapshot, bucket metadata is unavailable: %s", error)
+        snapshot.close()
+        return 0
+    dropped = snapshot.validate(api_base, buckets)
+    if dropped:
+        logger.info("Dropped %d stale cache snapshot entries", dropped)
+    cache.snapshot = snapshot
+    return len(snapshot)
+
+
+async def save_snapshot(cache: CacheBackend, path: str | Path, api_base: str, client: httpx.AsyncClient) -> int:
+    """Snapshot ``cache`` to ``path`` with the current bucket metadata.
+
+    Nothing is written if aw-server cannot be reached, since the entries
+    could not be validated on the next start.
+
+    Returns:
+        The number of entries written
+    """
+    if not isinstance(cache, EventCache):
+        return 0
+    try:
+        buckets = await fetch_bucket_metadata(client, api_base)
+    except (httpx.HTTPError, ValueError) as error:
+        logger.info("Not saving the cache snapshot, bucket metadata is unavailable: %s", error)
+        return 0
+    try:
+        return write_snapshot(cache, path, api_base, buckets)
+    except OSError as error:
+        logger.warning("Could not save the cache snapshot to %s: %s", path, error)
+        return 0
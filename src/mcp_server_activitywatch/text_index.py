@@ -0,0 +1,162 @@
+"""ActivityWatch MCP Server - Inverted index over window titles and URLs.
+
+Maps every token of the ``title`` and ``url`` data fields of a bucket's
+events to a posting list of the time ranges in which an event containing it
+was active. Ranges of consecutive events sharing a token are merged, so a
+token's posting list stays short however many heartbeats mention it.
+
+The index is built incrementally one settled UTC day at a time; a searched
+range that includes days not yet indexed only fetches those days. The indexes
+of all buckets share a memory budget: least recently searched buckets are
+dropped to fit it, and are indexed again when next searched.
+"""
+
+import re
+import sys
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from fastmcp import Context
+
+from .columnar import MISSING, EventColumns
+from .intervals import intersect_ranges, merge_ranges
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+INDEXED_KEYS = ("title", "url")
+
+# Ranges of the same token closer than this are merged into one.
+MERGE_GAP_US = 5 * 1_000_000
+
+# Memory budget shared by the indexes of all buckets.
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Estimated bytes held per token besides its ranges: the dict entry and the array header.
+TOKEN_OVERHEAD_BYTES = sys.getsizeof(array("q")) + 8 * 3
+
+# Bytes per range in a posting list.
+RANGE_BYTES = 2 * array("q").itemsize
+
+
+def tokenize(text: str) -> set[str]:
+    """Split ``text`` into lowercase word tokens of at least two characters."""
+    return {token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1}
+
+
+class BucketIndex:
+    """Inverted index of one bucket."""
+
+    def __init__(self, merge_gap_us: int = MERGE_GAP_US):
+        self.merge_gap_us = merge_gap_us
+        self.days: set[int] = set()
+        # token -> flattened [start, end, start, end, ...] in epoch microseconds
+        self.postings: dict[str, array] = {}
+        self.size_bytes = 0
+        self._unsorted: set[str] = set()
+
+    def add_chunk(self, chunk: EventColumns, day_start: int | None = None) -> None:
+        """Index a start-sorted chunk of events.
+
+        Args:
+            chunk: Events to index
+            day_start: The settled day this chunk covers, recorded as indexed
+        """
+        # Tokenize every distinct value once rather than every event.
+        value_tokens = {key: [tokenize(str(value)) for value in chunk.values(key)] for key in INDEXED_KEYS}
+        columns = {key: chunk.columns[key] for key in INDEXED_KEYS if key in chunk.columns}
+
+        for row, (start, duration) in enumerate(zip(chunk.starts, chunk.durations, strict=True)):
+            tokens: set[str] = set()
+            for key, codes in columns.items():
+                code = codes[row]
+                if code != MISSING:
+                    tokens |= value_tokens[key][code]
+            if tokens:
+                end = start + int(duration * 1_000_000)
+                for token in tokens:
+                    self._add(token, start, end)
+
+        if day_start is not None:
+            self.days.add(day_start)
+
+    def _add(self, token: str, start: int, end: int) -> None:
+        """Append a range to the posting list of ``token``, merging it with the last one if close."""
+        posting = self.postings.get(token)
+        if posting is None:
+            self.postings[token] = array("q", (start, end))
+            self.size_bytes += sys.getsizeof(token) + TOKEN_OVERHEAD_BYTES + RANGE_BYTES
+            return
+
+        last_start, last_end = posting[-2], posting[-1]
+        if start < last_start:
+            self._unsorted.add(token)
+            posting.extend((start, end))
+            self.size_bytes += RANGE_BYTES
+        elif start <= last_end + self.merge_gap_us:
+            posting[-1] = max(last_end, end)
+        else:
+            posting.extend((start, end))
+            self.size_bytes += RANGE_BYTES
+
+    def ranges(self, token: str) -> list[tuple[int, int]]:
+        """Return the sorted, merged ranges in which ``token`` was active."""
+        posting = self.postings.get(token)
+        if posting is None:
+            return []
+
+        pairs = list(zip(posting[::2], posting[1::2], strict=True))
+        if token in self._unsorted:
+            pairs = merge_ranges(pairs, self.merge_gap_us)
+            self.size_bytes -= (len(posting) // 2 - len(pairs)) * RANGE_BYTES
+            self.postings[token] = array("q", [bound for pair in pairs for bound in pair])
+            self._unsorted.discard(token)
+        return pairs
+
+    def search(self, terms: Iterable[str], start_us: int, end_us: int) -> list[tuple[int, int]]:
+        """Return the ranges within ``[start_us, end_us)`` in which all ``terms`` were active."""
+        result: list[tuple[int, int]] | None = None
+        for term in terms:
+            ranges = self.ranges(term)
+            result = ranges if result is None else intersect_ranges(result, ranges)
+            if not result:
+                return []
+        return intersect_ranges(result or [], [(start_us, end_us)])
+
+
+class TextIndex:
+    """Inverted indexes of every searched bucket, bounded by their estimated memory."""
+
+    def __init__(self, merge_gap_us: int = MERGE_GAP_US, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.merge_gap_us = merge_gap_us
+        self.max_bytes = max_bytes
+        self.buckets: OrderedDict[tuple[str, str], BucketIndex] = OrderedDict()
+
+    def bucket(self, api_base: str, bucket_id: str) -> BucketIndex:
+        """Return the index of a bucket, creating it empty on first use."""
+        key = (api_base, bucket_id)
+        if key not in self.buckets:
+            self.buckets[key] = BucketIndex(self.merge_gap_us)
+        self.buckets.move_to_end(key)
+        return self.buckets[key]
+
+    @property
+    def size_bytes(self) -> int:
+        """Estimated memory held by all indexes in bytes."""
+        return sum(index.size_bytes for index in self.buckets.values())
+
+    def fit(self) -> None:
+        """Drop the least recently used bucket indexes until the rest fit the budget.
+
+        A dropped index stays usable by searches already holding it; the next
+        search of its bucket starts a new one.
+        """
+        size = self.size_bytes
+        while size > self.max_bytes:
+            _, index = self.buckets.popitem(last=False)
+            size -= index.size_bytes
+
+
+def get_text_index(ctx: Context | None) -> TextIndex | None:
+    """Return the text index from the lifespan context, if one is configured."""
+    return ctx.lifespan_context.get("text_index") if ctx else None
@@ -0,0 +1,277 @@
+"""ActivityWatch MCP Server - Fixed-resolution timeline binning.
+
+Resamples events into fixed bins aligned to UTC midnight. For every bin it
+computes the seconds covered by any event (active time), the seconds per
+category and per value of a data key, from which the dominant value is taken.
+
+Interval-to-bin overlap is computed with array operations when numpy, from the
+"timeline" extra, is installed: each event contributes a partial first bin, a
+partial last bin and a run of full bins in between, which are accumulated with
+``bincount`` and a difference array. Without numpy the same sums are computed
+with a Python loop over events.
+"""
+
+import re
+from typing import Any
+
+from .columnar import MISSING, EventColumns, hashable
+from .intervals import merge_ranges
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+UNCATEGORIZED = "Uncategorized"
+
+
+class Categorizer:
+    """Assigns events to the first category whose regex matches their app or title."""
+
+    def __init__(self, categories: dict[str, str]):
+        """Create a categorizer.
+
+        Args:
+            categories: Category name to regex, matched case-insensitively in order
+
+        Raises:
+            ValueError: If a regex is invalid
+        """
+        self.names = [*categories, UNCATEGORIZED]
+        try:
+            self.patterns = [re.compile(pattern, re.IGNORECASE) for pattern in categories.values()]
+        except re.error as error:
+            raise ValueError(f"Invalid category regex: {error}") from error
+
+    def categorize(self, app: Any, title: Any) -> int:
+        """Return the index of the category of an event in ``names``."""
+        for index, pattern in enumerate(self.patterns):
+            if (app is not None and pattern.search(str(app))) or (title is not None and pattern.search(str(title))):
+                return index
+        return len(self.patterns)
+
+    def codes(self, chunk: EventColumns) -> list[int]:
+        """Return the category index of every event, categorizing each distinct app/title pair once."""
+        apps, titles = chunk.values("app"), chunk.values("title")
+        app_codes = chunk.columns.get("app") or [MISSING] * len(chunk)
+        title_codes = chunk.columns.get("title") or [MISSING] * len(chunk)
+        memo: dict[tuple[int, int], int] = {}
+        codes = []
+        for pair in zip(app_codes, title_codes, strict=True):
+            code = memo.get(pair)
+            if code is None:
+                code = memo[pair] = self._categorize_codes(apps, titles, *pair)
+            codes.append(code)
+        return codes
+
+    def codes_array(self, chunk: EventColumns):
+        """Like ``codes`` but returns a numpy array, finding the distinct pairs with ``np.unique``."""
+        apps, titles = chunk.values("app"), chunk.values("title")
+        app_codes, title_codes = _codes_array(chunk, "app"), _codes_array(chunk, "title")
+        width = len(titles) + 1
+        unique, inverse = np.unique((app_codes + 1) * width + title_codes + 1, return_inverse=True)
+        mapping = np.array(
+            [self._categorize_codes(apps, titles, pair // width - 1, pair % width - 1) for pair in unique.tolist()],
+            dtype=np.int64,
+        )
+        return mapping[inverse] if len(unique) else np.empty(0, np.int64)
+
+    def _categorize_codes(self, apps: list[Any], titles: list[Any], app_code: int, title_code: int) -> int:
+        """Categorize an event by its app and title codes."""
+        return self.categorize(
+            apps[app_code] if app_code != MISSING else None,
+            titles[title_code] if title_code != MISSING else None,
+        )
+
+
+def _codes_array(chunk: EventColumns, key: str):
+    """Return the codes of a data key as an int64 numpy array, all ``MISSING`` if absent."""
+    codes = chunk.columns.get(key)
+    if codes is None:
+        return np.full(len(chunk), MISSING, dtype=np.int64)
+    return np.frombuffer(codes, dtype=np.dtype(f"i{codes.itemsize}")).astype(np.int64)
+
+
+class DayBins:
+    """Binned sums over the events of one day.
+
+    Attributes:
+        active: Seconds per bin covered by at least one event
+        categories: Seconds per bin per category index, if categorizing
+        values: Distinct values of the key
+        by_value: Seconds per bin per value index
+    """
+
+    def __init__(self, origin: int, bin_us: int, nbins: int):
+        self.origin = origin
+        self.bin_us = bin_us
+        self.nbins = nbins
+        self.active: list[float] = [0.0] * nbins
+        self.categories: list[list[float]] = []
+        self.values: list[Any] = []
+        self.by_value: list[list[float]] = []
+
+    def dominant(self) -> list[tuple[Any, float]]:
+        """Return the value with the most seconds in every bin, or ``(None, 0)`` for empty bins."""
+        result = []
+        for index in range(self.nbins):
+            best, best_seconds = None, 0.0
+            for value, row in zip(self.values, self.by_value, strict=True):
+                if row[index] > best_seconds:
+                    best, best_seconds = value, row[index]
+            result.append((best, best_seconds))
+        return result
+
+
+def bin_chunks(
+    chunks: list[EventColumns],
+    origin: int,
+    bin_us: int,
+    nbins: int,
+    key: str = "app",
+    categorizer: Categorizer | None = None,
+    vectorized: bool | None = None,
+) -> DayBins:
+    """Bin chunks of events, e.g. of several buckets, that lie within ``origin + nbins * bin_us``.
+
+    Args:
+        chunks: Events to bin
+        origin: Start of the first bin in epoch microseconds
+        bin_us: Bin width in microseconds
+        nbins: Number of bins
+        key: Event data key whose per-value seconds pick the dominant value
+        categorizer: Categories to compute seconds for, if any
+        vectorized: Use numpy; defaults to whether it is installed
+    """
+    if vectorized is None:
+        vectorized = HAS_NUMPY
+    bins = DayBins(origin, bin_us, nbins)
+
+    # Map every chunk's value codes to codes shared across chunks.
+    value_codes: dict[Any, int] = {}
+    remaps = []
+    for chunk in chunks:
+        remap = []
+        for value in chunk.values(key):
+            identity = hashable(value)
+            if identity not in value_codes:
+                value_codes[identity] = len(bins.values)
+                bins.values.append(value)
+            remap.append(value_codes[identity])
+        remaps.append(remap)
+
+    compute = _bin_numpy if vectorized else _bin_python
+    compute(bins, chunks, key, remaps, categorizer)
+    return bins
+
+
+def _bin_python(
+    bins: DayBins,
+    chunks: list[EventColumns],
+    key: str,
+    remaps: list[list[int]],
+    categorizer: Categorizer | None,
+) -> None:
+    """Fill ``bins`` with a loop over events."""
+    origin, bin_us, nbins = bins.origin, bins.bin_us, bins.nbins
+    bins.by_value = [[0.0] * nbins for _ in bins.values]
+    if categorizer:
+        bins.categories = [[0.0] * nbins for _ in categorizer.names]
+
+    def add(row: list[float], start: int, end: int) -> None:
+        index = (start - origin) // bin_us
+        while start < end and index < nbins:
+            bin_end = origin + (index + 1) * bin_us
+            row[index] += (min(end, bin_end) - start) / 1_000_000
+            start = bin_end
+            index += 1
+
+    intervals = []
+    for chunk, remap in zip(chunks, remaps, strict=True):
+        codes = chunk.columns.get(key)
+        categories = categorizer.codes(chunk) if categorizer else None
+        for row, (start, end) in enumerate(zip(chunk.starts, chunk.ends(), strict=True)):
+            start, end = max(start, origin), min(end, origin + nbins * bin_us)
+            if start >= end:
+                continue
+            intervals.append((start, end))
+            if codes is not None and codes[row] != MISSING:
+                add(bins.by_value[remap[codes[row]]], start, end)
+            if categories is not None:
+                add(bins.categories[categories[row]], start, end)
+
+    for start, end in merge_ranges(intervals):
+        add(bins.active, start, end)
+
+
+def _bin_numpy(
+    bins: DayBins,
+    chunks: list[EventColumns],
+    key: str,
+    remaps: list[list[int]],
+    categorizer: Categorizer | None,
+) -> None:
+    """Fill ``bins`` with array operations."""
+    origin, bin_us, nbins = bins.origin, bins.bin_us, bins.nbins
+    span = nbins * bin_us
+
+    def concatenate(arrays: list, dtype) -> Any:
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype)
+
+    starts = concatenate([np.frombuffer(chunk.starts, dtype=np.int64) for chunk in chunks], np.int64)
+    durations = concatenate([np.frombuffer(chunk.durations, dtype=np.float64) for chunk in chunks], np.float64)
+    ends = np.clip(starts + (durations * 1_000_000).astype(np.int64) - origin, 0, span)
+    starts = np.clip(starts - origin, 0, span)
+    # A trailing MISSING in every remap table maps MISSING codes (-1) to MISSING.
+    values = concatenate(
+        [
+            np.array([*remap, MISSING], dtype=np.int64)[_codes_array(chunk, key)]
+            for chunk, remap in zip(chunks, remaps, strict=True)
+        ],
+        np.int64,
+    )
+
+    keep = ends > starts
+    starts, ends, values = starts[keep], ends[keep], values[keep]
+    has_value = values != MISSING
+    bins.by_value = _overlap(starts[has_value], ends[has_value], values[has_value], len(bins.values), bin_us, nbins)
+
+    if categorizer:
+        categories = concatenate([categorizer.codes_array(chunk) for chunk in chunks], np.int64)[keep]
+        bins.categories = _overlap(starts, ends, categories, len(categorizer.names), bin_us, nbins)
+
+    # Union of all intervals: sort by start and cut wherever a start passes every earlier end.
+    if len(starts):
+        order = np.argsort(starts, kind="stable")
+        starts, ends = starts[order], ends[order]
+        reach = np.maximum.accumulate(ends)
+        new = np.ones(len(starts), dtype=bool)
+        new[1:] = starts[1:] > reach[:-1]
+        first = np.flatnonzero(new)
+        union_starts, union_ends = starts[first], np.maximum.reduceat(ends, first)
+        bins.active = _overlap(union_starts, union_ends, np.zeros(len(first), np.int64), 1, bin_us, nbins)[0]
+
+
+def _overlap(starts, ends, groups, ngroups: int, bin_us: int, nbins: int) -> list[list[float]]:
+    """Sum the overlap of intervals, relative to the first bin, with every bin, per group."""
+    size = ngroups * nbins
+    if not len(starts):
+        return [[0.0] * nbins for _ in range(ngroups)]
+
+    first = starts // bin_us
+    last = (ends - 1) // bin_us
+    offset = groups * nbins
+
+    # Partial first bin, or the whole interval if it fits in one bin.
+    sums = np.bincount(offset + first, weights=np.minimum((first + 1) * bin_us, ends) - starts, minlength=size)
+    spans = last > first
+    # Partial last bin.
+    sums += np.bincount(offset[spans] + last[spans], weights=ends[spans] - last[spans] * bin_us, minlength=size)
+    # Full bins in between, as +1/-1 markers whose running sum counts the intervals covering each bin.
+    markers = np.bincount(offset[spans] + first[spans] + 1, minlength=size + 1)
+    markers -= np.bincount(offset[spans] + last[spans], minlength=size + 1)
+    sums += np.cumsum(markers)[:size] * bin_us
+
+    return (sums / 1_000_000).reshape(ngroups, nbins).tolist()
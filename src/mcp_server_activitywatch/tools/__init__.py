@@ -4,16 +4,36 @@ All tools are registered via the @mcp.tool decorator in their respective modules
 This package exports the tool functions primarily for testing purposes.
 """
 
+from .compare_periods import compare_periods
+from .export import export
 from .get_events import get_events
 from .get_settings import get_settings
 from .list_buckets import list_buckets
 from .query_examples import query_examples
+from .run_named_query import run_named_query
 from .run_query import run_query
+from .search import search
+from .sessions import sessions
+from .stats import stats
+from .timeline import timeline
+from .top import top
+from .watch import watch
+from .web_domains import web_domains
 
 __all__ = [
+    "compare_periods",
+    "export",
     "get_events",
     "get_settings",
     "list_buckets",
     "query_examples",
+    "run_named_query",
     "run_query",
+    "search",
+    "sessions",
+    "stats",
+    "timeline",
+    "top",
+    "watch",
+    "web_domains",
 ]
@@ -0,0 +1,132 @@
+"""ActivityWatch MCP Server - Compare Periods Tool."""
+
+import json
+
+import httpx
+from fastmcp import Context
+from pydantic import BaseModel, Field
+
+from ..chunks import day_windows, resolve_period, resolve_range
+from ..client import upstream_client
+from ..progress import Progress, gather
+from ..server import mcp
+from .top import aggregate_durations
+
+
+class ComparePeriodsArgs(BaseModel):
+    """Arguments for compare_periods tool."""
+
+    bucket_id: str = Field(..., description="ID of bucket to aggregate")
+    periods: list[str] = Field(
+        ...,
+        description="Periods to compare, the first being the baseline, e.g. ['last_week', 'this_week']",
+        min_length=2,
+        max_length=12,
+    )
+    key: str = Field("app", description="Event data key to group by, e.g. app, title or url")
+    limit: int = Field(20, description="Maximum number of values returned", ge=1, le=1000)
+    explain: bool = Field(False, description="Include the plan chosen for every period")
+
+
+@mcp.tool(name="activitywatch-compare-periods")
+async def compare_periods(
+    bucket_id: str,
+    periods: list[str],
+    key: str = "app",
+    limit: int = 20,
+    explain: bool = False,
+    ctx: Context | None = None,
+) -> str:
+    """Compare the time per app, title or other key across periods, e.g. this week vs last week.
+
+    The same aggregation runs for every period concurrently; if one fails, the
+    others are cancelled. Each value gets its duration per period and, against
+    the first period as baseline, the change in seconds and the ratio. Values
+    are ordered by the largest change between the baseline and the last period.
+
+    Args:
+        bucket_id: ID of the bucket to aggregate
+        periods: Two or more periods, the first being the baseline; 'start/end' ranges
+            (e.g. '2024-02-01/2024-02-08') or 'today', 'yesterday', 'last_N_days', 'this_week', 'last_week'
+        key: Event data key to group by, e.g. 'app', 'title' or 'url' (default: 'app')
+        limit: Maximum number of values returned (default: 20)
+        explain: Include the plan chosen for every period, its cost estimates and timings
+        ctx: MCP context with lifespan data containing api_base
+
+    Returns:
+        JSON string with per-period totals and per-value durations, deltas and ratios
+    """
+    try:
+        if len(periods) < 2:
+            raise ValueError("Give at least two periods to compare")
+        ranges = []
+        for period in periods:
+            start, _, end = resolve_period(period).partition("/")
+            ranges.append((start, end, *resolve_range(start, end)))
+
+        progress = Progress(ctx, total=sum(len(day_windows(start_us, end_us)) for *_, start_us, end_us in ranges))
+        async with upstream_client(ctx) as client:
+            aggregates = await gather(
+                *(
+                    aggregate_durations(ctx, client, bucket_id, key, start_us, end_us, progress)
+                    for *_, start_us, end_us in ranges
+                )
+            )
+
+        values = set().union(*(accumulator.totals for accumulator, _, _ in aggregates))
+        rows = []
+        for value in values:
+            durations = [accumulator.totals.get(value, 0.0) for accumulator, _, _ in aggregates]
+            baseline = durations[0]
+            rows.append(
+                {
+                    "value": value,
+                    "durations": durations,
+                    "deltas": [duration - baseline for duration in durations[1:]],
+                    "ratios": [duration / baseline if baseline else None for duration in durations[1:]],
+                }
+            )
+        rows.sort(key=lambda row: (abs(row["deltas"][-1]), sum(row["durations"])), reverse=True)
+
+        summaries = []
+        for period, (start, end, _, _), (accumulator, days, plan) in zip(periods, ranges, aggregates, strict=True):
+            summary = {"period": period, "start": start, "end": end, "days": days}
+            summary["total_duration"] = accumulator.total_duration
+            if accumulator.error_bound:
+                summary["approximate"] = True
+                summary["max_error"] = accumulator.error_bound
+            if explain:
+                summary["plan"] = plan.explain()
+            summaries.append(summary)
+
+        baseline_total = summaries[0]["total_duration"]
+        result = {
+            "bucket_id": bucket_id,
+            "key": key,
+            "periods": summaries,
+            "total_deltas": [summary["total_duration"] - baseline_total for summary in summaries[1:]],
+            "values": rows[:limit],
+            "total_values": len(rows),
+        }
+        return json.dumps(result, indent=2)
+
+    except httpx.HTTPStatusError as error:
+        status_code = error.response.status_code
+        if status_code == 404:
+            return f"""Bucket not found: {bucket_id}
+
+Please check that you've entered the correct bucket ID. You can get a list of available buckets using the activitywatch-list-buckets tool.
+"""
+        return f"Failed to compare periods: {error} (Status code: {status_code})"
+
+    except httpx.RequestError as error:
+        return f"""Failed to compare periods: {error}
+
+This appears to be a network or connection error. Please check:
+- The ActivityWatch server is running
+- The API base URL is correct
+- No firewall or network issues are blocking the connection
+"""
+
+    except Exception as error:
+        return f"Failed to compare periods: {error}"
@@ -0,0 +1,96 @@
+"""ActivityWatch MCP Server - Export Tool."""
+
+import asyncio
+import json
+
+import httpx
+from fastmcp import Context
+from pydantic import BaseModel, Field
+
+from ..chunks import day_windows, iter_event_chunks, resolve_range
+from ..client import upstream_client
+from ..export import ExportWriter, export_path
+from ..progress import Progress
+from ..server import mcp
+
+
+class ExportArgs(BaseModel):
+    """Arguments for export tool."""
+
+    bucket_ids: list[str] = Field(..., description="IDs of buckets to export", min_length=1)
+    start: str = Field(..., description="Start date/time in ISO format")
+    end: str | None = Field(None, description="End date/time in ISO format (default: now)")
+    format: str = Field("ndjson", description="'ndjson' or 'columnar'")
+    filename: str | None = Field(None, description="File name in the server's export directory (default: generated)")
+
+
+@mcp.tool(name="activitywatch-export")
+async def export(
+    bucket_ids: list[str],
+    start: str,
+    end: str | None = None,
+    format: str = "ndjson",
+    filename: str | None = None,
+    ctx: Context | None = None,
+) -> str:
+    """Export the raw events of one or more buckets over a range to a local file, for offline analysis.
+
+    Events are streamed to the file one day at a time, so ranges of any length
+    can be exported; only the path, the row counts and SHA-256 checksums are
+    returned. Every event is written once, unclipped, in the day it starts in.
+    NDJSON files hold one JSON event per line with its bucket_id; columnar
+    files hold typed arrays per bucket and day (see the README).
+
+    Args:
+        bucket_ids: IDs of the buckets to export
+        start: Start date/time in ISO format (e.g. '2024-02-01T00:00:00Z')
+        end: End date/time in ISO format (default: now)
+        format: 'ndjson' (default) or 'columnar'
+        filename: Name of the file in the server's export directory; an existing file is replaced
+            (default: a generated name)
+        ctx: MCP context with lifespan data containing api_base and export_dir
+
+    Returns:
+        JSON string with the file path, format, size, rows and checksums, in total and per bucket
+    """
+    bucket_id = None
+    try:
+        start_us, end_us = resolve_range(start, end)
+        path = export_path(ctx, filename, format)
+
+        progress = Progress(ctx, total=len(day_windows(start_us, end_us)) * len(bucket_ids))
+        writer = ExportWriter(path, format)
+        try:
+            async with upstream_client(ctx) as client:
+                for bucket_id in bucket_ids:
+                    async for chunk in iter_event_chunks(
+                        ctx, client, bucket_id, start_us, end_us, progress, clip=False
+                    ):
+                        await asyncio.to_thread(writer.write, bucket_id, chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        summary = await asyncio.to_thread(writer.close)
+        summary.update({"start": start, "end": end})
+        return json.dumps(summary, indent=2)
+
+    except httpx.HTTPStatusError as error:
+        status_code = error.response.status_code
+        if status_code == 404:
+            return f"""Bucket not found: {bucket_id}
+
+Please check that you've entered the correct bucket ID. You can get a list of available buckets using the activitywatch-list-buckets tool.
+"""
+        return f"Failed to export events: {error} (Status code: {status_code})"
+
+    except httpx.RequestError as error:
+        return f"""Failed to export events: {error}
+
+This appears to be a network or connection error. Please check:
+- The ActivityWatch server is running
+- The API base URL is correct
+- No firewall or network issues are blocking the connection
+"""
+
+    except Exception as error:
+        return f"Failed to export events: {error}"
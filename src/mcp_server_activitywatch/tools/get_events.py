@@ -8,6 +8,15 @@ import httpx
 from fastmcp import Context
 from pydantic import BaseModel, Field
 
+from ..chunks import get_compact_gap
+from ..client import upstream_client
+from ..delta import SinceToken
+from ..events import compact_events
+from ..filters import EventFilter, stream_events
+from ..jsonio import get_json_codec
+from ..offload import offload_if_large
+from ..planner import DIRECT, Plan, Timer, fetch_events_sharded, plan_events
+from ..progress import Progress
 from ..server import mcp
 
 
@@ -18,6 +27,14 @@ class GetEventsArgs(BaseModel):
     limit: int | None = Field(None, description="Max number of events (default: 100)")
     start: str | None = Field(None, description="Start date/time in ISO format")
     end: str | None = Field(None, description="End date/time in ISO format")
+    fields: list[str] | None = Field(None, description="Event data keys to return, e.g. ['app']")
+    where: dict[str, Any] | None = Field(None, description="Data key to the value it must equal")
+    match: dict[str, str] | None = Field(None, description="Data key to a regex searched case-insensitively")
+    since_token: str | None = Field(None, description="Token from a previous call; only newer events are returned")
+    compact: float | None = Field(
+        None, description="Merge consecutive events with identical data at most this many seconds apart", ge=0
+    )
+    explain: bool = Field(False, description="Wrap the result with the chosen fetch plan and its timings")
 
 
 @mcp.tool(name="activitywatch-get-events")
@@ -26,15 +43,35 @@ async def get_events(
     limit: int | None = None,
     start: str | None = None,
     end: str | None = None,
+    fields: list[str] | None = None,
+    where: dict[str, Any] | None = None,
+    match: dict[str, str] | None = None,
+    since_token: str | None = None,
+    compact: float | None = None,
+    explain: bool = False,
     ctx: Context | None = None,
 ) -> str:
     """Get raw events from an ActivityWatch bucket.
 
+    Filters are applied while the response is decoded, so events that are
+    dropped and data keys that are not requested are never collected.
+
     Args:
         bucket_id: ID of the bucket to fetch events from
-        limit: Maximum number of events to return (default: 100)
+        limit: Maximum number of events to return (default: 100); with where or match,
+            the number of matching events; with since_token, the oldest changes first
         start: Start date/time in ISO format (e.g. '2024-02-01T00:00:00Z')
         end: End date/time in ISO format (e.g. '2024-02-28T23:59:59Z')
+        fields: Event data keys to return, e.g. ['app']; id, timestamp and duration are always returned
+        where: Data key to the value it must equal, e.g. {"app": "Firefox"}
+        match: Data key to a regex searched case-insensitively in its value, e.g. {"title": "github"}
+        since_token: Return only events added or updated since the call that returned this
+            token. Pass an empty string to start; the response includes the next token.
+        compact: Merge runs of consecutive events with identical (returned) data that overlap, touch
+            or are at most this many seconds apart, e.g. 0 or 1; merged events keep the id and
+            timestamp of their first event (default: the server's --compact-gap, off unless set)
+        explain: Return ``{"plan": ..., "result": ...}`` with the fetch strategy chosen
+            (direct, cache or sharded), its cost estimates and timings
         ctx: MCP context with lifespan data containing api_base
 
     Returns:
@@ -42,25 +79,77 @@ async def get_events(
     """
     try:
         api_base = ctx.lifespan_context["api_base"] if ctx else "http://localhost:5600/api/0"
-
-        params: dict[str, str] = {}
-        if limit is not None:
-            params["limit"] = str(limit)
-        if start:
-            params["start"] = start
-        if end:
-            params["end"] = end
-
-        url = f"{api_base}/buckets/{bucket_id}/events"
-        if params:
-            url += f"?{urlencode(params)}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, timeout=10.0)
-            response.raise_for_status()
-            events = response.json()
-
-        return json.dumps(events, indent=2)
+        if compact is not None and compact < 0:
+            raise ValueError(f"compact must be a gap of 0 seconds or more, got {compact}")
+        gap = compact if compact is not None else get_compact_gap(ctx)
+        # Days cached compacted with the server's gap cannot be uncompacted; read raw days for another gap.
+        compacted = gap == get_compact_gap(ctx)
+
+        since = SinceToken.decode(since_token) if since_token is not None else None
+        if since is not None:
+            start = since.start_for(start)
+
+        event_filter = EventFilter(fields, where, match)
+        json_codec = get_json_codec(ctx)
+        async with upstream_client(ctx) as client:
+            timer = Timer()
+            if since is not None:
+                plan = Plan(DIRECT, "delta requests read from the since token cursor")
+            else:
+                plan = await plan_events(ctx, client, bucket_id, start, end, limit, compacted)
+            timer.lap(plan, "plan")
+
+            if plan.strategy == DIRECT:
+                params: dict[str, str] = {}
+                # A limit applies to matching events, which aw-server cannot tell apart, and in delta
+                # mode to the oldest changes, so the whole cursor window is fetched.
+                upstream_limit = limit if since is None else None
+                if upstream_limit is not None and not event_filter.selective:
+                    params["limit"] = str(limit)
+                if start:
+                    params["start"] = start
+                if end:
+                    params["end"] = end
+
+                url = f"{api_base}/buckets/{bucket_id}/events"
+                if params:
+                    url += f"?{urlencode(params)}"
+
+                if event_filter.active:
+                    progress = Progress(ctx, total=plan.estimated_events or None, unit="events")
+                    events, size_hint = await stream_events(client, url, event_filter, upstream_limit, progress)
+                else:
+                    response = await client.get(url, timeout=10.0)
+                    response.raise_for_status()
+                    events = await json_codec.loads(response.content)
+                    size_hint = len(response.content)
+                    # The body is not needed once decoded; do not hold it while the result is encoded.
+                    del response
+            else:
+                progress = Progress(ctx, total=plan.days)
+                events = await fetch_events_sharded(
+                    ctx, client, bucket_id, start, end, limit, event_filter, progress, compacted
+                )
+                size_hint = len(events) * 256
+            timer.lap(plan, "execute")
+
+        result: Any = events
+        if since is None and gap is not None:
+            result = compact_events(events, gap)
+        elif since is not None:
+            changed, updated, following = since.page(events, limit)
+            if gap is not None:
+                changed = compact_events(changed, gap)
+            result = {
+                "events": changed,
+                "count": len(changed),
+                "updated_ids": updated,
+                "since_token": following.encode(),
+            }
+        if explain:
+            result = {"plan": plan.explain(), "result": result}
+
+        return await offload_if_large(await json_codec.dumps(result, size_hint=size_hint), ctx)
 
     except httpx.HTTPStatusError as error:
         status_code = error.response.status_code
@@ -2,12 +2,13 @@
 
 import json
 import os
-from typing import Any
 from urllib.parse import quote
 
 import httpx
 from fastmcp import Context
 
+from ..client import upstream_client
+from ..jsonio import get_json_codec
 from ..server import mcp
 
 
@@ -33,12 +34,13 @@ async def get_settings(
             encoded_key = quote(key, safe="")
             endpoint = f"{endpoint}/{encoded_key}"
 
-        async with httpx.AsyncClient() as client:
+        json_codec = get_json_codec(ctx)
+        async with upstream_client(ctx) as client:
             response = await client.get(endpoint, timeout=10.0)
             response.raise_for_status()
-            settings = response.json()
+            settings = await json_codec.loads(response.content)
 
-        formatted_settings = json.dumps(settings, indent=2)
+        formatted_settings = await json_codec.dumps(settings, size_hint=len(response.content))
         result_text = formatted_settings
 
         if os.getenv("PYTEST_CURRENT_TEST") is None:
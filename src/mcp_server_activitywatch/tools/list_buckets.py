@@ -6,8 +6,10 @@ from typing import Any
 
 import httpx
 from fastmcp import Context
-from pydantic import BaseModel, Field
+from pydantic import BaseModel
 
+from ..client import fetch_buckets, upstream_client
+from ..jsonio import get_json_codec
 from ..server import mcp
 
 
@@ -40,12 +42,9 @@ async def list_buckets(
         JSON string with bucket information
     """
     try:
-        api_base = ctx.lifespan_context["api_base"] if ctx else "http://localhost:5600/api/0"
-
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            response = await client.get(f"{api_base}/buckets", timeout=10.0)
-            response.raise_for_status()
-            buckets_data = response.json()
+        json_codec = get_json_codec(ctx)
+        async with upstream_client(ctx) as client:
+            buckets_data = await fetch_buckets(ctx, client)
 
         bucket_list: list[Bucket] = []
         for bucket_id, bucket_data in buckets_data.items():
@@ -76,7 +75,7 @@ async def list_buckets(
             for b in bucket_list
         ]
 
-        result_text = json.dumps(formatted_buckets, indent=2)
+        result_text = await json_codec.dumps(formatted_buckets, size_hint=256 * len(formatted_buckets))
 
         if os.getenv("PYTEST_CURRENT_TEST") is None and bucket_list:
             result_text += "\n\n"
@@ -0,0 +1,118 @@
+"""ActivityWatch MCP Server - Run Named Query Tool."""
+
+import json
+from typing import Any
+
+import httpx
+from fastmcp import Context
+from pydantic import BaseModel, Field
+
+from ..chunks import resolve_period
+from ..client import fetch_buckets, upstream_client
+from ..jsonio import get_json_codec
+from ..named_queries import get_query_registry, resolve_bucket
+from ..offload import offload_if_large
+from ..server import mcp
+from .run_query import execute_query
+
+GLOB_CHARACTERS = set("*?[")
+
+
+class RunNamedQueryArgs(BaseModel):
+    """Arguments for run_named_query tool."""
+
+    name: str = Field(..., description="Name of a query registered by the server operator")
+    params: dict[str, Any] | None = Field(None, description="Values of the query's parameters")
+    timeperiods: list[str] | None = Field(
+        None, description="Periods like '2024-10-28/2024-10-29', 'today', 'last_7_days' or 'last_week'"
+    )
+    explain: bool = Field(False, description="Wrap the result with the rendered query, plan and timings")
+
+
+@mcp.tool(name="activitywatch-run-named-query")
+async def run_named_query(
+    name: str,
+    params: dict[str, Any] | None = None,
+    timeperiods: list[str] | None = None,
+    explain: bool = False,
+    ctx: Context | None = None,
+) -> str:
+    """Run a query template registered by the server operator, filling in its parameters.
+
+    Templates are validated once when the server starts. Parameter values are
+    type-checked and rendered as literals; bucket parameters accept glob
+    patterns such as 'aw-watcher-window_*'. An unknown name lists the
+    registered queries with their parameters.
+
+    Args:
+        name: Name of the registered query
+        params: Values of the query's parameters; parameters with defaults may be omitted
+        timeperiods: Periods like '2024-10-28/2024-10-29', 'today', 'last_7_days' or 'last_week'
+            (default: the query's own periods)
+        explain: Return ``{"query": ..., "plan": ..., "result": ...}`` with the rendered query,
+            the strategy chosen and timings
+        ctx: MCP context with lifespan data containing api_base
+
+    Returns:
+        JSON string with query results
+    """
+    registry = get_query_registry(ctx)
+    if name not in registry.queries:
+        if not registry.queries:
+            return f"""Unknown named query: {name}
+
+No named queries are registered. Start the server with --queries-file or AW_QUERIES_FILE pointing to a JSON file of query templates.
+"""
+        available = [query.describe() for query in registry.queries.values()]
+        return f"Unknown named query: {name}\n\nAvailable queries:\n{json.dumps(available, indent=2)}"
+
+    try:
+        named_query = registry.get(name)
+        bound = named_query.bind(params or {})
+        periods = [resolve_period(period) for period in timeperiods or named_query.timeperiods]
+        if not periods:
+            raise ValueError(f"No timeperiods given and '{name}' has no default periods")
+
+        json_codec = get_json_codec(ctx)
+        async with upstream_client(ctx) as client:
+            patterns = [
+                param_name
+                for param_name, param in named_query.params.items()
+                if param.type == "bucket" and GLOB_CHARACTERS & set(bound[param_name])
+            ]
+            if patterns:
+                buckets = await fetch_buckets(ctx, client)
+                for param_name in patterns:
+                    bound[param_name] = resolve_bucket(bound[param_name], buckets)
+
+            query = named_query.render(bound)
+            result, size_hint, plan = await execute_query(ctx, client, query, periods, explain=explain)
+
+        if explain:
+            result = {"query": query, "plan": plan.explain(), "result": result}
+
+        return await offload_if_large(await json_codec.dumps(result, size_hint=size_hint), ctx)
+
+    except httpx.HTTPStatusError as error:
+        status_code = error.response.status_code
+        error_message = f"Named query failed: {error} (Status code: {status_code})"
+
+        try:
+            error_details = error.response.json()
+            error_message += f"\nDetails: {json.dumps(error_details)}"
+        except Exception:
+            error_message += f"\nDetails: {error.response.text}"
+
+        return error_message
+
+    except httpx.RequestError as error:
+        return f"""Named query failed: {error}
+
+This appears to be a network or connection error. Please check:
+- The ActivityWatch server is running
+- The API base URL is correct
+- No firewall or network issues are blocking the connection
+"""
+
+    except Exception as error:
+        return f"Named query failed: {error}"
@@ -7,6 +7,13 @@ import httpx
 from fastmcp import Context
 from pydantic import BaseModel, Field
 
+from ..aql import AQLSyntaxError, canonical_query
+from ..cache import CachedValue, get_event_cache
+from ..client import upstream_client
+from ..jsonio import get_json_codec
+from ..offload import offload_if_large
+from ..planner import CACHE, Plan, Timer, plan_query, query_cache_key
+from ..progress import Progress
 from ..server import mcp
 
 
@@ -26,6 +33,57 @@ class RunQueryArgs(BaseModel):
         max_length=1,
     )
     name: str | None = Field(None, description="Optional query name for caching")
+    explain: bool = Field(False, description="Wrap the result with the chosen plan and its timings")
+
+
+async def execute_query(
+    ctx: Context | None,
+    client: httpx.AsyncClient,
+    query: str,
+    timeperiods: list[str],
+    name: str | None = None,
+    explain: bool = False,
+) -> tuple[Any, int, Plan]:
+    """Run a query on aw-server, or answer it from the cache, as planned.
+
+    Args:
+        ctx: MCP context with lifespan data containing api_base
+        client: HTTP client
+        query: Query text with all statements
+        timeperiods: Periods formatted as 'start/end'
+        name: Optional query name passed to aw-server
+        explain: Estimate the events the query scans for the plan
+
+    Returns:
+        The result, its size in bytes and the plan with its timings
+    """
+    api_base = ctx.lifespan_context["api_base"] if ctx else "http://localhost:5600/api/0"
+    url = f"{api_base}/query/"
+    if name:
+        url += f"?name={name}"
+
+    cache = get_event_cache(ctx)
+    cache_key = query_cache_key(api_base, query, timeperiods)
+    timer = Timer()
+    plan = await plan_query(ctx, client, query, timeperiods, estimate=explain)
+    timer.lap(plan, "plan")
+
+    if plan.strategy == CACHE:
+        cached = await cache.aget(cache_key)
+        result, size_hint = cached.value, cached.size
+    else:
+        progress = Progress(ctx, total=2, unit="steps")
+        await progress.report(f"Running the query over {len(timeperiods)} period(s) on aw-server")
+        response = await client.post(url, json={"query": [query], "timeperiods": timeperiods}, timeout=30.0)
+        response.raise_for_status()
+        await progress.advance()
+        result = await get_json_codec(ctx).loads(response.content)
+        size_hint = len(response.content)
+        if cache is not None and cache_key is not None:
+            await cache.aput(cache_key, CachedValue(result, size_hint))
+        await progress.advance()
+    timer.lap(plan, "execute")
+    return result, size_hint, plan
 
 
 @mcp.tool(name="activitywatch-run-query")
@@ -33,6 +91,7 @@ async def run_query(
     timeperiods: list[str],
     query: list[str],
     name: str | None = None,
+    explain: bool = False,
     ctx: Context | None = None,
 ) -> str:
     """Run a query in ActivityWatch's query language (AQL).
@@ -43,14 +102,14 @@ async def run_query(
         query: Array with ONE string containing ALL query statements separated by semicolons.
             DO NOT split statements into separate array elements.
         name: Optional name for the query (used for caching)
+        explain: Return ``{"plan": ..., "result": ...}`` with the strategy chosen (pushdown
+            or cache), the events the query scans and timings
         ctx: MCP context with lifespan data containing api_base
 
     Returns:
         JSON string with query results
     """
     try:
-        api_base = ctx.lifespan_context["api_base"] if ctx else "http://localhost:5600/api/0"
-
         # Process timeperiods to ensure correct format
         formatted_timeperiods = []
 
@@ -62,22 +121,27 @@ async def run_query(
 
         # Format query - join all into single string (should already be one)
         query_string = " ".join(query)
-        formatted_queries = [query_string]
+        # Reject malformed queries before a round trip; the parse is reused for the cache key.
+        # Syntax the parser does not know is left to aw-server, and such queries are not cached.
+        canonical_query(query_string)
+
+        json_codec = get_json_codec(ctx)
+        async with upstream_client(ctx) as client:
+            result, size_hint, plan = await execute_query(
+                ctx, client, query_string, formatted_timeperiods, name=name, explain=explain
+            )
 
-        # Set up query data
-        query_data = {"query": formatted_queries, "timeperiods": formatted_timeperiods}
+        if explain:
+            result = {"plan": plan.explain(), "result": result}
 
-        # Build URL with optional name parameter
-        url = f"{api_base}/query/"
-        if name:
-            url += f"?name={name}"
+        return await offload_if_large(await json_codec.dumps(result, size_hint=size_hint), ctx)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=query_data, timeout=30.0)
-            response.raise_for_status()
-            result = response.json()
+    except AQLSyntaxError as error:
+        return f"""Query failed: {error}
 
-        return json.dumps(result, indent=2)
+Queries are one string of statements separated by semicolons, and one of them must assign RETURN.
+Use the activitywatch-query-examples tool for correctly formatted queries.
+"""
 
     except httpx.HTTPStatusError as error:
         status_code = error.response.status_code
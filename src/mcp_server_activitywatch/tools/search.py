@@ -0,0 +1,183 @@
+"""ActivityWatch MCP Server - Search Tool."""
+
+import json
+from collections import defaultdict
+
+import httpx
+from fastmcp import Context
+from pydantic import BaseModel, Field
+
+from ..chunks import DAY_US, SETTLE_US, day_windows, iter_event_chunks, now_us, resolve_range
+from ..client import DEFAULT_API_BASE, fetch_buckets, upstream_client
+from ..columnar import from_epoch_us
+from ..intervals import merge_ranges
+from ..progress import Progress
+from ..server import mcp
+from ..text_index import BucketIndex, TextIndex, get_text_index, tokenize
+
+# Bucket types whose events carry a title or url worth searching.
+SEARCHABLE_TYPES = ("currentwindow", "web.tab.current")
+
+
+class SearchArgs(BaseModel):
+    """Arguments for search tool."""
+
+    query: str = Field(..., description="Words to search for in window titles and URLs")
+    start: str = Field(..., description="Start date/time in ISO format")
+    end: str | None = Field(None, description="End date/time in ISO format (default: now)")
+    bucket_ids: list[str] | None = Field(None, description="Buckets to search (default: all window and web buckets)")
+    limit: int = Field(50, description="Maximum number of time ranges returned per bucket", ge=1, le=1000)
+
+
+async def searchable_buckets(ctx: Context | None, client: httpx.AsyncClient) -> list[str]:
+    """Return the IDs of all window and web buckets."""
+    buckets = await fetch_buckets(ctx, client)
+    return sorted(bucket_id for bucket_id, bucket in buckets.items() if bucket.get("type") in SEARCHABLE_TYPES)
+
+
+async def search_bucket(
+    ctx: Context | None,
+    client: httpx.AsyncClient,
+    index: BucketIndex,
+    bucket_id: str,
+    terms: set[str],
+    start_us: int,
+    end_us: int,
+    progress: Progress | None = None,
+) -> tuple[list[tuple[int, int]], int]:
+    """Search one bucket, indexing the settled days of the range it has not indexed yet.
+
+    Days that have not settled are indexed into a throwaway index for this search only.
+    ``progress`` is advanced by one step per day searched.
+
+    Returns:
+        The matching ranges and the number of days fetched
+    """
+    settled_before = now_us() - SETTLE_US
+    recent = BucketIndex(index.merge_gap_us)
+    fetched = 0
+
+    for day_start, window_start, window_end in day_windows(start_us, end_us):
+        day_end = day_start + DAY_US
+        if day_end > settled_before:
+            async for chunk in iter_event_chunks(ctx, client, bucket_id, window_start, window_end):
+                recent.add_chunk(chunk)
+            fetched += 1
+        elif day_start not in index.days:
+            async for chunk in iter_event_chunks(ctx, client, bucket_id, day_start, day_end):
+                index.add_chunk(chunk, day_start)
+            fetched += 1
+        if progress is not None:
+            await progress.advance()
+
+    ranges = index.search(terms, start_us, end_us) + recent.search(terms, start_us, end_us)
+    return merge_ranges(ranges), fetched
+
+
+@mcp.tool(name="activitywatch-search")
+async def search(
+    query: str,
+    start: str,
+    end: str | None = None,
+    bucket_ids: list[str] | None = None,
+    limit: int = 50,
+    ctx: Context | None = None,
+) -> str:
+    """Search window titles and URLs, e.g. to answer "when did I work on X".
+
+    Returns the time ranges in which an event whose title or URL contains all
+    words of the query was active. Past days are indexed once and then served
+    from an in-memory inverted index, so repeated searches are fast.
+
+    Args:
+        query: Words to search for; all of them must match (case-insensitive, whole words)
+        start: Start date/time in ISO format (e.g. '2024-02-01T00:00:00Z')
+        end: End date/time in ISO format (default: now)
+        bucket_ids: Buckets to search (default: all window and web buckets)
+        limit: Maximum number of time ranges returned per bucket; the longest are kept (default: 50)
+        ctx: MCP context with lifespan data containing api_base
+
+    Returns:
+        JSON string with the matching time ranges and total durations per bucket
+    """
+    bucket_id = None
+    try:
+        terms = tokenize(query)
+        if not terms:
+            return f"Search query has no searchable words: {query!r}"
+
+        start_us, end_us = resolve_range(start, end)
+        api_base = ctx.lifespan_context.get("api_base", DEFAULT_API_BASE) if ctx else DEFAULT_API_BASE
+        text_index = get_text_index(ctx) or TextIndex()
+
+        results = []
+        fetched_days = 0
+        async with upstream_client(ctx) as client:
+            if bucket_ids is None:
+                bucket_ids = await searchable_buckets(ctx, client)
+            progress = Progress(ctx, total=len(bucket_ids) * len(day_windows(start_us, end_us)))
+
+            for bucket_id in bucket_ids:
+                index = text_index.bucket(api_base, bucket_id)
+                ranges, fetched = await search_bucket(ctx, client, index, bucket_id, terms, start_us, end_us, progress)
+                fetched_days += fetched
+                text_index.fit()
+
+                daily: dict[str, float] = defaultdict(float)
+                for range_start, range_end in ranges:
+                    for _, window_start, window_end in day_windows(range_start, range_end):
+                        daily[from_epoch_us(window_start)[:10]] += (window_end - window_start) / 1_000_000
+
+                shown = ranges
+                if len(ranges) > limit:
+                    shown = sorted(sorted(ranges, key=lambda r: r[1] - r[0], reverse=True)[:limit])
+
+                bucket_result = {
+                    "bucket_id": bucket_id,
+                    "total_duration": sum(range_end - range_start for range_start, range_end in ranges) / 1_000_000,
+                    "days": dict(daily),
+                    "ranges": [
+                        {
+                            "start": from_epoch_us(range_start),
+                            "end": from_epoch_us(range_end),
+                            "duration": (range_end - range_start) / 1_000_000,
+                        }
+                        for range_start, range_end in shown
+                    ],
+                }
+                if len(shown) < len(ranges):
+                    bucket_result["truncated"] = True
+                    bucket_result["total_ranges"] = len(ranges)
+                results.append(bucket_result)
+
+        result = {
+            "query": query,
+            "terms": sorted(terms),
+            "start": start,
+            "end": end,
+            "total_duration": sum(bucket["total_duration"] for bucket in results),
+            "fetched_days": fetched_days,
+            "buckets": results,
+        }
+        return json.dumps(result, indent=2)
+
+    except httpx.HTTPStatusError as error:
+        status_code = error.response.status_code
+        if status_code == 404:
+            return f"""Bucket not found: {bucket_id}
+
+Please check that you've entered the correct bucket ID. You can get a list of available buckets using the activitywatch-list-buckets tool.
+"""
+        return f"Failed to search events: {error} (Status code: {status_code})"
+
+    except httpx.RequestError as error:
+        return f"""Failed to search events: {error}
+
+This appears to be a network or connection error. Please check:
+- The ActivityWatch server is running
+- The API base URL is correct
+- No firewall or network issues are blocking the connection
+"""
+
+    except Exception as error:
+        return f"Failed to search events: {error}"
@@ -0,0 +1,133 @@
+"""ActivityWatch MCP Server - Sessions Tool."""
+
+import httpx
+from fastmcp import Context
+from pydantic import BaseModel, Field
+
+from ..chunks import day_windows, iter_event_chunks, resolve_range
+from ..client import upstream_client
+from ..columnar import from_epoch_us
+from ..jsonio import get_json_codec
+from ..offload import offload_if_large
+from ..progress import Progress
+from ..server import mcp
+from ..sessionize import DEFAULT_GAP_SECONDS, Sessionizer, afk_active_ranges
+from ..timeline import Categorizer
+
+
+class SessionsArgs(BaseModel):
+    """Arguments for sessions tool."""
+
+    bucket_id: str = Field(..., description="ID of bucket to sessionize, usually a window bucket")
+    start: str = Field(..., description="Start date/time in ISO format")
+    end: str | None = Field(None, description="End date/time in ISO format (default: now)")
+    afk_bucket_id: str | None = Field(None, description="AFK bucket whose AFK periods split sessions")
+    gap: float = Field(DEFAULT_GAP_SECONDS, description="Seconds of inactivity that end a session", ge=0)
+    key: str = Field("app", description="Event data key used for the dominant value, e.g. app")
+    categories: dict[str, str] | None = Field(
+        None, description="Category name to regex matched against app and title; the dominant value is then a category"
+    )
+    min_active: float = Field(0.0, description="Omit sessions with less active time in seconds", ge=0)
+
+
+@mcp.tool(name="activitywatch-sessions")
+async def sessions(
+    bucket_id: str,
+    start: str,
+    end: str | None = None,
+    afk_bucket_id: str | None = None,
+    gap: float = DEFAULT_GAP_SECONDS,
+    key: str = "app",
+    categories: dict[str, str] | None = None,
+    min_active: float = 0.0,
+    ctx: Context | None = None,
+) -> str:
+    """Split activity into work sessions separated by gaps or AFK periods.
+
+    Events are streamed one day at a time in a single pass, so ranges of months
+    stay cheap, and past days are served from the event cache.
+
+    Args:
+        bucket_id: ID of the bucket to sessionize, usually a window bucket
+        start: Start date/time in ISO format (e.g. '2024-02-01T00:00:00Z')
+        end: End date/time in ISO format (default: now)
+        afk_bucket_id: AFK bucket; time reported as AFK is not active and AFK periods longer than gap split sessions
+        gap: Seconds of inactivity that end a session (default: 300)
+        key: Event data key used for each session's dominant value, e.g. 'app' (default: 'app')
+        categories: Category name to regex matched case-insensitively against app and title,
+            first match wins; if given, each session's dominant value is its top category instead of a key value
+        min_active: Omit sessions with less active time in seconds (default: 0)
+        ctx: MCP context with lifespan data containing api_base
+
+    Returns:
+        JSON string with the sessions and a summary
+    """
+    current_bucket = bucket_id
+    try:
+        start_us, end_us = resolve_range(start, end)
+        categorizer = Categorizer(categories) if categories else None
+        sessionizer = Sessionizer(int(gap * 1_000_000), key=key, categorizer=categorizer)
+
+        progress = Progress(ctx, total=len(day_windows(start_us, end_us)))
+        async with (
+            upstream_client(ctx) as client,
+            afk_active_ranges(ctx, client, afk_bucket_id, start_us, end_us) as next_active,
+        ):
+            async for chunk in iter_event_chunks(ctx, client, bucket_id, start_us, end_us, progress):
+                current_bucket = afk_bucket_id
+                active = await next_active()
+                current_bucket = bucket_id
+                sessionizer.add_chunk(chunk, active)
+
+        found = [session for session in sessionizer.finish() if session.active >= min_active * 1_000_000]
+        total_active = sum(session.active for session in found) / 1_000_000
+        result = {
+            "bucket_id": bucket_id,
+            "afk_bucket_id": afk_bucket_id,
+            "start": start,
+            "end": end,
+            "gap": gap,
+            "key": key,
+            "categories": categories,
+            "count": len(found),
+            "total_active": total_active,
+            "mean_active": total_active / len(found) if found else 0.0,
+            "sessions": [],
+        }
+        for session in found:
+            value, duration = session.dominant()
+            result["sessions"].append(
+                {
+                    "start": from_epoch_us(session.start),
+                    "end": from_epoch_us(session.end),
+                    "duration": (session.end - session.start) / 1_000_000,
+                    "active": session.active / 1_000_000,
+                    "events": session.events,
+                    "dominant": value,
+                    "dominant_share": duration / session.active if session.active else 0.0,
+                }
+            )
+
+        json_codec = get_json_codec(ctx)
+        return await offload_if_large(await json_codec.dumps(result, size_hint=len(found) * 256), ctx)
+
+    except httpx.HTTPStatusError as error:
+        status_code = error.response.status_code
+        if status_code == 404:
+            return f"""Bucket not found: {current_bucket}
+
+Please check that you've entered the correct bucket ID. You can get a list of available buckets using the activitywatch-list-buckets tool.
+"""
+        return f"Failed to compute sessions: {error} (Status code: {status_code})"
+
+    except httpx.RequestError as error:
+        return f"""Failed to compute sessions: {error}
+
+This appears to be a network or connection error. Please check:
+- The ActivityWatch server is running
+- The API base URL is correct
+- No firewall or network issues are blocking the connection
+"""
+
+    except Exception as error:
+        return f"Failed to compute sessions: {error}"
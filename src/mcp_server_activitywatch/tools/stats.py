@@ -0,0 +1,236 @@
+"""ActivityWatch MCP Server - Statistics Tool."""
+
+import json
+from typing import Any
+
+import httpx
+from fastmcp import Context
+from pydantic import BaseModel, Field
+
+from ..cache import get_event_cache
+from ..chunks import DAY_US, SETTLE_US, day_windows, get_compact_gap, iter_event_chunks, now_us, resolve_range
+from ..client import DEFAULT_API_BASE, upstream_client
+from ..columnar import MISSING, EventColumns, hashable
+from ..progress import Progress
+from ..server import mcp
+from ..sketches import HyperLogLog, KLLSketch, stable_hash
+from ..timeline import Categorizer
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Consecutive events of the same value at most this far apart form one focus span.
+FOCUS_GAP_US = 10 * 1_000_000
+
+
+class StatsArgs(BaseModel):
+    """Arguments for stats tool."""
+
+    bucket_id: str = Field(..., description="ID of bucket to summarize")
+    start: str = Field(..., description="Start date/time in ISO format")
+    end: str | None = Field(None, description="End date/time in ISO format (default: now)")
+    key: str = Field("app", description="Event data key to group by, e.g. app")
+    categories: dict[str, str] | None = Field(
+        None, description="Category name to regex matched against app and title; groups are then categories"
+    )
+    limit: int = Field(20, description="Maximum number of groups returned", ge=1, le=1000)
+
+
+class GroupStats:
+    """Mergeable statistics of the focus spans of one group."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.durations = KLLSketch()
+        self.titles = HyperLogLog()
+
+    def merge(self, other: "GroupStats") -> None:
+        """Add the statistics of ``other``, leaving it unchanged."""
+        self.count += other.count
+        self.total += other.total
+        self.durations.merge(other.durations)
+        self.titles.merge(other.titles)
+
+    def summary(self) -> dict[str, Any]:
+        """Return the statistics as a JSON-serializable dict."""
+        p50, p90, p99 = self.durations.quantiles(list(QUANTILES))
+        return {
+            "count": self.count,
+            "total_duration": self.total,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": p50,
+            "p90": p90,
+            "p99": p99,
+            "distinct_titles": self.titles.count(),
+        }
+
+    def nbytes(self) -> int:
+        """Return an estimate of the memory held by the sketches."""
+        return self.durations.nbytes() + self.titles.nbytes() + 64
+
+
+class DayStats:
+    """Statistics of one chunk of events, per group and overall."""
+
+    def __init__(self) -> None:
+        self.groups: dict[Any, GroupStats] = {}
+        self.overall = GroupStats()
+
+    @classmethod
+    def from_chunk(cls, chunk: EventColumns, key: str, categorizer: Categorizer | None = None) -> "DayStats":
+        """Summarize a start-sorted chunk.
+
+        Consecutive events of the same value are joined into focus spans, whose
+        lengths feed the quantiles. Events without ``key`` are skipped. With a
+        categorizer, events are grouped by category instead of ``key``.
+        """
+        stats = cls()
+        if categorizer is not None:
+            codes, values = categorizer.codes(chunk), categorizer.names
+        else:
+            codes = chunk.columns.get(key)
+            if codes is None:
+                return stats
+            values = [hashable(value) for value in chunk.values(key)]
+        title_codes = chunk.columns.get("title")
+        # Hash every distinct title once rather than every event.
+        title_hashes = [stable_hash(title) for title in chunk.values("title")]
+
+        span_code, span_end, span_duration, span_titles = MISSING, 0, 0.0, set()
+        for row, (code, start, duration) in enumerate(zip(codes, chunk.starts, chunk.durations, strict=True)):
+            if code == MISSING:
+                continue
+            if code != span_code or start > span_end + FOCUS_GAP_US:
+                if span_code != MISSING:
+                    stats._add(values[span_code], span_duration, span_titles, title_hashes)
+                span_code, span_end, span_duration, span_titles = code, start, 0.0, set()
+            span_end = max(span_end, start + int(duration * 1_000_000))
+            span_duration += duration
+            if title_codes is not None and title_codes[row] != MISSING:
+                span_titles.add(title_codes[row])
+        if span_code != MISSING:
+            stats._add(values[span_code], span_duration, span_titles, title_hashes)
+        return stats
+
+    def _add(self, value: Any, duration: float, titles: set[int], title_hashes: list[int]) -> None:
+        """Record a focus span."""
+        group = self.groups.get(value)
+        if group is None:
+            group = self.groups[value] = GroupStats()
+        for target in (group, self.overall):
+            target.count += 1
+            target.total += duration
+            target.durations.update(duration)
+            for title in titles:
+                target.titles.add_hash(title_hashes[title])
+
+    def merge(self, other: "DayStats") -> None:
+        """Add the statistics of ``other``, leaving it unchanged."""
+        for value, group in other.groups.items():
+            if value not in self.groups:
+                self.groups[value] = GroupStats()
+            self.groups[value].merge(group)
+        self.overall.merge(other.overall)
+
+    def nbytes(self) -> int:
+        """Return an estimate of the memory held by the sketches."""
+        return self.overall.nbytes() + sum(group.nbytes() for group in self.groups.values())
+
+
+@mcp.tool(name="activitywatch-stats")
+async def stats(
+    bucket_id: str,
+    start: str,
+    end: str | None = None,
+    key: str = "app",
+    categories: dict[str, str] | None = None,
+    limit: int = 20,
+    ctx: Context | None = None,
+) -> str:
+    """Get duration statistics per app or category: count, mean, p50/p90/p99 and distinct titles.
+
+    Statistics are over focus spans, i.e. runs of consecutive events with the
+    same value. Quantiles and distinct counts come from mergeable sketches
+    built per day; summaries of past days are cached, so long ranges are
+    answered by merging them instead of rescanning events.
+
+    Args:
+        bucket_id: ID of the bucket to summarize
+        start: Start date/time in ISO format (e.g. '2024-02-01T00:00:00Z')
+        end: End date/time in ISO format (default: now)
+        key: Event data key to group by, e.g. 'app' (default: 'app')
+        categories: Category name to regex matched case-insensitively against app and title,
+            first match wins; if given, events are grouped by category instead of key
+        limit: Maximum number of groups returned, largest total duration first (default: 20)
+        ctx: MCP context with lifespan data containing api_base
+
+    Returns:
+        JSON string with overall and per-group statistics
+    """
+    try:
+        start_us, end_us = resolve_range(start, end)
+        api_base = ctx.lifespan_context.get("api_base", DEFAULT_API_BASE) if ctx else DEFAULT_API_BASE
+        cache = get_event_cache(ctx)
+        settled_before = now_us() - SETTLE_US
+        categorizer = Categorizer(categories) if categories else None
+        # Order matters, as the first matching category wins.
+        grouping = ("categories", *categories.items()) if categories else ("key", key)
+
+        total = DayStats()
+        days = cached_days = 0
+        progress = Progress(ctx, total=len(day_windows(start_us, end_us)))
+        async with upstream_client(ctx) as client:
+            for day_start, window_start, window_end in day_windows(start_us, end_us):
+                days += 1
+                day_end = day_start + DAY_US
+                whole_day = window_start == day_start and window_end == day_end
+                cache_key = ("stats", api_base, bucket_id, day_start, grouping, get_compact_gap(ctx))
+                cacheable = cache is not None and whole_day and day_end <= settled_before
+
+                day_stats = await cache.aget(cache_key) if cacheable else None
+                if day_stats is None:
+                    day_stats = DayStats()
+                    async for chunk in iter_event_chunks(ctx, client, bucket_id, window_start, window_end):
+                        day_stats = DayStats.from_chunk(chunk, key, categorizer)
+                    if cacheable:
+                        await cache.aput(cache_key, day_stats)
+                else:
+                    cached_days += 1
+                total.merge(day_stats)
+                await progress.advance()
+
+        ranked = sorted(total.groups.items(), key=lambda item: item[1].total, reverse=True)
+        result = {
+            "bucket_id": bucket_id,
+            "key": key,
+            "categories": categories,
+            "start": start,
+            "end": end,
+            "days": days,
+            "cached_days": cached_days,
+            "overall": total.overall.summary(),
+            "groups": [{"value": value, **group.summary()} for value, group in ranked[:limit]],
+            "total_groups": len(ranked),
+        }
+        return json.dumps(result, indent=2)
+
+    except httpx.HTTPStatusError as error:
+        status_code = error.response.status_code
+        if status_code == 404:
+            return f"""Bucket not found: {bucket_id}
+
+Please check that you've entered the correct bucket ID. You can get a list of available buckets using the activitywatch-list-buckets tool.
+"""
+        return f"Failed to compute statistics: {error} (Status code: {status_code})"
+
+    except httpx.RequestError as error:
+        return f"""Failed to compute statistics: {error}
+
+This appears to be a network or connection error. Please check:
+- The ActivityWatch server is running
+- The API base URL is correct
+- No firewall or network issues are blocking the connection
+"""
+
+    except Exception as error:
+        return f"Failed to compute statistics: {error}"
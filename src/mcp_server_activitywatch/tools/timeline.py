@@ -0,0 +1,132 @@
+"""ActivityWatch MCP Server - Timeline Tool."""
+
+import httpx
+from fastmcp import Context
+from pydantic import BaseModel, Field
+
+from ..chunks import DAY_US, day_windows, iter_event_chunks, resolve_range
+from ..client import upstream_client
+from ..columnar import from_epoch_us
+from ..jsonio import get_json_codec
+from ..offload import offload_if_large
+from ..progress import Progress
+from ..server import mcp
+from ..timeline import Categorizer, bin_chunks
+
+MAX_BINS = 20_000
+
+
+class TimelineArgs(BaseModel):
+    """Arguments for timeline tool."""
+
+    bucket_ids: list[str] = Field(..., description="IDs of buckets to resample, e.g. a window and a web bucket")
+    start: str = Field(..., description="Start date/time in ISO format")
+    end: str | None = Field(None, description="End date/time in ISO format (default: now)")
+    bin_size: int = Field(3600, description="Bin width in seconds; must divide a day, e.g. 300 or 3600", ge=1)
+    key: str = Field("app", description="Event data key whose dominant value is reported per bin")
+    categories: dict[str, str] | None = Field(
+        None, description="Category name to regex matched against app and title, first match wins"
+    )
+
+
+@mcp.tool(name="activitywatch-timeline")
+async def timeline(
+    bucket_ids: list[str],
+    start: str,
+    end: str | None = None,
+    bin_size: int = 3600,
+    key: str = "app",
+    categories: dict[str, str] | None = None,
+    ctx: Context | None = None,
+) -> str:
+    """Resample buckets into fixed time bins, e.g. for an hourly or 5-minute heatmap.
+
+    Each bin reports the seconds covered by any event (active), the dominant
+    value of a data key (e.g. app) and, if categories are given, the seconds
+    per category. Bins are aligned to UTC midnight and returned as arrays.
+
+    Args:
+        bucket_ids: IDs of the buckets to resample, e.g. a window and a web bucket
+        start: Start date/time in ISO format (e.g. '2024-02-01T00:00:00Z')
+        end: End date/time in ISO format (default: now)
+        bin_size: Bin width in seconds; must divide a day, e.g. 300 or 3600 (default: 3600)
+        key: Event data key whose dominant value is reported per bin (default: 'app')
+        categories: Category name to regex matched case-insensitively against app and title,
+            e.g. {"Programming": "code|github"}; the first match wins
+        ctx: MCP context with lifespan data containing api_base
+
+    Returns:
+        JSON string with per-bin arrays of active seconds, dominant values and category seconds
+    """
+    bucket_id = None
+    try:
+        start_us, end_us = resolve_range(start, end)
+        bin_us = bin_size * 1_000_000
+        if bin_size <= 0 or DAY_US % bin_us:
+            raise ValueError(f"bin_size must divide a day evenly, e.g. 300 or 3600, got {bin_size}")
+        first_bin = start_us - start_us % bin_us
+        total_bins = -(-(end_us - first_bin) // bin_us)
+        if total_bins > MAX_BINS:
+            raise ValueError(
+                f"Too many bins ({total_bins}, at most {MAX_BINS}); use a larger bin_size or shorter range"
+            )
+        categorizer = Categorizer(categories) if categories else None
+
+        active: list[float] = []
+        dominant: list = []
+        category_seconds: dict[str, list[float]] = {name: [] for name in categorizer.names} if categorizer else {}
+        windows = day_windows(start_us, end_us)
+        progress = Progress(ctx, total=len(windows))
+        async with upstream_client(ctx) as client:
+            for _, window_start, window_end in windows:
+                chunks = []
+                for bucket_id in bucket_ids:
+                    async for chunk in iter_event_chunks(ctx, client, bucket_id, window_start, window_end):
+                        chunks.append(chunk)
+
+                origin = window_start - window_start % bin_us
+                nbins = -(-(window_end - origin) // bin_us)
+                bins = bin_chunks(chunks, origin, bin_us, nbins, key=key, categorizer=categorizer)
+                active.extend(round(seconds, 1) for seconds in bins.active)
+                dominant.extend(value for value, _ in bins.dominant())
+                for name, row in zip(category_seconds, bins.categories, strict=True):
+                    category_seconds[name].extend(round(seconds, 1) for seconds in row)
+                await progress.advance(events=sum(len(chunk) for chunk in chunks))
+
+        result = {
+            "bucket_ids": bucket_ids,
+            "start": start,
+            "end": end,
+            "bin_size": bin_size,
+            "first_bin": from_epoch_us(first_bin),
+            "bins": len(active),
+            "key": key,
+            "active": active,
+            "dominant": dominant,
+        }
+        if categorizer:
+            result["categories"] = category_seconds
+
+        json_codec = get_json_codec(ctx)
+        return await offload_if_large(await json_codec.dumps(result, size_hint=len(active) * 32), ctx)
+
+    except httpx.HTTPStatusError as error:
+        status_code = error.response.status_code
+        if status_code == 404:
+            return f"""Bucket not found: {bucket_id}
+
+Please check that you've entered the correct bucket ID. You can get a list of available buckets using the activitywatch-list-buckets tool.
+"""
+        return f"Failed to build timeline: {error} (Status code: {status_code})"
+
+    except httpx.RequestError as error:
+        return f"""Failed to build timeline: {error}
+
+This appears to be a network or connection error. Please check:
+- The ActivityWatch server is running
+- The API base URL is correct
+- No firewall or network issues are blocking the connection
+"""
+
+    except Exception as error:
+        return f"Failed to build timeline: {error}"
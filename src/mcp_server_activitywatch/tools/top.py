@@ -0,0 +1,174 @@
+"""ActivityWatch MCP Server - Top Values Tool."""
+
+import heapq
+import json
+from typing import Any
+
+import httpx
+from fastmcp import Context
+from pydantic import BaseModel, Field
+
+from ..chunks import day_windows, iter_event_chunks, resolve_range
+from ..client import upstream_client
+from ..planner import PUSHDOWN, Plan, Timer, plan_aggregate, pushdown_durations_by
+from ..progress import Progress
+from ..server import mcp
+
+# Distinct values tracked between chunks; beyond this the smallest partial totals are pruned.
+MAX_TRACKED_VALUES = 10_000
+
+
+class TopArgs(BaseModel):
+    """Arguments for top tool."""
+
+    bucket_id: str = Field(..., description="ID of bucket to aggregate")
+    start: str = Field(..., description="Start date/time in ISO format")
+    end: str | None = Field(None, description="End date/time in ISO format (default: now)")
+    key: str = Field("app", description="Event data key to group by, e.g. app, title or url")
+    k: int = Field(10, description="Number of top values to return", ge=1, le=1000)
+    explain: bool = Field(False, description="Include the chosen plan and its timings")
+
+
+class TopAccumulator:
+    """Streaming top-K by total duration with bounded memory.
+
+    Partial per-chunk totals are merged into a table of at most
+    ``max_tracked`` values. When the table overflows, the values with the
+    smallest totals are pruned; the largest pruned total is added to an error
+    bound, which caps how much any reported total may be underestimated.
+    """
+
+    def __init__(self, max_tracked: int = MAX_TRACKED_VALUES):
+        self.max_tracked = max_tracked
+        self.totals: dict[Any, float] = {}
+        self.total_duration = 0.0
+        self.error_bound = 0.0
+
+    def add(self, partial: dict[Any, float]) -> None:
+        """Merge the per-value totals of one chunk."""
+        totals = self.totals
+        for value, duration in partial.items():
+            totals[value] = totals.get(value, 0.0) + duration
+            self.total_duration += duration
+
+        if len(totals) > self.max_tracked:
+            ranked = heapq.nlargest(self.max_tracked + 1, totals.items(), key=lambda item: item[1])
+            self.error_bound += ranked[-1][1]
+            self.totals = dict(ranked[:-1])
+
+    def top(self, k: int) -> list[tuple[Any, float]]:
+        """Return the ``k`` values with the largest totals, largest first."""
+        return heapq.nlargest(k, self.totals.items(), key=lambda item: item[1])
+
+
+async def aggregate_durations(
+    ctx: Context | None,
+    client: httpx.AsyncClient,
+    bucket_id: str,
+    key: str,
+    start_us: int,
+    end_us: int,
+    progress: Progress | None = None,
+) -> tuple[TopAccumulator, int, Plan]:
+    """Total the durations per value of ``key`` over a range, locally or by aw-server as planned.
+
+    ``progress`` is advanced by one step per day aggregated.
+
+    Returns:
+        The totals, the number of days aggregated and the plan with its timings
+    """
+    accumulator = TopAccumulator()
+    days = 0
+    timer = Timer()
+    plan = await plan_aggregate(ctx, client, bucket_id, start_us, end_us)
+    timer.lap(plan, "plan")
+
+    if plan.strategy == PUSHDOWN:
+        accumulator.add(await pushdown_durations_by(ctx, client, bucket_id, key, start_us, end_us))
+        days = plan.days
+        if progress is not None:
+            await progress.advance(days)
+    else:
+        async for chunk in iter_event_chunks(ctx, client, bucket_id, start_us, end_us, progress):
+            accumulator.add(chunk.durations_by(key))
+            days += 1
+    timer.lap(plan, "execute")
+    return accumulator, days, plan
+
+
+@mcp.tool(name="activitywatch-top")
+async def top(
+    bucket_id: str,
+    start: str,
+    end: str | None = None,
+    key: str = "app",
+    k: int = 10,
+    explain: bool = False,
+    ctx: Context | None = None,
+) -> str:
+    """Get the top values of an event data key by total duration, e.g. the top 10 apps this month.
+
+    Events are streamed one day at a time and aggregated without returning them,
+    so long ranges stay cheap. Depending on estimated cost, cached days are
+    aggregated locally or large uncached ranges are aggregated by aw-server.
+
+    Args:
+        bucket_id: ID of the bucket to aggregate
+        start: Start date/time in ISO format (e.g. '2024-02-01T00:00:00Z')
+        end: End date/time in ISO format (default: now)
+        key: Event data key to group by, e.g. 'app', 'title' or 'url'
+        k: Number of top values to return (default: 10)
+        explain: Include the plan chosen (cache, sharded or pushdown), its cost estimates and timings
+        ctx: MCP context with lifespan data containing api_base
+
+    Returns:
+        JSON string with the top values and their durations
+    """
+    try:
+        start_us, end_us = resolve_range(start, end)
+
+        progress = Progress(ctx, total=len(day_windows(start_us, end_us)))
+        async with upstream_client(ctx) as client:
+            accumulator, days, plan = await aggregate_durations(ctx, client, bucket_id, key, start_us, end_us, progress)
+
+        total = accumulator.total_duration
+        result = {
+            "bucket_id": bucket_id,
+            "key": key,
+            "start": start,
+            "end": end,
+            "days": days,
+            "total_duration": total,
+            "top": [
+                {"value": value, "duration": duration, "share": duration / total if total else 0.0}
+                for value, duration in accumulator.top(k)
+            ],
+        }
+        if accumulator.error_bound:
+            result["approximate"] = True
+            result["max_error"] = accumulator.error_bound
+        if explain:
+            result["plan"] = plan.explain()
+
+        return json.dumps(result, indent=2)
+
+    except httpx.HTTPStatusError as error:
+        status_code = error.response.status_code
+        if status_code == 404:
+            return f"""Bucket not found: {bucket_id}
+
+Please check that you've entered the correct bucket ID. You can get a list of available buckets using the activitywatch-list-buckets tool.
+"""
+        return f"Failed to compute top values: {error} (Status code: {status_code})"
+
+    except httpx.RequestError as error:
+        return f"""Failed to compute top values: {error}
+
+This appears to be a network or connection error. Please check:
+- The ActivityWatch server is running
+- The API base URL is correct
+- No firewall or network issues are blocking the connection
+"""
+
+    except Exception as error:
+        return f"Failed to compute top values: {error}"
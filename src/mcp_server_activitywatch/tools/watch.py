@@ -0,0 +1,147 @@
+"""ActivityWatch MCP Server - Watch Tool."""
+
+import asyncio
+import json
+from typing import Any
+from urllib.parse import urlencode
+
+import httpx
+from fastmcp import Context
+from pydantic import BaseModel, Field
+
+from ..client import upstream_client
+from ..delta import SinceToken, WatchToken
+from ..jsonio import get_json_codec
+from ..server import mcp
+
+# Longest a single call may block, below common client request timeouts.
+MAX_TIMEOUT = 300.0
+
+
+class WatchArgs(BaseModel):
+    """Arguments for watch tool."""
+
+    bucket_ids: list[str] = Field(..., description="IDs of buckets to watch", min_length=1)
+    since_token: str | None = Field(None, description="Token from a previous watch call; omit to start")
+    timeout: float = Field(30.0, description="Seconds to wait for new events at most", ge=0, le=MAX_TIMEOUT)
+
+
+async def fetch_bucket_events(
+    ctx: Context | None, client: httpx.AsyncClient, bucket_id: str, params: dict[str, str]
+) -> list[dict[str, Any]]:
+    """Fetch the events of one bucket with the given query parameters, newest first."""
+    api_base = ctx.lifespan_context["api_base"] if ctx else "http://localhost:5600/api/0"
+    response = await client.get(f"{api_base}/buckets/{bucket_id}/events?{urlencode(params)}", timeout=10.0)
+    response.raise_for_status()
+    return await get_json_codec(ctx).loads(response.content)
+
+
+@mcp.tool(name="activitywatch-watch")
+async def watch(
+    bucket_ids: list[str],
+    since_token: str | None = None,
+    timeout: float = 30.0,
+    ctx: Context | None = None,
+) -> str:
+    """Wait until new events arrive in any of the given buckets, then return only the new or extended events.
+
+    Use this instead of calling activitywatch-get-events in a loop, e.g. to follow
+    what the user is doing now. The first call returns the latest event of every
+    bucket at once; pass the returned since_token to the next call, which blocks
+    until a bucket changes or the timeout passes. Changes are detected by the
+    server's shared bucket poller, so waiting calls do not query ActivityWatch
+    however many there are. Not available when the server runs several HTTP
+    workers, whose pollers do not share versions.
+
+    Args:
+        bucket_ids: IDs of the buckets to watch, e.g. a window and an AFK bucket
+        since_token: Token returned by the previous call; omit it (or pass an empty string) to start
+        timeout: Seconds to wait for new events at most (default: 30, max: 300)
+        ctx: MCP context with lifespan data containing api_base and bucket_watcher
+
+    Returns:
+        JSON string with the new or extended events per bucket, the IDs of the extended
+        ones, whether the call timed out, and the since_token for the next call
+    """
+    bucket_id = None
+    try:
+        if not 0 <= timeout <= MAX_TIMEOUT:
+            raise ValueError(f"timeout must be between 0 and {MAX_TIMEOUT:g} seconds, got {timeout}")
+        if ctx and ctx.lifespan_context.get("stateless"):
+            raise ValueError("Watching is not available when the server runs several HTTP workers")
+        watcher = ctx.lifespan_context.get("bucket_watcher") if ctx else None
+        if watcher is None:
+            raise ValueError("Watching requires the server's bucket watcher")
+        token = WatchToken.decode(since_token or "")
+        token = WatchToken(
+            buckets={bucket_id: since for bucket_id, since in token.buckets.items() if bucket_id in bucket_ids},
+            versions={bucket_id: version for bucket_id, version in token.versions.items() if bucket_id in bucket_ids},
+        )
+
+        events: dict[str, list[dict[str, Any]]] = {}
+        updated_ids: dict[str, list[str]] = {}
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        async with upstream_client(ctx) as client:
+            started = [bucket_id for bucket_id in bucket_ids if bucket_id not in token.buckets]
+            if started:
+                # New buckets start at their latest event and the call returns without waiting.
+                versions = watcher.versions(started)
+                for bucket_id in started:
+                    latest = await fetch_bucket_events(ctx, client, bucket_id, {"limit": "1"})
+                    tail = []
+                    if latest:
+                        # Events ending where the latest starts are returned from its cursor too; mark them seen.
+                        tail = await fetch_bucket_events(ctx, client, bucket_id, {"start": latest[0]["timestamp"]})
+                    token.buckets[bucket_id] = SinceToken().advance(tail)
+                    token.versions[bucket_id] = versions[bucket_id]
+                    events[bucket_id] = latest
+            else:
+                while True:
+                    seen = {bucket_id: token.versions.get(bucket_id) for bucket_id in bucket_ids}
+                    versions = await watcher.wait_for_update(seen, max(deadline - loop.time(), 0.0))
+                    for bucket_id in bucket_ids:
+                        if versions[bucket_id] == seen[bucket_id]:
+                            continue
+                        # The version is recorded before the fetch, so a later change is never missed.
+                        since = token.buckets[bucket_id]
+                        params = {"start": since.cursor} if since.cursor else {"limit": "1"}
+                        fetched = await fetch_bucket_events(ctx, client, bucket_id, params)
+                        changed, updated = since.diff(fetched)
+                        token.buckets[bucket_id] = since.advance(fetched)
+                        token.versions[bucket_id] = versions[bucket_id]
+                        if changed:
+                            events[bucket_id] = changed
+                            updated_ids[bucket_id] = updated
+                    if events or loop.time() >= deadline:
+                        break
+
+        result = {
+            "events": events,
+            "count": sum(len(bucket_events) for bucket_events in events.values()),
+            "updated_ids": updated_ids,
+            "timed_out": not events and not started,
+            "since_token": token.encode(),
+        }
+        return json.dumps(result, indent=2)
+
+    except httpx.HTTPStatusError as error:
+        status_code = error.response.status_code
+        if status_code == 404:
+            return f"""Bucket not found: {bucket_id}
+
+Please check that you've entered the correct bucket ID. You can get a list of available buckets using the activitywatch-list-buckets tool.
+"""
+        return f"Failed to watch buckets: {error} (Status code: {status_code})"
+
+    except httpx.RequestError as error:
+        return f"""Failed to watch buckets: {error}
+
+This appears to be a network or connection error. Please check:
+- The ActivityWatch server is running
+- The API base URL is correct
+- No firewall or network issues are blocking the connection
+"""
+
+    except Exception as error:
+        return f"Failed to watch buckets: {error}"
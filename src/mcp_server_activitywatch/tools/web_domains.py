@@ -0,0 +1,120 @@
+"""ActivityWatch MCP Server - Web Domains Tool."""
+
+import json
+
+import httpx
+from fastmcp import Context
+from pydantic import BaseModel, Field
+
+from ..chunks import day_windows, iter_event_chunks, resolve_range
+from ..client import upstream_client
+from ..progress import Progress
+from ..server import mcp
+from ..sessionize import afk_active_ranges
+from ..web import WebRollup
+
+
+class WebDomainsArgs(BaseModel):
+    """Arguments for web_domains tool."""
+
+    bucket_id: str = Field(..., description="ID of a web bucket, e.g. aw-watcher-web-firefox")
+    start: str = Field(..., description="Start date/time in ISO format")
+    end: str | None = Field(None, description="End date/time in ISO format (default: now)")
+    afk_bucket_id: str | None = Field(None, description="AFK bucket; only time not reported as AFK is active")
+    group_by: str = Field("domain", description="'domain' (registered domain) or 'path' (host and path prefix)")
+    depth: int = Field(1, description="Path segments per group when grouping by path", ge=1, le=10)
+    limit: int = Field(20, description="Maximum number of groups returned", ge=1, le=1000)
+
+
+@mcp.tool(name="activitywatch-web-domains")
+async def web_domains(
+    bucket_id: str,
+    start: str,
+    end: str | None = None,
+    afk_bucket_id: str | None = None,
+    group_by: str = "domain",
+    depth: int = 1,
+    limit: int = 20,
+    ctx: Context | None = None,
+) -> str:
+    """Total browser time per registered domain (e.g. github.com) or per path prefix (e.g. github.com/owner).
+
+    Events are streamed one day at a time and totalled per distinct URL before
+    grouping, and URLs are normalized once each through a bounded cache, so
+    only the ranking is returned. With an AFK bucket, time reported as AFK is
+    not counted as active.
+
+    Args:
+        bucket_id: ID of a web bucket, e.g. 'aw-watcher-web-firefox'
+        start: Start date/time in ISO format (e.g. '2024-02-01T00:00:00Z')
+        end: End date/time in ISO format (default: now)
+        afk_bucket_id: AFK bucket; only the part of each visit not reported as AFK is active
+        group_by: 'domain' to group by registered domain (default), or 'path' to group by host and path prefix
+        depth: Path segments per group when grouping by path, e.g. 2 for 'github.com/owner/repo' (default: 1)
+        limit: Maximum number of groups returned, most active time first (default: 20)
+        ctx: MCP context with lifespan data containing api_base
+
+    Returns:
+        JSON string with the active and total seconds and event count per group
+    """
+    current_bucket = bucket_id
+    try:
+        start_us, end_us = resolve_range(start, end)
+        rollup = WebRollup(group_by, depth)
+
+        progress = Progress(ctx, total=len(day_windows(start_us, end_us)))
+        async with (
+            upstream_client(ctx) as client,
+            afk_active_ranges(ctx, client, afk_bucket_id, start_us, end_us) as next_active,
+        ):
+            async for chunk in iter_event_chunks(ctx, client, bucket_id, start_us, end_us, progress):
+                current_bucket = afk_bucket_id
+                active = await next_active()
+                current_bucket = bucket_id
+                rollup.add_chunk(chunk, active)
+
+        total_duration = sum(totals.duration for totals in rollup.groups.values()) / 1_000_000
+        total_active = sum(totals.active for totals in rollup.groups.values()) / 1_000_000
+        result = {
+            "bucket_id": bucket_id,
+            "afk_bucket_id": afk_bucket_id,
+            "start": start,
+            "end": end,
+            "group_by": group_by,
+            "depth": depth if group_by == "path" else None,
+            "total_duration": total_duration,
+            "total_active": total_active,
+            "count": len(rollup.groups),
+            "groups": [
+                {
+                    "group": group,
+                    "active": totals.active / 1_000_000,
+                    "duration": totals.duration / 1_000_000,
+                    "events": totals.events,
+                    "share": totals.active / 1_000_000 / total_active if total_active else 0.0,
+                }
+                for group, totals in rollup.top(limit)
+            ],
+        }
+        return json.dumps(result, indent=2)
+
+    except httpx.HTTPStatusError as error:
+        status_code = error.response.status_code
+        if status_code == 404:
+            return f"""Bucket not found: {current_bucket}
+
+Please check that you've entered the correct bucket ID. You can get a list of available buckets using the activitywatch-list-buckets tool.
+"""
+        return f"Failed to aggregate web activity: {error} (Status code: {status_code})"
+
+    except httpx.RequestError as error:
+        return f"""Failed to aggregate web activity: {error}
+
+This appears to be a network or connection error. Please check:
+- The ActivityWatch server is running
+- The API base URL is correct
+- No firewall or network issues are blocking the connection
+"""
+
+    except Exception as error:
+        return f"Failed to aggregate web activity: {error}"
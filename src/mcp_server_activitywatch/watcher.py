@@ -0,0 +1,215 @@
+"""ActivityWatch MCP Server - Bucket change watcher.
+
+A single background poller watches every bucket's ``last_updated`` metadata
+with one cheap ``GET /buckets`` request per interval and sends
+``notifications/resources/updated`` to the sessions subscribed to the
+resources of the buckets that actually changed. The same polls wake the
+long-polling ``activitywatch-watch`` calls waiting on those buckets, so there
+is one poller however many sessions subscribe or wait. Nothing is polled while
+nobody subscribes or waits.
+
+The interval adapts: after a poll in which a bucket changed, the next one
+follows after ``min_interval``; while nothing changes, the interval doubles up
+to ``interval``.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Iterable
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+import httpx
+
+from .cache import CacheBackend, CachedValue
+from .client import BUCKETS_TTL, buckets_cache_key, create_client
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_URI = "activitywatch://buckets"
+
+# Bucket fields shown by the buckets resources; a change to any of them changes the listing.
+LISTING_FIELDS = ("type", "client", "hostname", "created", "name")
+
+
+class BucketWatcher:
+    """Shared poller that turns bucket metadata changes into resource notifications."""
+
+    def __init__(
+        self,
+        api_base: str,
+        interval: float = 5.0,
+        client: httpx.AsyncClient | None = None,
+        cache: CacheBackend | None = None,
+        min_interval: float | None = None,
+    ):
+        """Create a watcher.
+
+        Args:
+            api_base: ActivityWatch API base URL
+            interval: Longest time in seconds between two polls of the bucket metadata
+            client: Shared HTTP client to poll with; a short-lived one is used per poll if None
+            cache: Event cache refreshed by every poll that sees a change, so reads after a notification see it
+            min_interval: Seconds between two polls while buckets keep changing (default: ``interval``)
+        """
+        self.api_base = api_base
+        self.interval = interval
+        self.min_interval = min(min_interval, interval) if min_interval is not None else interval
+        self.client = client
+        self.cache = cache
+        self.subscriptions: dict[str, set[Any]] = {}
+        self.delay = self.min_interval
+        self._waiters: list[tuple[dict[str, str | None], asyncio.Event]] = []
+        self._snapshot: dict[str, dict[str, Any]] | None = None
+        # Bucket metadata last written to the cache.
+        self._cached: dict[str, dict[str, Any]] | None = None
+        self._wakeup = asyncio.Event()
+
+    def subscribe(self, uri: str, session: Any) -> None:
+        """Register ``session`` for updates of the resource at ``uri``."""
+        self.subscriptions.setdefault(uri, set()).add(session)
+        self._wakeup.set()
+
+    def unsubscribe(self, uri: str, session: Any) -> None:
+        """Remove the subscription of ``session`` to ``uri``."""
+        sessions = self.subscriptions.get(uri)
+        if sessions is None:
+            return
+        sessions.discard(session)
+        if not sessions:
+            del self.subscriptions[uri]
+
+    def versions(self, bucket_ids: Iterable[str]) -> dict[str, str | None]:
+        """Return the ``last_updated`` of every bucket as of the last poll, None if unknown."""
+        snapshot = self._snapshot or {}
+        return {bucket_id: snapshot.get(bucket_id, {}).get("last_updated") for bucket_id in bucket_ids}
+
+    async def wait_for_update(self, seen: dict[str, str | None], timeout: float) -> dict[str, str | None]:
+        """Wait until a poll finds a bucket updated since the version in ``seen``, or ``timeout`` passes.
+
+        Args:
+            seen: Bucket ID to the ``last_updated`` the caller has seen, None if unknown
+            timeout: Seconds to wait at most
+
+        Returns:
+            The ``last_updated`` of the buckets in ``seen`` as of the last poll
+        """
+        if self._snapshot is not None and self.versions(seen) != seen:
+            return self.versions(seen)
+        event = asyncio.Event()
+        waiter = (seen, event)
+        self._waiters.append(waiter)
+        self._wakeup.set()
+        try:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(event.wait(), timeout)
+        finally:
+            self._waiters.remove(waiter)
+        return self.versions(seen)
+
+    async def fetch_buckets(self) -> dict[str, dict[str, Any]]:
+        """Fetch the metadata of every bucket."""
+        if self.client is None:
+            async with create_client(follow_redirects=True) as client:
+                return await self._get_buckets(client)
+        return await self._get_buckets(self.client)
+
+    async def _get_buckets(self, client: httpx.AsyncClient) -> dict[str, dict[str, Any]]:
+        response = await client.get(f"{self.api_base}/buckets", timeout=10.0)
+        response.raise_for_status()
+        buckets = response.json()
+        # Unchanged metadata is not written again; readers fetch it themselves once it expires.
+        if self.cache is not None and buckets != self._cached:
+            await self.cache.aput(
+                buckets_cache_key(self.api_base), CachedValue(buckets, len(response.content)), ttl=BUCKETS_TTL
+            )
+            self._cached = buckets
+        return buckets
+
+    async def poll_once(self) -> set[str]:
+        """Poll bucket metadata once, notify subscribers of changed resources and wake waiters of updated buckets.
+
+        The first poll only records a baseline for notifications; waiters compare with their own versions.
+
+        Returns:
+            The subscribed URIs that were notified
+        """
+        buckets = await self.fetch_buckets()
+        previous, self._snapshot = self._snapshot, buckets
+        for seen, event in self._waiters:
+            if self.versions(seen) != seen:
+                event.set()
+        if previous is None:
+            return set()
+
+        changed = {
+            bucket_id
+            for bucket_id in set(buckets) | set(previous)
+            if buckets.get(bucket_id, {}).get("last_updated") != previous.get(bucket_id, {}).get("last_updated")
+        }
+        relisted = {
+            bucket_id
+            for bucket_id in set(buckets) | set(previous)
+            if bucket_id not in buckets
+            or bucket_id not in previous
+            or _listing(buckets[bucket_id]) != _listing(previous[bucket_id])
+        }
+        relisted_types = {(buckets.get(bucket_id) or previous[bucket_id]).get("type", "") for bucket_id in relisted}
+        self.delay = self.min_interval if changed or relisted else min(self.delay * 2, self.interval)
+
+        notified = {uri for uri in self.subscriptions if _is_affected(uri, changed, relisted_types)}
+        for uri in notified:
+            await self._notify(uri)
+        return notified
+
+    async def _notify(self, uri: str) -> None:
+        """Send a resource-updated notification to every session subscribed to ``uri``."""
+        for session in list(self.subscriptions.get(uri, ())):
+            try:
+                await session.send_resource_updated(uri)
+            except Exception as error:
+                logger.debug("Dropping subscription to %s: %s", uri, error)
+                self.unsubscribe(uri, session)
+
+    async def run(self) -> None:
+        """Poll until cancelled, sleeping while nobody is subscribed or waiting."""
+        while True:
+            if not self.subscriptions and not self._waiters:
+                self._snapshot = None
+                self.delay = self.min_interval
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            try:
+                await self.poll_once()
+            except (httpx.HTTPError, ValueError) as error:
+                logger.debug("Bucket poll failed: %s", error)
+
+            await asyncio.sleep(self.delay)
+
+
+def _listing(bucket: dict[str, Any]) -> tuple:
+    """Return the fields of ``bucket`` that appear in the bucket listing."""
+    return tuple(bucket.get(field) for field in LISTING_FIELDS)
+
+
+def _is_affected(uri: str, changed: set[str], relisted_types: set[str]) -> bool:
+    """Return True if the resource at ``uri`` changed.
+
+    Args:
+        uri: Subscribed resource URI
+        changed: IDs of buckets whose events changed
+        relisted_types: Types of buckets that were added, removed or whose listing fields changed
+    """
+    parts = urlsplit(uri)
+    path = f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+    if path == BUCKETS_URI:
+        return bool(relisted_types)
+    if parts.netloc == "buckets":
+        bucket_type = parts.path.lstrip("/").lower()
+        return any(bucket_type in relisted_type.lower() for relisted_type in relisted_types)
+    if parts.netloc == "events":
+        return unquote(parts.path.lstrip("/")) in changed
+    return False
@@ -0,0 +1,162 @@
+"""ActivityWatch MCP Server - URL normalization and web activity rollups.
+
+Browser buckets (``aw-watcher-web``) repeat the same URLs thousands of times,
+so URLs are parsed and normalized once each through a bounded cache, and
+events are first totalled per distinct URL of a chunk, as integer codes, before
+they are grouped by registered domain or by path prefix.
+
+The registered domain is found without the Public Suffix List: it is the last
+two labels of the host, or the last three when the last two are a common
+second-level suffix such as ``co.uk``. Hosts under other multi-label suffixes
+are grouped one level too high.
+"""
+
+import functools
+import heapq
+import ipaddress
+from dataclasses import dataclass
+from urllib.parse import unquote, urlsplit
+
+from .columnar import MISSING, EventColumns
+from .intervals import clip_to_ranges
+
+GROUP_BY = ("domain", "path")
+
+# Distinct URLs whose normalized form is kept; a day of browsing has far fewer.
+URL_CACHE_SIZE = 65_536
+
+# Host and domain of URLs that cannot be parsed, e.g. with an unterminated IPv6 host.
+INVALID_HOST = "invalid:"
+
+# Second-level labels under which registrars sell names, e.g. example.co.uk.
+SECOND_LEVEL_LABELS = frozenset({"ac", "co", "com", "edu", "gov", "ltd", "net", "ne", "or", "org", "plc", "sch"})
+
+
+@dataclass(frozen=True)
+class ParsedUrl:
+    """The parts of a normalized URL used for grouping."""
+
+    host: str
+    domain: str
+    segments: tuple[str, ...]
+
+    def prefix(self, depth: int) -> str:
+        """Return the host and the first ``depth`` path segments, e.g. ``github.com/owner/repo``."""
+        return f"{self.host}/{'/'.join(self.segments[:depth])}"
+
+
+def registered_domain(host: str) -> str:
+    """Return the registered domain of a normalized host, e.g. ``bbc.co.uk`` for ``news.bbc.co.uk``."""
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return host
+    except ValueError:
+        pass
+    labels = host.split(".")
+    keep = 3 if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS else 2
+    return ".".join(labels[-keep:])
+
+
+@functools.lru_cache(maxsize=URL_CACHE_SIZE)
+def parse_url(url: str) -> ParsedUrl:
+    """Normalize a URL and split it into host, registered domain and path segments.
+
+    The scheme, port, credentials, query and fragment are dropped, the host is
+    lowercased without a leading ``www.``, and empty path segments are removed.
+    URLs without a host, e.g. ``about:blank`` or ``file:///``, get their scheme
+    (``about:``) as host and domain, and URLs that cannot be parsed get
+    ``INVALID_HOST``.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return ParsedUrl(INVALID_HOST, INVALID_HOST, ())
+    host = (parts.hostname or "").rstrip(".")
+    if not host:
+        host = f"{parts.scheme.lower()}:" if parts.scheme else ""
+        return ParsedUrl(host, host, ())
+    host = host.removeprefix("www.")
+    segments = tuple(unquote(segment) for segment in parts.path.split("/") if segment)
+    return ParsedUrl(host, registered_domain(host), segments)
+
+
+def url_group(url: str, group_by: str, depth: int = 1) -> str:
+    """Return the group of ``url``: its registered domain, or its host and first ``depth`` path segments."""
+    parsed = parse_url(url)
+    return parsed.domain if group_by == "domain" else parsed.prefix(depth)
+
+
+@dataclass
+class WebTotals:
+    """Totals of one group of URLs."""
+
+    duration: int = 0
+    active: int = 0
+    events: int = 0
+
+
+class WebRollup:
+    """Streaming totals of web events per domain or path prefix, optionally weighted by activity."""
+
+    def __init__(self, group_by: str = "domain", depth: int = 1, key: str = "url"):
+        """Create a rollup.
+
+        Args:
+            group_by: "domain" or "path"
+            depth: Path segments kept per group when grouping by path
+            key: Event data key holding the URL
+        """
+        if group_by not in GROUP_BY:
+            raise ValueError(f"Unsupported group_by '{group_by}' (available: {', '.join(GROUP_BY)})")
+        self.group_by = group_by
+        self.depth = depth
+        self.key = key
+        self.groups: dict[str, WebTotals] = {}
+
+    def add_chunk(self, chunk: EventColumns, active: list[tuple[int, int]] | None = None) -> None:
+        """Add the events of a start-sorted chunk.
+
+        Args:
+            chunk: Events to add; events without a URL are skipped
+            active: If given, sorted and merged ranges (e.g. not-AFK periods) to which active time is clipped;
+                otherwise all of an event's duration is active
+        """
+        codes = chunk.columns.get(self.key)
+        if codes is None:
+            return
+        active_starts = [start for start, _ in active] if active is not None else None
+
+        # Total per URL code first, so each distinct URL of the chunk is grouped once.
+        per_code: dict[int, list[int]] = {}
+        for code, start, duration in zip(codes, chunk.starts, chunk.durations, strict=True):
+            if code == MISSING:
+                continue
+            end = start + int(duration * 1_000_000)
+            covered = end - start
+            if active is not None:
+                covered = sum(
+                    clipped_end - clipped_start
+                    for clipped_start, clipped_end in clip_to_ranges(start, end, active, active_starts)
+                )
+            totals = per_code.get(code)
+            if totals is None:
+                per_code[code] = [end - start, covered, 1]
+            else:
+                totals[0] += end - start
+                totals[1] += covered
+                totals[2] += 1
+
+        values = chunk.values(self.key)
+        for code, (duration, covered, events) in per_code.items():
+            url = values[code]
+            group = url_group(url, self.group_by, self.depth) if isinstance(url, str) else str(url)
+            totals = self.groups.get(group)
+            if totals is None:
+                totals = self.groups[group] = WebTotals()
+            totals.duration += duration
+            totals.active += covered
+            totals.events += events
+
+    def top(self, limit: int) -> list[tuple[str, WebTotals]]:
+        """Return the ``limit`` groups with the most active time, largest first."""
+        return heapq.nlargest(limit, self.groups.items(), key=lambda item: (item[1].active, item[1].duration))
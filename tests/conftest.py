@@ -1,7 +1,7 @@
 """Pytest configuration and fixtures."""
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 import pytest
@@ -12,6 +12,11 @@ class MockContext:
     """Mock MCP Context for testing."""
 
     lifespan_context: dict[str, Any]
+    progress: list[tuple[float, float | None, str | None]] = field(default_factory=list)
+
+    async def report_progress(self, progress: float, total: float | None = None, message: str | None = None) -> None:
+        """Record a progress notification."""
+        self.progress.append((progress, total, message))
 
     @classmethod
     def with_api_base(cls, api_base: str = "http://localhost:5600/api/0") -> "MockContext":
@@ -34,3 +39,37 @@ def set_test_environment(request):
 def mock_ctx():
     """Create a mock context with default api_base."""
     return MockContext.with_api_base()
+
+
+def serve_events(events: list[dict[str, Any]]):
+    """Build an httpx_mock callback serving ``events`` like aw-server's events endpoint.
+
+    Events overlapping the requested start/end are returned newest first, at
+    most ``limit`` of them; on the ``/events/count`` endpoint their number is
+    returned.
+    """
+    from datetime import timedelta
+
+    import httpx
+    from mcp_server_activitywatch.events import parse_timestamp
+
+    def callback(request: httpx.Request) -> httpx.Response:
+        start = request.url.params.get("start")
+        end = request.url.params.get("end")
+        selected = [
+            event
+            for event in events
+            if (
+                start is None
+                or parse_timestamp(event["timestamp"]) + timedelta(seconds=event["duration"]) >= parse_timestamp(start)
+            )
+            and (end is None or parse_timestamp(event["timestamp"]) <= parse_timestamp(end))
+        ]
+        if request.url.path.endswith("/count"):
+            return httpx.Response(200, json=len(selected))
+        selected.sort(key=lambda event: parse_timestamp(event["timestamp"]), reverse=True)
+        if "limit" in request.url.params:
+            selected = selected[: int(request.url.params["limit"])]
+        return httpx.Response(200, json=selected)
+
+    return callback
@@ -0,0 +1,96 @@
+"""Tests for the AQL parser."""
+
+import re
+
+import pytest
+from mcp_server_activitywatch.aql import AQLSyntaxError, AQLUnsupportedError, canonical_query, parse_query
+
+
+def test_canonical_form():
+    """Test that equivalent queries share a canonical form."""
+    first = """
+        events = query_bucket('aw-watcher-window_host');
+        RETURN = {"b": events, "a": [1, 2.5]};
+    """
+    second = 'events=query_bucket("aw-watcher-window_host");RETURN={ "a" : [1,2.5], "b" : events }'
+
+    assert canonical_query(first) == canonical_query(second)
+    assert canonical_query(first) == 'events=query_bucket("aw-watcher-window_host"); RETURN={"a":[1,2.5],"b":events};'
+
+
+def test_strings_are_kept_verbatim():
+    """Test that whitespace and quotes inside strings are preserved."""
+    query = """RETURN = ['a  b', "it's", 'say "hi"'];"""
+
+    assert canonical_query(query) == r"""RETURN=["a  b","it's","say \"hi\""];"""
+
+
+def test_buckets_and_variables():
+    """Test that bucket literals and assigned variables are collected."""
+    parsed = parse_query("a = query_bucket('x'); b = query_bucket(find_bucket('y')); RETURN = a;")
+
+    assert parsed.buckets == ["x"]
+    assert parsed.variables == ["a", "b", "RETURN"]
+
+
+@pytest.mark.parametrize(
+    ("query", "canonical"),
+    [
+        ("RETURN = -5;", "RETURN=-5;"),
+        ("RETURN = [- 5, -2.5];", "RETURN=[-5,-2.5];"),
+        ("RETURN = [1.5e3, 2E-4, -1e+2];", "RETURN=[1.5e3,2E-4,-1e+2];"),
+    ],
+)
+def test_numbers(query, canonical):
+    """Test negative numbers and exponents."""
+    assert canonical_query(query) == canonical
+
+
+def test_comments_are_dropped():
+    """Test that comments do not change the canonical form."""
+    query = """
+        # top apps
+        events = query_bucket('x');  # window events
+        RETURN = events;
+    """
+
+    assert canonical_query(query) == 'events=query_bucket("x"); RETURN=events;'
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "a = 60 * 60;\nRETURN = a;",
+        "events = query_bucket('x')[0];\nRETURN = events;",
+        "if true { RETURN = 1; } else { RETURN = 2; }",
+        "RETURN = {a: 1};",
+        "RETURN = -events;",
+    ],
+)
+def test_unsupported_syntax_has_no_canonical_form(query):
+    """Test that well-formed queries beyond the parsed subset are left to aw-server."""
+    with pytest.raises(AQLUnsupportedError):
+        parse_query(query)
+
+    assert canonical_query(query) is None
+
+
+@pytest.mark.parametrize(
+    ("query", "line", "column", "message"),
+    [
+        ("events = query_bucket('x');", 1, 28, "no 'RETURN = ...' statement"),
+        ("RETURN events;", 1, 15, "no 'RETURN = ...' statement"),
+        ("a = 1 * 2;", 1, 11, "no 'RETURN = ...' statement"),
+        ("RETURN = query_bucket('x'", 1, 22, "'(' is never closed"),
+        ("a = f(1 * 2));\nRETURN = a;", 1, 13, "unbalanced ')'"),
+        ("RETURN = 'open;", 1, 10, "unterminated string"),
+        ("a = 1\nRETURN = a;", 2, 1, "expected ';' between statements, found 'RETURN'"),
+    ],
+)
+def test_syntax_errors(query, line, column, message):
+    """Test that malformed queries are rejected with the location of the problem."""
+    with pytest.raises(AQLSyntaxError, match=re.escape(message)) as raised:
+        parse_query(query)
+
+    assert not isinstance(raised.value, AQLUnsupportedError)
+    assert (raised.value.line, raised.value.column) == (line, column)
@@ -0,0 +1,138 @@
+"""Tests for the event cache backends."""
+
+import json
+import os
+import re
+import threading
+
+import pytest
+from mcp_server_activitywatch.cache import CacheBackend, CachedValue, EventCache, SQLiteCache, create_cache
+from mcp_server_activitywatch.columnar import EventColumns
+from mcp_server_activitywatch.tools.list_buckets import list_buckets
+from mcp_server_activitywatch.tools.stats import stats
+from tests.conftest import MockContext, serve_events
+
+API_BASE = "http://localhost:5600/api/0"
+
+EVENTS_URL = re.compile(rf"{API_BASE}/buckets/aw-watcher-window_hostname/events.*")
+
+
+@pytest.fixture
+def mock_events():
+    """Window events over two past days."""
+    return [
+        {"id": 1, "timestamp": "2024-02-19T10:00:00+00:00", "duration": 60.0, "data": {"app": "Code", "title": "a.py"}},
+        {"id": 2, "timestamp": "2024-02-20T09:00:00+00:00", "duration": 300.0, "data": {"app": "Firefox"}},
+    ]
+
+
+def test_entries_expire(monkeypatch):
+    """Test that entries cached with a time to live are dropped once it has passed."""
+    clock = [1000.0]
+    monkeypatch.setattr("mcp_server_activitywatch.cache.time.time", lambda: clock[0])
+    cache = EventCache()
+    cache.put(("buckets",), CachedValue({}, 2), ttl=5)
+    cache.put(("query",), CachedValue([], 2))
+
+    clock[0] += 10
+
+    assert cache.get(("buckets",)) is None
+    assert cache.get(("query",)) == CachedValue([], 2)
+    assert cache.stats()["chunks"] == 1
+
+
+def test_shared_between_processes(tmp_path, mock_events):
+    """Test that a chunk cached by one process is read by another from the shared file."""
+    path = tmp_path / "cache.sqlite3"
+    writer = SQLiteCache(path)
+    chunk = EventColumns.from_wire(mock_events)
+    writer.put(("events", 1), chunk)
+
+    reader = SQLiteCache(path)
+    shared = reader.get(("events", 1))
+
+    assert [shared[row] for row in range(len(shared))] == mock_events
+    assert reader.stats()["local"]["chunks"] == 1
+    writer.discard(("events", 1))
+    assert SQLiteCache(path).get(("events", 1)) is None
+
+
+def test_file_is_private(tmp_path, monkeypatch):
+    """Test that the file is readable by its owner only and a directory of another user is refused."""
+    path = tmp_path / "shared" / "cache.sqlite3"
+    SQLiteCache(path)
+
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+    assert path.stat().st_mode & 0o777 == 0o600
+    monkeypatch.setattr(os, "getuid", lambda: path.stat().st_uid + 1)
+    with pytest.raises(PermissionError, match="belongs to another user"):
+        SQLiteCache(path)
+
+
+def test_disk_budget_evicts_least_recently_used(tmp_path):
+    """Test that the file keeps its most recently used entries within its budget."""
+    cache = SQLiteCache(tmp_path / "cache.sqlite3", max_bytes=0, max_disk_bytes=2500)
+    for index in range(3):
+        cache.put(("value", index), CachedValue(os.urandom(1000), 1000))
+        cache.get(("value", 0))
+
+    assert cache.peek(("value", 0)) is not None
+    assert cache.peek(("value", 1)) is None
+    assert cache.stats()["disk_bytes"] <= 2500
+
+
+@pytest.mark.asyncio
+async def test_async_access_uses_the_file_off_the_event_loop(tmp_path, mock_events):
+    """Test that the async methods read and write the shared file in another thread."""
+    path = tmp_path / "cache.sqlite3"
+    threads = set()
+    reader = SQLiteCache(path)
+    read = reader._read
+
+    def recording_read(*args):
+        threads.add(threading.get_ident())
+        return read(*args)
+
+    reader._read = recording_read
+    await SQLiteCache(path).aput(("events", 1), EventColumns.from_wire(mock_events))
+
+    assert await reader.apeek(("events", 2)) is None
+    shared = await reader.aget(("events", 1))
+    assert await reader.aget(("events", 1)) is shared
+
+    assert shared.to_wire() == mock_events
+    assert threads and threading.get_ident() not in threads
+    assert (reader.hits, reader.misses) == (2, 0)
+
+
+def test_backends_implement_the_interface():
+    """Test that the backend interface cannot be instantiated without its methods."""
+    with pytest.raises(TypeError, match="abstract"):
+        CacheBackend()
+
+
+def test_unknown_backend():
+    """Test that an unknown backend name is rejected."""
+    with pytest.raises(ValueError, match="Unknown cache backend 'redis'"):
+        create_cache("redis")
+
+
+@pytest.mark.asyncio
+async def test_processes_share_fetches(httpx_mock, tmp_path, mock_events):
+    """Test that a second process answers from what the first fetched: sketches, chunks and buckets."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+    httpx_mock.add_response(url=f"{API_BASE}/buckets", json={"aw-watcher-window_hostname": {"type": "currentwindow"}})
+    path = tmp_path / "cache.sqlite3"
+    kwargs = {"bucket_id": "aw-watcher-window_hostname", "start": "2024-02-19T00:00:00Z", "end": "2024-02-21T00:00:00Z"}
+
+    first_ctx = MockContext(lifespan_context={"api_base": API_BASE, "event_cache": SQLiteCache(path)})
+    second_ctx = MockContext(lifespan_context={"api_base": API_BASE, "event_cache": SQLiteCache(path)})
+    first = json.loads(await stats(ctx=first_ctx, **kwargs))
+    second = json.loads(await stats(ctx=second_ctx, **kwargs))
+    await list_buckets(ctx=first_ctx)
+    buckets = json.loads(await list_buckets(ctx=second_ctx))
+
+    assert (first.pop("cached_days"), second.pop("cached_days")) == (0, 2)
+    assert second == first
+    assert len(httpx_mock.get_requests()) == 3
+    assert [bucket["id"] for bucket in buckets] == ["aw-watcher-window_hostname"]
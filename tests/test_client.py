@@ -0,0 +1,85 @@
+"""Tests for the shared upstream client and its limits."""
+
+import asyncio
+
+import httpx
+import pytest
+from mcp_server_activitywatch.client import LimitedTransport, UpstreamLimiter, create_shared_client, upstream_client
+from tests.conftest import MockContext
+
+
+class BodyStream(httpx.AsyncByteStream):
+    """Response body read from the network, unlike the in-memory bodies of mock responses."""
+
+    async def __aiter__(self):
+        yield b"[]"
+
+
+def counting_transport(delay: float = 0.01) -> tuple[httpx.MockTransport, dict[str, int]]:
+    """Transport answering every request after ``delay``, recording the most requests in flight."""
+    counts = {"in_flight": 0, "peak": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        counts["in_flight"] += 1
+        counts["peak"] = max(counts["peak"], counts["in_flight"])
+        await asyncio.sleep(delay)
+        counts["in_flight"] -= 1
+        return httpx.Response(200, stream=BodyStream())
+
+    return httpx.MockTransport(handler), counts
+
+
+@pytest.mark.asyncio
+async def test_limiter_bounds_concurrency():
+    """Test that no more requests than the limit are in flight at once."""
+    transport, counts = counting_transport()
+    async with httpx.AsyncClient(transport=LimitedTransport(UpstreamLimiter(concurrency=2), transport)) as client:
+        responses = await asyncio.gather(*(client.get("http://aw/api/0/buckets") for _ in range(6)))
+
+    assert all(response.status_code == 200 for response in responses)
+    assert counts["peak"] == 2
+
+
+@pytest.mark.asyncio
+async def test_slot_held_until_body_closed():
+    """Test that a streamed response keeps its slot until the body is closed."""
+    transport, _ = counting_transport(delay=0)
+    async with httpx.AsyncClient(transport=LimitedTransport(UpstreamLimiter(concurrency=1), transport)) as client:
+        async with client.stream("GET", "http://aw/api/0/buckets"):
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.get("http://aw/api/0/buckets"), timeout=0.05)
+        response = await asyncio.wait_for(client.get("http://aw/api/0/buckets"), timeout=1)
+
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_spaces_requests():
+    """Test that requests beyond the burst wait for tokens."""
+    transport, _ = counting_transport(delay=0)
+    limiter = UpstreamLimiter(concurrency=4, rate=20)
+    async with httpx.AsyncClient(transport=LimitedTransport(limiter, transport)) as client:
+        started = asyncio.get_running_loop().time()
+        for _ in range(22):
+            await client.get("http://aw/api/0/buckets")
+        elapsed = asyncio.get_running_loop().time() - started
+
+    assert elapsed >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_upstream_client_reuses_shared_client(httpx_mock):
+    """Test that tools use the lifespan's client and fall back to a short-lived one."""
+    httpx_mock.add_response(url="http://localhost:5600/api/0/buckets", json={}, is_reusable=True)
+    shared = create_shared_client(UpstreamLimiter())
+    ctx = MockContext(lifespan_context={"http_client": shared})
+
+    async with upstream_client(ctx) as client:
+        assert client is shared
+        await client.get("http://localhost:5600/api/0/buckets")
+    async with upstream_client(MockContext.with_api_base()) as client:
+        assert client is not shared
+        await client.get("http://localhost:5600/api/0/buckets")
+
+    assert not shared.is_closed
+    await shared.aclose()
@@ -0,0 +1,134 @@
+"""Tests for the compact columnar event container."""
+
+import pickle
+
+import pytest
+from mcp_server_activitywatch.columnar import EventColumns, from_epoch_us, to_epoch_us
+
+
+@pytest.fixture
+def mock_events():
+    """Sample events with repeated and missing data keys."""
+    return [
+        {"id": 1, "timestamp": "2024-02-19T10:00:00+00:00", "duration": 60.0, "data": {"app": "Firefox", "title": "A"}},
+        {"id": 2, "timestamp": "2024-02-19T10:01:00+00:00", "duration": 30.5, "data": {"app": "Code", "title": "B"}},
+        {"id": 3, "timestamp": "2024-02-19T10:02:00+00:00", "duration": 15.0, "data": {"app": "Firefox"}},
+        {"id": 4, "timestamp": "2024-02-19T10:03:00+00:00", "duration": 5.0, "data": {"status": "afk", "n": 1}},
+    ]
+
+
+def test_round_trip_to_wire(mock_events):
+    """Test that events convert back to the wire format unchanged."""
+    columns = EventColumns.from_wire(mock_events)
+
+    assert len(columns) == 4
+    assert columns.to_wire() == mock_events
+    assert columns[-1] == mock_events[-1]
+
+
+def test_values_are_dictionary_encoded(mock_events):
+    """Test that repeated data values are stored once."""
+    columns = EventColumns.from_wire(mock_events)
+
+    assert columns.values("app") == ["Firefox", "Code"]
+    assert list(columns.columns["app"]) == [0, 1, 0, -1]
+
+
+def test_equal_values_of_different_types_stay_distinct():
+    """Test that True, 1 and 1.0 are not interned as the same value."""
+    events = [
+        {"timestamp": "2024-02-19T10:00:00+00:00", "duration": 1.0, "data": {"v": value}} for value in (True, 1, 1.0)
+    ]
+
+    columns = EventColumns.from_wire(events)
+
+    assert [type(event["data"]["v"]) for event in columns] == [bool, int, float]
+    assert "id" not in columns[0]
+
+
+def test_durations_by(mock_events):
+    """Test aggregation over encoded columns."""
+    columns = EventColumns.from_wire(mock_events)
+
+    assert columns.durations_by("app") == {"Firefox": 75.0, "Code": 30.5}
+    assert columns.durations_by("url") == {}
+
+
+def test_durations_by_unhashable_values():
+    """Test that list and dict values are totalled by their canonical JSON."""
+    events = [
+        {"timestamp": "2024-02-19T10:00:00+00:00", "duration": 2.0, "data": {"tags": ["a", "b"]}},
+        {"timestamp": "2024-02-19T10:01:00+00:00", "duration": 3.0, "data": {"tags": ["a", "b"]}},
+        {"timestamp": "2024-02-19T10:02:00+00:00", "duration": 4.0, "data": {"tags": {"y": 1, "x": 2}}},
+    ]
+
+    columns = EventColumns.from_wire(events)
+
+    assert columns.durations_by("tags") == {'["a", "b"]': 5.0, '{"x": 2, "y": 1}': 4.0}
+
+
+def test_take_shares_dictionaries_until_appended(mock_events):
+    """Test that taken rows share the value tables, and that appending copies them first."""
+    columns = EventColumns.from_wire(mock_events)
+    taken = columns.take([2, 0])
+
+    assert taken.values("app") is columns.values("app")
+    assert [event["data"] for event in taken] == [mock_events[2]["data"], mock_events[0]["data"]]
+
+    taken.append({"timestamp": "2024-02-19T10:04:00+00:00", "duration": 1.0, "data": {"app": "Slack"}})
+
+    assert taken.values("app") == ["Firefox", "Code", "Slack"]
+    assert columns.values("app") == ["Firefox", "Code"]
+    assert columns.to_wire() == mock_events
+
+
+def test_epoch_conversion_normalizes_to_utc():
+    """Test timestamp conversion with offsets and the Z suffix."""
+    assert to_epoch_us("2024-02-19T10:00:00.000Z") == to_epoch_us("2024-02-19T12:00:00+02:00")
+    assert from_epoch_us(to_epoch_us("2024-02-19T10:00:00.123456Z")) == "2024-02-19T10:00:00.123456+00:00"
+
+
+def test_pickle_round_trip(mock_events):
+    """Test that containers can be serialized for caches."""
+    columns = EventColumns.from_wire(mock_events)
+
+    assert pickle.loads(pickle.dumps(columns)).to_wire() == mock_events
+
+
+def test_clip_and_sort(mock_events):
+    """Test clipping to a window and sorting by start."""
+    columns = EventColumns.from_wire(list(reversed(mock_events))).sorted_by_start()
+    window_start = to_epoch_us("2024-02-19T10:00:30+00:00")
+    window_end = to_epoch_us("2024-02-19T10:02:10+00:00")
+
+    clipped = columns.clip(window_start, window_end)
+
+    assert [event["id"] for event in clipped] == [1, 2, 3]
+    assert list(clipped.durations) == [30.0, 30.5, 10.0]
+    assert clipped.durations_by("app") == {"Firefox": 40.0, "Code": 30.5}
+
+
+def test_compact_merges_runs_of_identical_data():
+    """Test that touching and nearly touching events with identical data are merged, others kept."""
+    columns = EventColumns.from_wire(
+        [
+            {"id": 1, "timestamp": "2024-02-19T10:00:00+00:00", "duration": 10.0, "data": {"app": "Code"}},
+            {"id": 2, "timestamp": "2024-02-19T10:00:10+00:00", "duration": 10.0, "data": {"app": "Code"}},
+            {"id": 3, "timestamp": "2024-02-19T10:00:20.500000+00:00", "duration": 9.5, "data": {"app": "Code"}},
+            {"id": 4, "timestamp": "2024-02-19T10:00:30+00:00", "duration": 5.0, "data": {"app": "Code", "title": "x"}},
+            {"id": 5, "timestamp": "2024-02-19T10:00:35+00:00", "duration": 2.25, "data": {"app": "Code"}},
+        ]
+    )
+
+    assert [(event["id"], event["duration"]) for event in columns.compact(0)] == [
+        (1, 20.0),
+        (3, 9.5),
+        (4, 5.0),
+        (5, 2.25),
+    ]
+    assert [(event["id"], event["duration"]) for event in columns.compact(1_000_000)] == [
+        (1, 30.0),
+        (4, 5.0),
+        (5, 2.25),
+    ]
+    assert columns.compact(0).compact(0).to_wire() == columns.compact(0).to_wire()
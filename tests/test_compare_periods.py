@@ -0,0 +1,64 @@
+"""Tests for compare_periods tool."""
+
+import json
+import re
+
+import pytest
+from mcp_server_activitywatch.tools.compare_periods import compare_periods
+from tests.conftest import serve_events
+
+EVENTS_URL = re.compile(r"http://localhost:5600/api/0/buckets/aw-watcher-window_hostname/events.*")
+
+
+@pytest.fixture
+def mock_events():
+    """Window events over two days, one of them crossing midnight."""
+    return [
+        {"id": 1, "timestamp": "2024-02-19T10:00:00+00:00", "duration": 600.0, "data": {"app": "Firefox"}},
+        {"id": 2, "timestamp": "2024-02-19T11:00:00+00:00", "duration": 300.0, "data": {"app": "Code"}},
+        {"id": 3, "timestamp": "2024-02-19T23:50:00+00:00", "duration": 1200.0, "data": {"app": "Code"}},
+        {"id": 4, "timestamp": "2024-02-20T09:00:00+00:00", "duration": 60.0, "data": {"app": "Slack"}},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_compare_two_days(httpx_mock, mock_events, mock_ctx):
+    """Test per-value deltas and ratios against the first period, largest change first."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+
+    result = await compare_periods(
+        bucket_id="aw-watcher-window_hostname",
+        periods=["2024-02-19/2024-02-20", "2024-02-20/2024-02-21"],
+        ctx=mock_ctx,
+    )
+
+    parsed = json.loads(result)
+    assert [period["total_duration"] for period in parsed["periods"]] == [1500.0, 660.0]
+    assert parsed["total_deltas"] == [-840.0]
+    assert parsed["values"] == [
+        {"value": "Firefox", "durations": [600.0, 0.0], "deltas": [-600.0], "ratios": [0.0]},
+        {"value": "Code", "durations": [900.0, 600.0], "deltas": [-300.0], "ratios": [600.0 / 900.0]},
+        {"value": "Slack", "durations": [0.0, 60.0], "deltas": [60.0], "ratios": [None]},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_invalid_period(mock_ctx):
+    """Test that a period that is neither a range nor a shorthand is reported."""
+    result = await compare_periods(bucket_id="aw-watcher-window_hostname", periods=["last_week", "soon"], ctx=mock_ctx)
+
+    assert "Failed to compare periods: Invalid period 'soon'" in result
+
+
+@pytest.mark.asyncio
+async def test_bucket_not_found(httpx_mock, mock_ctx):
+    """Test that a missing bucket is reported once for all periods."""
+    httpx_mock.add_response(url=EVENTS_URL, status_code=404, is_reusable=True)
+
+    result = await compare_periods(
+        bucket_id="aw-watcher-window_hostname",
+        periods=["2024-02-19/2024-02-20", "2024-02-20/2024-02-21"],
+        ctx=mock_ctx,
+    )
+
+    assert "Bucket not found: aw-watcher-window_hostname" in result
@@ -0,0 +1,119 @@
+"""Tests for delta "since" mode of get_events and the bucket events resource."""
+
+import json
+import re
+
+import pytest
+from mcp_server_activitywatch.delta import SinceToken
+from mcp_server_activitywatch.resources.bucket_events import bucket_events_resource
+from mcp_server_activitywatch.tools.get_events import get_events
+from tests.conftest import serve_events
+
+EVENTS_URL = re.compile(r"http://localhost:5600/api/0/buckets/aw-watcher-window_hostname/events.*")
+
+
+@pytest.fixture
+def mock_events():
+    """Sample events, newest first like aw-server returns them."""
+    return [
+        {
+            "id": 2,
+            "timestamp": "2024-02-19T10:01:00+00:00",
+            "duration": 120.0,
+            "data": {"app": "Visual Studio Code", "title": "test.py"},
+        },
+        {
+            "id": 1,
+            "timestamp": "2024-02-19T10:00:00+00:00",
+            "duration": 60.0,
+            "data": {"app": "Firefox", "title": "Example Page"},
+        },
+    ]
+
+
+def test_token_round_trip():
+    """Test that tokens survive encoding."""
+    token = SinceToken(cursor="2024-02-19T10:01:00+00:00", seen={"2": 120.0})
+
+    assert SinceToken.decode(token.encode()) == token
+    assert SinceToken.decode("") == SinceToken()
+
+
+def test_invalid_token_rejected():
+    """Test that malformed tokens raise a ValueError."""
+    with pytest.raises(ValueError, match="Invalid since_token"):
+        SinceToken.decode("not-a-token")
+
+
+def test_heartbeat_extension_reported_as_update(mock_events):
+    """Test that a tail event whose duration grew in place is returned as updated."""
+    token = SinceToken().advance(mock_events)
+    extended = {**mock_events[0], "duration": 180.0}
+    new_event = {
+        "id": 3,
+        "timestamp": "2024-02-19T10:04:00+00:00",
+        "duration": 5.0,
+        "data": {"app": "Slack", "title": "general"},
+    }
+
+    changed, updated = token.diff([new_event, extended])
+
+    assert changed == [new_event, extended]
+    assert updated == ["2"]
+    assert token.advance([new_event, extended]).cursor == new_event["timestamp"]
+
+
+@pytest.mark.asyncio
+async def test_get_events_since_mode(httpx_mock, mock_events, mock_ctx):
+    """Test a full delta cycle through the get_events tool."""
+    api_base = "http://localhost:5600/api/0"
+    bucket_id = "aw-watcher-window_hostname"
+    httpx_mock.add_response(url=f"{api_base}/buckets/{bucket_id}/events", json=mock_events)
+
+    first = json.loads(await get_events(bucket_id=bucket_id, since_token="", ctx=mock_ctx))
+
+    assert first["count"] == 2
+    assert first["updated_ids"] == []
+
+    httpx_mock.add_response(
+        url=f"{api_base}/buckets/{bucket_id}/events?start=2024-02-19T10%3A01%3A00%2B00%3A00",
+        json=[mock_events[0]],
+    )
+
+    second = json.loads(await get_events(bucket_id=bucket_id, since_token=first["since_token"], ctx=mock_ctx))
+
+    assert second["events"] == []
+    assert SinceToken.decode(second["since_token"]).cursor == mock_events[0]["timestamp"]
+
+
+@pytest.mark.asyncio
+async def test_since_mode_limit_pages_through_changes(httpx_mock, mock_events, mock_ctx):
+    """Test that more changes than the limit are returned over several calls, oldest first, none lost."""
+    bucket_id = "aw-watcher-window_hostname"
+    new_events = [
+        {"id": i, "timestamp": f"2024-02-19T10:{i:02d}:00+00:00", "duration": 30.0, "data": {"app": "Slack"}}
+        for i in range(10, 3, -1)
+    ]
+    events = [*new_events, {**mock_events[0], "duration": 150.0}, mock_events[1]]
+    httpx_mock.add_callback(serve_events(events), url=EVENTS_URL, is_reusable=True)
+    token = SinceToken().advance(mock_events).encode()
+
+    pages = []
+    while True:
+        page = json.loads(await get_events(bucket_id=bucket_id, since_token=token, limit=3, ctx=mock_ctx))
+        if not page["events"]:
+            break
+        pages.append(page)
+        token = page["since_token"]
+
+    assert [[event["id"] for event in page["events"]] for page in pages] == [[5, 4, 2], [8, 7, 6], [10, 9]]
+    assert [page["updated_ids"] for page in pages] == [["2"], [], []]
+    assert all("limit" not in request.url.params for request in httpx_mock.get_requests())
+
+
+@pytest.mark.asyncio
+async def test_resource_rejects_bad_token(mock_ctx):
+    """Test that the resource explains an invalid token."""
+    result = await bucket_events_resource(bucket_id="aw-watcher-window_hostname", since_token="bogus", ctx=mock_ctx)
+
+    assert result["error"] == "Invalid since_token"
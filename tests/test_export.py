@@ -0,0 +1,136 @@
+"""Tests for the export tool and its file formats."""
+
+import hashlib
+import json
+import re
+
+import pytest
+from mcp_server_activitywatch.columnar import EventColumns
+from mcp_server_activitywatch.export import ExportWriter, read_columnar
+from mcp_server_activitywatch.tools.export import export
+from tests.conftest import MockContext, serve_events
+
+EVENTS_URL = re.compile(r"http://localhost:5600/api/0/buckets/aw-watcher-window_hostname/events.*")
+
+
+@pytest.fixture
+def mock_events():
+    """Window events over two days, one of them crossing midnight and one starting at it."""
+    return [
+        {"id": 1, "timestamp": "2024-02-19T10:00:00+00:00", "duration": 600.0, "data": {"app": "Firefox"}},
+        {"id": 2, "timestamp": "2024-02-19T23:50:00+00:00", "duration": 1200.0, "data": {"app": "Code"}},
+        {"id": 3, "timestamp": "2024-02-20T00:00:00+00:00", "duration": 60.0, "data": {"app": "Slack", "n": 2}},
+        {"id": 4, "timestamp": "2024-02-20T09:00:00+00:00", "duration": 30.0, "data": {"app": "Code"}},
+    ]
+
+
+@pytest.fixture
+def export_ctx(tmp_path):
+    """Context exporting to a temporary directory."""
+    return MockContext(lifespan_context={"api_base": "http://localhost:5600/api/0", "export_dir": str(tmp_path)})
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson(httpx_mock, mock_events, export_ctx, tmp_path):
+    """Test that every event is written once, unclipped, with its bucket and checksums."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+
+    result = json.loads(
+        await export(
+            bucket_ids=["aw-watcher-window_hostname"],
+            start="2024-02-19T00:00:00Z",
+            end="2024-02-21T00:00:00Z",
+            filename="window.ndjson",
+            ctx=export_ctx,
+        )
+    )
+
+    path = tmp_path / "window.ndjson"
+    content = path.read_bytes()
+    lines = [json.loads(line) for line in content.decode().splitlines()]
+    assert result["path"] == str(path)
+    assert result["rows"] == 4
+    assert result["sha256"] == hashlib.sha256(content).hexdigest()
+    assert result["buckets"]["aw-watcher-window_hostname"] == {"rows": 4, "sha256": result["sha256"]}
+    assert [line["id"] for line in lines] == [1, 2, 3, 4]
+    assert lines[1] == {"bucket_id": "aw-watcher-window_hostname", **mock_events[1]}
+    assert export_ctx.progress[-1][:2] == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_export_columnar_round_trip(httpx_mock, mock_events, export_ctx):
+    """Test that a columnar export reads back as the same events, one row group per day."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+
+    result = json.loads(
+        await export(
+            bucket_ids=["aw-watcher-window_hostname"],
+            start="2024-02-19T00:00:00Z",
+            end="2024-02-21T00:00:00Z",
+            format="columnar",
+            ctx=export_ctx,
+        )
+    )
+
+    assert result["path"].endswith(".awcol")
+    groups = list(read_columnar(result["path"]))
+    assert [(bucket_id, len(chunk)) for bucket_id, chunk in groups] == [("aw-watcher-window_hostname", 2)] * 2
+    events = [event for _, chunk in groups for event in chunk]
+    assert [(event["id"], event["duration"], event["data"]) for event in events] == [
+        (event["id"], event["duration"], event["data"]) for event in mock_events
+    ]
+
+
+def test_corrupt_columnar_export_rejected(tmp_path):
+    """Test that a damaged row group fails its checksum."""
+    writer = ExportWriter(tmp_path / "events.awcol", "columnar")
+    writer.write("bucket", EventColumns.from_wire([{"timestamp": "2024-02-19T10:00:00+00:00", "data": {"a": "b"}}]))
+    path = tmp_path / "events.awcol"
+    writer.close()
+    data = bytearray(path.read_bytes())
+    data[-20] ^= 0xFF
+    path.write_bytes(data)
+
+    with pytest.raises(ValueError, match="Corrupt row group"):
+        list(read_columnar(path))
+
+
+def test_exports_are_private(tmp_path):
+    """Test that the export directory and files are only accessible to the current user."""
+    path = tmp_path / "exports" / "events.ndjson"
+    writer = ExportWriter(path, "ndjson")
+    writer.write("bucket", EventColumns.from_wire([{"timestamp": "2024-02-19T10:00:00+00:00", "data": {"a": "b"}}]))
+    writer.close()
+
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+    assert path.stat().st_mode & 0o777 == 0o600
+
+
+@pytest.mark.asyncio
+async def test_invalid_filename(export_ctx):
+    """Test that file names with a directory are rejected."""
+    result = await export(
+        bucket_ids=["aw-watcher-window_hostname"],
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-20T00:00:00Z",
+        filename="../outside.ndjson",
+        ctx=export_ctx,
+    )
+
+    assert "Failed to export events: Invalid file name" in result
+
+
+@pytest.mark.asyncio
+async def test_bucket_not_found_removes_file(httpx_mock, export_ctx, tmp_path):
+    """Test that a missing bucket is reported and leaves no file behind."""
+    httpx_mock.add_response(url=EVENTS_URL, status_code=404, is_reusable=True)
+
+    result = await export(
+        bucket_ids=["aw-watcher-window_hostname"],
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-20T00:00:00Z",
+        ctx=export_ctx,
+    )
+
+    assert "Bucket not found: aw-watcher-window_hostname" in result
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,134 @@
+"""Tests for field projection and filters on event fetches."""
+
+import json
+import re
+
+import pytest
+from mcp_server_activitywatch.cache import EventCache
+from mcp_server_activitywatch.columnar import EventColumns
+from mcp_server_activitywatch.filters import EventFilter
+from mcp_server_activitywatch.jsonio import JsonArrayParser
+from mcp_server_activitywatch.planner import CostModel
+from mcp_server_activitywatch.resources.bucket_events import bucket_events_resource
+from mcp_server_activitywatch.tools.get_events import get_events
+from tests.conftest import MockContext, serve_events
+
+API_BASE = "http://localhost:5600/api/0"
+BUCKET_ID = "aw-watcher-window_hostname"
+EVENTS_URL = re.compile(rf"{API_BASE}/buckets/{BUCKET_ID}/events.*")
+
+
+@pytest.fixture
+def mock_events():
+    """Window events over two days with long titles."""
+    apps = ["Code", "Firefox", "Slack"]
+    return [
+        {
+            "id": index,
+            "timestamp": f"2024-02-{19 + index % 2}T10:{index:02d}:00+00:00",
+            "duration": 60.0,
+            "data": {"app": apps[index % 3], "title": f"Page {index} – {'x' * 200}"},
+        }
+        for index in range(30)
+    ]
+
+
+def test_parser_handles_any_chunking():
+    """Test that elements split across chunks, including inside UTF-8 characters, decode whole."""
+    document = json.dumps([{"title": "Café ☕", "n": 12345}, 678, "end"], ensure_ascii=False).encode()
+
+    for size in (1, 2, 3, 7, len(document)):
+        parser = JsonArrayParser()
+        items = []
+        for offset in range(0, len(document), size):
+            items.extend(parser.feed(document[offset : offset + size]))
+        items.extend(parser.close())
+        assert items == [{"title": "Café ☕", "n": 12345}, 678, "end"]
+
+
+def test_parser_rejects_truncated_array():
+    """Test that a response cut short is an error rather than a partial result."""
+    parser = JsonArrayParser()
+    parser.feed(b'[{"a": 1}, {"b"')
+
+    with pytest.raises(ValueError):
+        parser.close()
+
+
+@pytest.mark.asyncio
+async def test_fields_where_and_match(httpx_mock, mock_events, mock_ctx):
+    """Test that get_events projects data keys and filters by value and regex."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL)
+
+    result = await get_events(
+        bucket_id=BUCKET_ID, fields=["app"], where={"app": "Firefox"}, match={"title": "^page 1"}, ctx=mock_ctx
+    )
+
+    events = json.loads(result)
+    assert [event["id"] for event in events] == [19, 13, 1, 16, 10]
+    assert all(event["data"] == {"app": "Firefox"} for event in events)
+    assert set(events[0]) == {"id", "timestamp", "duration", "data"}
+
+
+@pytest.mark.asyncio
+async def test_limit_counts_matching_events(httpx_mock, mock_events, mock_ctx):
+    """Test that the limit is applied to matches, not to the events aw-server returns."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL)
+
+    result = await get_events(bucket_id=BUCKET_ID, where={"app": "Slack"}, limit=3, ctx=mock_ctx)
+
+    assert [event["id"] for event in json.loads(result)] == [29, 23, 17]
+    assert "limit" not in httpx_mock.get_requests()[0].url.params
+
+
+@pytest.mark.asyncio
+async def test_filters_apply_to_sharded_fetches(httpx_mock, mock_events):
+    """Test that events served per day from chunks are filtered and projected the same way."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+    cost_model = CostModel(request_overhead_ms=0)
+    ctx = MockContext(lifespan_context={"api_base": API_BASE, "event_cache": EventCache(), "cost_model": cost_model})
+    kwargs = {"bucket_id": BUCKET_ID, "start": "2024-02-19T00:00:00+00:00", "end": "2024-02-21T00:00:00+00:00"}
+
+    sharded = json.loads(await get_events(fields=["app"], where={"app": "Code"}, explain=True, ctx=ctx, **kwargs))
+    direct = json.loads(await get_events(fields=["app"], where={"app": "Code"}, limit=100, ctx=ctx, **kwargs))
+
+    assert sharded["plan"]["strategy"] == "sharded"
+    assert sharded["result"] == direct
+    assert len(direct) == 10
+
+
+@pytest.mark.asyncio
+async def test_invalid_regex(mock_ctx):
+    """Test that an invalid regex is reported without a request."""
+    result = await get_events(bucket_id=BUCKET_ID, match={"title": "("}, ctx=mock_ctx)
+
+    assert "Invalid regex for 'title'" in result
+
+
+def test_filter_mask_matches_event_filter(mock_events):
+    """Test that the columnar mask agrees with filtering wire events."""
+    event_filter = EventFilter(where={"app": "Code"}, match={"title": r"page \d\b"})
+    chunk = EventColumns.from_wire(mock_events)
+
+    assert event_filter.mask(chunk) == [event_filter.matches(event["data"]) for event in mock_events]
+
+
+@pytest.mark.asyncio
+async def test_resource_filters(httpx_mock, mock_events, mock_ctx):
+    """Test that the events resource takes fields and JSON filters as query parameters."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL)
+
+    result = await bucket_events_resource(
+        bucket_id=BUCKET_ID, fields="app", match='{"app": "fire"}', limit=2, ctx=mock_ctx
+    )
+
+    assert result["count"] == 2
+    assert result["events"][0]["data"] == {"app": "Firefox"}
+
+
+@pytest.mark.asyncio
+async def test_resource_rejects_malformed_filter(mock_ctx):
+    """Test that a filter that is not a JSON object is reported."""
+    result = await bucket_events_resource(bucket_id=BUCKET_ID, where="app=Code", ctx=mock_ctx)
+
+    assert "where must be a JSON object" in result["error"]
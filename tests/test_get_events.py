@@ -124,3 +124,30 @@ async def test_handle_network_errors(httpx_mock, mock_ctx):
     assert isinstance(result, str)
     assert "network or connection error" in result
     assert "ActivityWatch server is running" in result
+
+
+@pytest.mark.asyncio
+async def test_compact_heartbeats(httpx_mock, mock_ctx):
+    """Test that runs of identical events are merged within the gap, keeping aw-server's newest-first order."""
+    api_base = "http://localhost:5600/api/0"
+    bucket_id = "aw-watcher-window_hostname"
+    heartbeats = [
+        {"id": 10 + i, "timestamp": f"2024-02-19T10:00:{i * 5:02d}+00:00", "duration": 4.5, "data": {"app": "Code"}}
+        for i in range(6)
+    ]
+    heartbeats.append({"id": 20, "timestamp": "2024-02-19T10:00:30+00:00", "duration": 3.0, "data": {"app": "Slack"}})
+    httpx_mock.add_response(url=f"{api_base}/buckets/{bucket_id}/events", json=heartbeats[::-1], is_reusable=True)
+
+    compacted = json.loads(await get_events(bucket_id=bucket_id, compact=1, ctx=mock_ctx))
+    touching_only = json.loads(await get_events(bucket_id=bucket_id, compact=0, ctx=mock_ctx))
+
+    assert compacted == [heartbeats[-1], {**heartbeats[0], "duration": 29.5}]
+    assert len(touching_only) == 7
+
+
+@pytest.mark.asyncio
+async def test_negative_compact_gap_rejected(mock_ctx):
+    """Test that a negative gap is reported without a request."""
+    result = await get_events(bucket_id="aw-watcher-window_hostname", compact=-1, ctx=mock_ctx)
+
+    assert "Failed to fetch events: compact must be a gap of 0 seconds or more" in result
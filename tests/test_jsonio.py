@@ -0,0 +1,67 @@
+"""Tests for size-aware JSON decoding and encoding."""
+
+import json
+
+import pytest
+from mcp_server_activitywatch.jsonio import JsonCodec, encode, get_json_codec
+from tests.conftest import MockContext
+
+
+@pytest.mark.asyncio
+async def test_small_payloads_stay_inline():
+    """Test that payloads under the threshold are not handed to the pool."""
+    codec = JsonCodec(threshold=1024)
+
+    assert await codec.loads(b'{"a": 1}') == {"a": 1}
+    assert await codec.dumps({"a": 1}, size_hint=8) == '{\n  "a": 1\n}'
+    assert codec._executor is None
+
+
+@pytest.mark.asyncio
+async def test_large_payloads_use_worker_threads():
+    """Test that payloads over the threshold are decoded and encoded in the pool."""
+    codec = JsonCodec(threshold=16)
+    payload = json.dumps([{"app": "Firefox"}] * 10).encode("utf-8")
+
+    events = await codec.loads(payload)
+    text = await codec.dumps(events, size_hint=len(payload))
+
+    assert events == [{"app": "Firefox"}] * 10
+    assert json.loads(text) == events
+    assert codec._executor is not None
+    codec.close()
+
+
+@pytest.mark.asyncio
+async def test_process_mode_round_trip():
+    """Test decoding and encoding in a process pool."""
+    codec = JsonCodec(threshold=0, mode="process", workers=1)
+
+    events = await codec.loads(b'[{"app": "Code"}]')
+    text = await codec.dumps(events, size_hint=1, indent=None)
+
+    assert text == '[{"app": "Code"}]'
+    codec.close()
+
+
+def test_encode_matches_json_dumps():
+    """Test that streamed encoding produces the same text as ``json.dumps``."""
+    value = [{"app": "Café", "data": {"tags": [], "meta": {}}, "duration": 1.5, "afk": None}, True]
+
+    assert encode(value) == json.dumps(value, indent=2)
+    assert encode(value, indent=4) == json.dumps(value, indent=4)
+    assert encode(value, indent=None) == json.dumps(value)
+
+
+def test_invalid_mode_rejected():
+    """Test that unknown offload modes raise a ValueError."""
+    with pytest.raises(ValueError, match="Unsupported JSON offload mode"):
+        JsonCodec(mode="fibers")
+
+
+def test_codec_from_lifespan_context():
+    """Test that tools pick up the configured codec and fall back to a default."""
+    codec = JsonCodec(threshold=1)
+
+    assert get_json_codec(MockContext(lifespan_context={"json_codec": codec})) is codec
+    assert get_json_codec(None) is not codec
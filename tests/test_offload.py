@@ -0,0 +1,109 @@
+"""Tests for large result offloading."""
+
+import json
+import os
+
+import pytest
+from mcp_server_activitywatch.compression import CODECS, get_codec
+from mcp_server_activitywatch.offload import ResultStore
+from mcp_server_activitywatch.resources.results import result_resource
+from mcp_server_activitywatch.tools.get_events import get_events
+from tests.conftest import MockContext
+
+
+@pytest.fixture
+def mock_events():
+    """Sample event data large enough to be offloaded."""
+    return [
+        {
+            "id": i,
+            "timestamp": f"2024-02-19T10:{i % 60:02d}:00.000Z",
+            "duration": 60.0,
+            "data": {"app": "Firefox", "title": "Example Page"},
+        }
+        for i in range(200)
+    ]
+
+
+@pytest.mark.parametrize("codec_name", sorted(CODECS))
+def test_codec_round_trip(codec_name):
+    """Test every available codec decompresses what it compressed."""
+    codec = get_codec(codec_name)
+    data = json.dumps([{"app": "Firefox"}] * 100).encode("utf-8")
+
+    compressed = codec.compress(data)
+
+    assert len(compressed) < len(data)
+    assert codec.decompress(compressed) == data
+
+
+def test_unknown_codec_rejected():
+    """Test that an unknown codec name raises a helpful error."""
+    with pytest.raises(ValueError, match="Unsupported codec"):
+        get_codec("lz4")
+
+
+@pytest.mark.asyncio
+async def test_large_events_are_offloaded(httpx_mock, mock_events, tmp_path):
+    """Test that results over the threshold are replaced by a resource stub."""
+    api_base = "http://localhost:5600/api/0"
+    bucket_id = "aw-watcher-window_hostname"
+    httpx_mock.add_response(url=f"{api_base}/buckets/{bucket_id}/events", json=mock_events)
+    store = ResultStore(tmp_path, threshold=1000, codec="gzip")
+    ctx = MockContext(lifespan_context={"api_base": api_base, "result_store": store})
+
+    result = await get_events(bucket_id=bucket_id, ctx=ctx)
+
+    stub = json.loads(result)
+    assert stub["offloaded"] is True
+    assert stub["uri"].startswith("activitywatch://results/")
+    assert stub["compressed_bytes"] < stub["size_bytes"]
+
+    result_id = stub["uri"].rsplit("/", 1)[1]
+    restored = await result_resource(result_id=result_id, ctx=ctx)
+    assert json.loads(restored) == mock_events
+
+
+@pytest.mark.asyncio
+async def test_small_events_are_inlined(httpx_mock, mock_events, tmp_path):
+    """Test that results under the threshold are returned inline."""
+    api_base = "http://localhost:5600/api/0"
+    bucket_id = "aw-watcher-window_hostname"
+    httpx_mock.add_response(url=f"{api_base}/buckets/{bucket_id}/events", json=mock_events[:1])
+    store = ResultStore(tmp_path, threshold=10_000, codec="gzip")
+    ctx = MockContext(lifespan_context={"api_base": api_base, "result_store": store})
+
+    result = await get_events(bucket_id=bucket_id, ctx=ctx)
+
+    assert json.loads(result) == mock_events[:1]
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.asyncio
+async def test_missing_result_id(tmp_path):
+    """Test reading an unknown or malformed result id."""
+    store = ResultStore(tmp_path, threshold=1000)
+    ctx = MockContext(lifespan_context={"result_store": store})
+
+    result = await result_resource(result_id="../../etc/passwd", ctx=ctx)
+
+    assert "not found" in result["error"]
+
+
+def test_threshold_counts_utf8_bytes(tmp_path):
+    """Test that the threshold applies to the encoded size, not the number of characters."""
+    store = ResultStore(tmp_path, threshold=100)
+
+    assert not store.should_offload("a" * 100)
+    assert store.should_offload("é" * 60)
+    assert store.should_offload("a" * 101)
+
+
+def test_offloaded_results_are_private(tmp_path):
+    """Test that the result directory and files are only accessible to the current user."""
+    store = ResultStore(tmp_path / "results", threshold=1)
+
+    stub = store.save('["private title"]')
+
+    assert (tmp_path / "results").stat().st_mode & 0o777 == 0o700
+    assert os.stat(stub["path"]).st_mode & 0o777 == 0o600
@@ -0,0 +1,154 @@
+"""Tests for the cost-based planner and the tools using it."""
+
+import json
+import re
+
+import pytest
+from mcp_server_activitywatch.cache import EventCache
+from mcp_server_activitywatch.planner import CostModel
+from mcp_server_activitywatch.tools.get_events import get_events
+from mcp_server_activitywatch.tools.run_query import run_query
+from mcp_server_activitywatch.tools.top import top
+from tests.conftest import MockContext, serve_events
+
+API_BASE = "http://localhost:5600/api/0"
+BUCKET_ID = "aw-watcher-window_hostname"
+EVENTS_URL = re.compile(rf"{API_BASE}/buckets/{BUCKET_ID}/events.*")
+
+
+@pytest.fixture
+def mock_events():
+    """Many short events over three days plus one crossing midnight."""
+    events = [
+        {
+            "id": index,
+            "timestamp": f"2024-02-{19 + index % 3}T10:{index // 3 % 60:02d}:00+00:00",
+            "duration": 30.0,
+            "data": {"app": "Code"},
+        }
+        for index in range(600)
+    ]
+    events.append({"id": 1000, "timestamp": "2024-02-19T23:50:00+00:00", "duration": 1200.0, "data": {"app": "Slack"}})
+    return events
+
+
+@pytest.fixture
+def cache_ctx():
+    """Context with an event cache."""
+    return MockContext(lifespan_context={"api_base": API_BASE, "event_cache": EventCache()})
+
+
+def direct_response(events, start, end):
+    """Return what aw-server would answer for a single request over the range."""
+    import httpx
+
+    request = httpx.Request("GET", f"{API_BASE}/buckets/{BUCKET_ID}/events", params={"start": start, "end": end})
+    return serve_events(events)(request).json()
+
+
+@pytest.mark.asyncio
+async def test_large_range_is_sharded_then_cached(httpx_mock, mock_events, cache_ctx):
+    """Test that a large multi-day range is fetched per day and then served from the cache."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+    kwargs = {"bucket_id": BUCKET_ID, "start": "2024-02-19T00:00:00+00:00", "end": "2024-02-22T00:00:00+00:00"}
+
+    first = json.loads(await get_events(explain=True, ctx=cache_ctx, **kwargs))
+    second = json.loads(await get_events(explain=True, ctx=cache_ctx, **kwargs))
+
+    assert first["plan"]["strategy"] == "sharded"
+    assert first["plan"]["estimated_events"] == 601
+    assert first["result"] == direct_response(mock_events, kwargs["start"], kwargs["end"])
+    assert second["plan"]["strategy"] == "cache"
+    assert second["result"] == first["result"]
+    assert len(httpx_mock.get_requests()) == 4
+
+
+@pytest.mark.asyncio
+async def test_small_limit_is_fetched_directly(httpx_mock, mock_events, mock_ctx):
+    """Test that a small limit skips estimation."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+
+    result = await get_events(
+        bucket_id=BUCKET_ID,
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-22T00:00:00Z",
+        limit=5,
+        explain=True,
+        ctx=mock_ctx,
+    )
+
+    parsed = json.loads(result)
+    assert parsed["plan"]["strategy"] == "direct"
+    assert set(parsed["plan"]["timings"]) == {"plan_ms", "execute_ms"}
+    assert len(httpx_mock.get_requests()) == 1
+
+
+@pytest.mark.asyncio
+async def test_top_pushes_down_when_cheaper(httpx_mock, mock_events):
+    """Test that an aggregation is run by aw-server when the cost model favors it."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+    httpx_mock.add_response(
+        url=f"{API_BASE}/query/",
+        method="POST",
+        json=[[{"timestamp": "2024-02-19T10:00:00+00:00", "duration": 18000.0, "data": {"app": "Code"}}]],
+    )
+    ctx = MockContext(lifespan_context={"api_base": API_BASE, "cost_model": CostModel(query_ms=0.0)})
+
+    result = await top(
+        bucket_id=BUCKET_ID, start="2024-02-19T00:00:00Z", end="2024-02-22T00:00:00Z", explain=True, ctx=ctx
+    )
+
+    parsed = json.loads(result)
+    assert parsed["plan"]["strategy"] == "pushdown"
+    assert parsed["top"] == [{"value": "Code", "duration": 18000.0, "share": 1.0}]
+    query = json.loads(httpx_mock.get_requests()[-1].content)
+    assert 'merge_events_by_keys(events, ["app"])' in query["query"][0]
+
+
+@pytest.mark.asyncio
+async def test_settled_query_results_are_cached(httpx_mock, cache_ctx):
+    """Test that a query over settled periods is answered from the cache the second time."""
+    httpx_mock.add_response(url=f"{API_BASE}/query/", method="POST", json=[[{"duration": 1.0}]])
+    httpx_mock.add_response(url=re.compile(rf"{API_BASE}/buckets/b/events/count.*"), json=42, is_reusable=True)
+    kwargs = {"timeperiods": ["2024-02-19/2024-02-20"], "query": ["events = query_bucket('b');  RETURN = events;"]}
+
+    first = json.loads(await run_query(explain=True, ctx=cache_ctx, **kwargs))
+    kwargs["query"] = ["events = query_bucket('b'); RETURN = events;"]
+    second = json.loads(await run_query(explain=True, ctx=cache_ctx, **kwargs))
+
+    assert (first["plan"]["strategy"], first["plan"]["estimated_events"]) == ("pushdown", 42)
+    assert second["plan"]["strategy"] == "cache"
+    assert second["result"] == first["result"] == [[{"duration": 1.0}]]
+    assert len(httpx_mock.get_requests(method="POST")) == 1
+
+
+@pytest.mark.asyncio
+async def test_sharded_fetch_honours_the_call_compaction_gap(httpx_mock):
+    """Test that a per-call gap other than the server's is applied to uncompacted days."""
+    events = [
+        {"id": day * 2 + offset, "timestamp": f"2024-02-{19 + day}T10:00:{offset * 40:02d}+00:00", "duration": 30.0}
+        for day in range(3)
+        for offset in range(2)
+    ]
+    for event in events:
+        event["data"] = {"app": "Code"}
+    httpx_mock.add_callback(serve_events(events), url=EVENTS_URL, is_reusable=True)
+    ctx = MockContext(
+        lifespan_context={
+            "api_base": API_BASE,
+            "event_cache": EventCache(),
+            "compact_gap": 60.0,
+            "cost_model": CostModel(request_overhead_ms=0),
+        }
+    )
+    kwargs = {"bucket_id": BUCKET_ID, "start": "2024-02-19T00:00:00+00:00", "end": "2024-02-22T00:00:00+00:00"}
+
+    compacted = json.loads(await get_events(explain=True, ctx=ctx, **kwargs))
+    raw = json.loads(await get_events(compact=0, explain=True, ctx=ctx, **kwargs))
+    cached_raw = json.loads(await get_events(compact=0, explain=True, ctx=ctx, **kwargs))
+
+    assert compacted["plan"]["strategy"] == raw["plan"]["strategy"] == "sharded"
+    assert [event["duration"] for event in compacted["result"]] == [70.0] * 3
+    assert [event["id"] for event in raw["result"]] == [5, 4, 3, 2, 1, 0]
+    assert cached_raw["plan"]["strategy"] == "cache"
+    assert cached_raw["result"] == raw["result"]
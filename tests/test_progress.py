@@ -0,0 +1,121 @@
+"""Tests for progress notifications and cancellation of long calls."""
+
+import asyncio
+import re
+
+import httpx
+import pytest
+from mcp_server_activitywatch.cache import EventCache
+from mcp_server_activitywatch.progress import Progress, gather
+from mcp_server_activitywatch.tools.get_events import get_events
+from mcp_server_activitywatch.tools.top import top
+from tests.conftest import MockContext, serve_events
+
+API_BASE = "http://localhost:5600/api/0"
+BUCKET_ID = "aw-watcher-window_hostname"
+EVENTS_URL = re.compile(rf"{API_BASE}/buckets/{BUCKET_ID}/events.*")
+RANGE = {"start": "2024-02-19T00:00:00+00:00", "end": "2024-02-22T00:00:00+00:00"}
+
+
+@pytest.fixture
+def mock_events():
+    """Many short events over three days."""
+    return [
+        {
+            "id": index,
+            "timestamp": f"2024-02-{19 + index % 3}T10:{index // 3 % 60:02d}:00+00:00",
+            "duration": 30.0,
+            "data": {"app": "Code"},
+        }
+        for index in range(600)
+    ]
+
+
+@pytest.fixture
+def cache_ctx():
+    """Context with an event cache, recording progress notifications."""
+    return MockContext(lifespan_context={"api_base": API_BASE, "event_cache": EventCache()})
+
+
+@pytest.mark.asyncio
+async def test_progress_is_throttled():
+    """Test that notifications are rate limited but the last step is always reported."""
+    ctx = MockContext(lifespan_context={})
+    progress = Progress(ctx, total=5, interval=60)
+
+    for _ in range(5):
+        await progress.advance(events=10)
+
+    assert ctx.progress == [(1, 5, "1/5 days, 10 events"), (5, 5, "5/5 days, 50 events")]
+
+
+@pytest.mark.asyncio
+async def test_sharded_fetch_reports_days(httpx_mock, mock_events, cache_ctx):
+    """Test that a sharded fetch reports the days done and events read."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+
+    await get_events(bucket_id=BUCKET_ID, ctx=cache_ctx, **RANGE)
+
+    assert cache_ctx.progress[-1] == (3, 3, "3/3 days, 600 events")
+
+
+@pytest.mark.asyncio
+async def test_top_reports_days(httpx_mock, mock_events, cache_ctx):
+    """Test that day-by-day aggregation reports every day."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+
+    await top(bucket_id=BUCKET_ID, ctx=cache_ctx, **RANGE)
+
+    assert cache_ctx.progress[-1][:2] == (3, 3)
+
+
+@pytest.mark.asyncio
+async def test_failed_shard_cancels_the_others():
+    """Test that one failure cancels the remaining fan-out instead of leaving it running."""
+    cancelled = []
+
+    async def slow(index):
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+
+    async def failing():
+        await asyncio.sleep(0)
+        raise ValueError("shard failed")
+
+    with pytest.raises(ValueError, match="shard failed"):
+        await gather(slow(1), failing(), slow(2))
+
+    assert sorted(cancelled) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_cancellation_aborts_upstream_requests(httpx_mock, mock_events, cache_ctx):
+    """Test that cancelling a call cancels every upstream request it has in flight."""
+    in_flight = set()
+    started = asyncio.Event()
+    count = serve_events(mock_events)
+
+    async def hang(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/count"):
+            return count(request)
+        in_flight.add(request.url.params["start"])
+        try:
+            if len(in_flight) == 3:
+                started.set()
+            await asyncio.sleep(60)
+        finally:
+            in_flight.discard(request.url.params["start"])
+        return httpx.Response(200, json=[])
+
+    httpx_mock.add_callback(hang, url=EVENTS_URL, is_reusable=True)
+    call = asyncio.create_task(get_events(bucket_id=BUCKET_ID, ctx=cache_ctx, **RANGE))
+    await asyncio.wait_for(started.wait(), timeout=5)
+
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+
+    assert in_flight == set()
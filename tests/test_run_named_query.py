@@ -0,0 +1,124 @@
+"""Tests for named queries and the run_named_query tool."""
+
+import json
+import re
+from datetime import date
+
+import pytest
+from mcp_server_activitywatch.cache import EventCache
+from mcp_server_activitywatch.chunks import resolve_period
+from mcp_server_activitywatch.named_queries import NamedQuery, QueryRegistry
+from mcp_server_activitywatch.tools.run_named_query import run_named_query
+from tests.conftest import MockContext
+
+API_BASE = "http://localhost:5600/api/0"
+
+APP_USAGE = {
+    "description": "Time per app",
+    "query": """
+        events = query_bucket({{ window }});
+        events = filter_keyvals(events, "app", {{ apps }});
+        RETURN = sort_by_duration(merge_events_by_keys(events, ["app"]));
+    """,
+    "params": {
+        "window": {"type": "bucket", "default": "aw-watcher-window_*"},
+        "apps": {"type": "string_list"},
+    },
+    "timeperiods": ["2024-02-19/2024-02-20"],
+}
+
+
+@pytest.fixture
+def registry_ctx():
+    """Context with an event cache and one named query."""
+    registry = QueryRegistry([NamedQuery.from_config("app-usage", APP_USAGE)])
+    return MockContext(lifespan_context={"api_base": API_BASE, "event_cache": EventCache(), "query_registry": registry})
+
+
+@pytest.fixture
+def mock_buckets():
+    """Two window buckets; the laptop one was updated last."""
+    return {
+        "aw-watcher-window_desktop": {"last_updated": "2024-02-01T00:00:00+00:00"},
+        "aw-watcher-window_laptop": {"last_updated": "2024-02-19T12:00:00+00:00"},
+        "aw-watcher-afk_laptop": {"last_updated": "2024-02-19T12:00:00+00:00"},
+    }
+
+
+def test_template_validation():
+    """Test that placeholders must match the declared parameters."""
+    with pytest.raises(ValueError, match="undeclared parameters: apps"):
+        NamedQuery.from_config("broken", {**APP_USAGE, "params": {"window": {"type": "bucket"}}})
+    with pytest.raises(ValueError, match="'broken' is malformed: Syntax error at line 1"):
+        NamedQuery.from_config("broken", {"query": "RETURN = query_bucket({{ window }}"})
+    with pytest.raises(ValueError, match="unknown type 'list'"):
+        NamedQuery.from_config("broken", {**APP_USAGE, "params": {"window": {"type": "list"}}})
+
+
+def test_resolve_period():
+    """Test period shorthands."""
+    today = date(2024, 2, 19)
+
+    assert resolve_period("today", today) == "2024-02-19/2024-02-20"
+    assert resolve_period("yesterday", today) == "2024-02-18/2024-02-19"
+    assert resolve_period("last_7_days", today) == "2024-02-13/2024-02-20"
+    assert resolve_period("this_week", today) == "2024-02-19/2024-02-20"
+    assert resolve_period("last_week", today) == "2024-02-12/2024-02-19"
+    assert resolve_period("2024-01-01/2024-01-02", today) == "2024-01-01/2024-01-02"
+
+
+@pytest.mark.asyncio
+async def test_run_named_query(httpx_mock, registry_ctx, mock_buckets):
+    """Test that parameters are resolved, rendered and equivalent calls share the cached result."""
+    httpx_mock.add_response(url=f"{API_BASE}/buckets", json=mock_buckets, is_reusable=True)
+    httpx_mock.add_response(url=f"{API_BASE}/query/", method="POST", json=[[{"data": {"app": "Code"}}]])
+    httpx_mock.add_response(url=re.compile(rf"{API_BASE}/buckets/.*/events/count.*"), json=10, is_reusable=True)
+
+    first = json.loads(
+        await run_named_query(name="app-usage", params={"apps": ["Slack", "Code"]}, explain=True, ctx=registry_ctx)
+    )
+    second = json.loads(
+        await run_named_query(
+            name="app-usage", params={"apps": ["Code", "Slack", "Code"]}, explain=True, ctx=registry_ctx
+        )
+    )
+
+    assert first["query"] == (
+        'events=query_bucket("aw-watcher-window_laptop"); '
+        'events=filter_keyvals(events,"app",["Code","Slack"]); '
+        'RETURN=sort_by_duration(merge_events_by_keys(events,["app"]));'
+    )
+    posted = json.loads(httpx_mock.get_requests(method="POST")[0].content)
+    assert posted == {"query": [first["query"]], "timeperiods": ["2024-02-19/2024-02-20"]}
+    assert second["plan"]["strategy"] == "cache"
+    assert second["result"] == first["result"]
+
+
+@pytest.mark.asyncio
+async def test_parameter_errors(registry_ctx):
+    """Test that missing and mistyped parameters are reported without a request."""
+    missing = await run_named_query(name="app-usage", ctx=registry_ctx)
+    mistyped = await run_named_query(name="app-usage", params={"apps": "Code"}, ctx=registry_ctx)
+
+    assert "Missing required parameter 'apps'" in missing
+    assert "Parameter 'apps' must be a string list" in mistyped
+
+
+@pytest.mark.asyncio
+async def test_unknown_query_lists_available(registry_ctx, mock_ctx):
+    """Test that an unknown name lists the registered queries."""
+    result = await run_named_query(name="nope", ctx=registry_ctx)
+    unconfigured = await run_named_query(name="nope", ctx=mock_ctx)
+
+    assert '"name": "app-usage"' in result
+    assert "--queries-file" in unconfigured
+
+
+def test_registry_load(tmp_path):
+    """Test loading templates from a JSON file."""
+    path = tmp_path / "queries.json"
+    path.write_text(json.dumps({"queries": {"app-usage": APP_USAGE}}))
+
+    registry = QueryRegistry.load(str(path))
+
+    assert registry.get("app-usage").params["apps"].type == "string_list"
@@ -4,7 +4,9 @@ import json
 
 import httpx
 import pytest
+from mcp_server_activitywatch.cache import EventCache
 from mcp_server_activitywatch.tools.run_query import run_query
+from tests.conftest import MockContext
 
 
 @pytest.mark.asyncio
@@ -66,7 +68,7 @@ async def test_handle_query_errors_with_response_data(httpx_mock, mock_ctx):
 
     result = await run_query(
         timeperiods=["2024-02-01/2024-02-07"],
-        query=["invalid query syntax"],
+        query=["RETURN = unknown_function();"],
         ctx=mock_ctx,
     )
 
@@ -110,3 +112,40 @@ async def test_format_timeperiods_correctly(httpx_mock, mock_ctx):
 
     assert isinstance(result, str)
     # Verify the request was made (httpx_mock will verify URL was called)
+
+
+@pytest.mark.asyncio
+async def test_malformed_query_rejected_locally(httpx_mock, mock_ctx):
+    """Test that a malformed query is reported with its location without a request."""
+    result = await run_query(
+        timeperiods=["2024-02-01/2024-02-07"],
+        query=["events = query_bucket('aw-watcher-window_hostname')\nRETURN = events;"],
+        ctx=mock_ctx,
+    )
+
+    assert "Syntax error at line 2, column 1: expected ';' between statements, found 'RETURN'" in result
+    assert not httpx_mock.get_requests()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("query", "requests"),
+    [
+        ("# top apps\nevents = query_bucket('aw-watcher-window_hostname');\nRETURN = events;", 1),
+        ("a = 60 * 60;\nRETURN = a;", 2),
+        ("if true { RETURN = 1; } else { RETURN = 2; }", 2),
+        ('events = query_bucket("aw-watcher-window_hostname")[0];\nRETURN = events;', 2),
+    ],
+)
+async def test_server_syntax_is_sent_as_is(httpx_mock, query, requests):
+    """Test that valid aw-server syntax reaches the server unchanged, uncached if not parsed locally."""
+    api_base = "http://localhost:5600/api/0"
+    httpx_mock.add_response(url=f"{api_base}/query/", json=[3600], is_reusable=True)
+    ctx = MockContext(lifespan_context={"api_base": api_base, "event_cache": EventCache()})
+
+    for _ in range(2):
+        result = await run_query(timeperiods=["2024-02-01/2024-02-07"], query=[query], ctx=ctx)
+        assert json.loads(result) == [3600]
+
+    sent = [json.loads(request.content)["query"] for request in httpx_mock.get_requests()]
+    assert sent == [[query]] * requests
@@ -0,0 +1,171 @@
+"""Tests for search tool and the text index."""
+
+import json
+import re
+
+import pytest
+from mcp_server_activitywatch.columnar import EventColumns, to_epoch_us
+from mcp_server_activitywatch.text_index import BucketIndex, TextIndex, tokenize
+from mcp_server_activitywatch.tools.search import search
+from tests.conftest import MockContext, serve_events
+
+EVENTS_URL = re.compile(r"http://localhost:5600/api/0/buckets/aw-watcher-window_hostname/events.*")
+
+
+@pytest.fixture
+def mock_events():
+    """Window and browser events over two days."""
+    return [
+        {
+            "id": 1,
+            "timestamp": "2024-02-19T10:00:00+00:00",
+            "duration": 60.0,
+            "data": {"app": "Code", "title": "server.py - mcp-server"},
+        },
+        {
+            "id": 2,
+            "timestamp": "2024-02-19T10:01:00+00:00",
+            "duration": 60.0,
+            "data": {"app": "Code", "title": "search.py - mcp-server"},
+        },
+        {
+            "id": 3,
+            "timestamp": "2024-02-19T10:02:00+00:00",
+            "duration": 120.0,
+            "data": {"app": "Slack", "title": "general"},
+        },
+        {
+            "id": 4,
+            "timestamp": "2024-02-20T09:00:00+00:00",
+            "duration": 30.0,
+            "data": {"app": "Firefox", "title": "Docs", "url": "https://github.com/mcp-server"},
+        },
+    ]
+
+
+@pytest.fixture
+def index_ctx():
+    """Context with a shared text index."""
+    return MockContext(lifespan_context={"api_base": "http://localhost:5600/api/0", "text_index": TextIndex()})
+
+
+def test_tokenize():
+    """Test case folding and dropping of one-character tokens."""
+    assert tokenize("Search.py - MCP-Server (1)") == {"search", "py", "mcp", "server"}
+
+
+def test_consecutive_ranges_are_merged(mock_events):
+    """Test that a token's posting list merges consecutive events."""
+    index = BucketIndex()
+    index.add_chunk(EventColumns.from_wire(mock_events).sorted_by_start())
+
+    assert index.ranges("server") == [
+        (to_epoch_us("2024-02-19T10:00:00Z"), to_epoch_us("2024-02-19T10:02:00Z")),
+        (to_epoch_us("2024-02-20T09:00:00Z"), to_epoch_us("2024-02-20T09:00:30Z")),
+    ]
+    assert index.search({"search", "py"}, 0, to_epoch_us("2025-01-01T00:00:00Z")) == [
+        (to_epoch_us("2024-02-19T10:01:00Z"), to_epoch_us("2024-02-19T10:02:00Z"))
+    ]
+
+
+def test_out_of_order_chunks_are_sorted(mock_events):
+    """Test that indexing later days first still yields sorted ranges."""
+    index = BucketIndex()
+    index.add_chunk(EventColumns.from_wire(mock_events[3:]))
+    index.add_chunk(EventColumns.from_wire(mock_events[:3]).sorted_by_start())
+
+    assert [start for start, _ in index.ranges("mcp")] == [
+        to_epoch_us("2024-02-19T10:00:00Z"),
+        to_epoch_us("2024-02-20T09:00:00Z"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_reports_ranges_per_day(httpx_mock, mock_events, index_ctx):
+    """Test search over titles and URLs across days."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+
+    result = await search(
+        query="MCP server",
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-21T00:00:00Z",
+        bucket_ids=["aw-watcher-window_hostname"],
+        ctx=index_ctx,
+    )
+
+    parsed = json.loads(result)
+    bucket = parsed["buckets"][0]
+    assert parsed["terms"] == ["mcp", "server"]
+    assert bucket["total_duration"] == 150.0
+    assert bucket["days"] == {"2024-02-19": 120.0, "2024-02-20": 30.0}
+    assert bucket["ranges"][0] == {
+        "start": "2024-02-19T10:00:00+00:00",
+        "end": "2024-02-19T10:02:00+00:00",
+        "duration": 120.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_indexed_days_are_not_fetched_again(httpx_mock, mock_events, index_ctx):
+    """Test that a second search over past days is answered from the index."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+    kwargs = {
+        "start": "2024-02-19T00:00:00Z",
+        "end": "2024-02-21T00:00:00Z",
+        "bucket_ids": ["aw-watcher-window_hostname"],
+    }
+
+    await search(query="server", ctx=index_ctx, **kwargs)
+    second = json.loads(await search(query="general", ctx=index_ctx, **kwargs))
+
+    assert len(httpx_mock.get_requests()) == 2
+    assert second["fetched_days"] == 0
+    assert second["total_duration"] == 120.0
+
+
+@pytest.mark.asyncio
+async def test_search_discovers_window_and_web_buckets(httpx_mock, mock_events, mock_ctx):
+    """Test that buckets default to all window and web buckets."""
+    httpx_mock.add_response(
+        url="http://localhost:5600/api/0/buckets",
+        json={
+            "aw-watcher-window_hostname": {"type": "currentwindow"},
+            "aw-watcher-afk_hostname": {"type": "afkstatus"},
+        },
+    )
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+
+    result = await search(query="docs", start="2024-02-20T00:00:00Z", end="2024-02-21T00:00:00Z", ctx=mock_ctx)
+
+    parsed = json.loads(result)
+    assert [bucket["bucket_id"] for bucket in parsed["buckets"]] == ["aw-watcher-window_hostname"]
+    assert parsed["total_duration"] == 30.0
+
+
+@pytest.mark.asyncio
+async def test_query_without_words(mock_ctx):
+    """Test rejecting a query with nothing to search for."""
+    result = await search(query="- !", start="2024-02-19T00:00:00Z", ctx=mock_ctx)
+
+    assert "no searchable words" in result
+
+
+def test_index_memory_is_bounded(mock_events):
+    """Test that the least recently searched buckets are dropped to fit the budget."""
+    text_index = TextIndex()
+    for bucket_id in ("first", "second"):
+        text_index.bucket("http://localhost:5600/api/0", bucket_id).add_chunk(EventColumns.from_wire(mock_events))
+    size = text_index.buckets["http://localhost:5600/api/0", "second"].size_bytes
+    assert size > 0
+    assert text_index.size_bytes == 2 * size
+
+    text_index.max_bytes = size
+    text_index.fit()
+
+    assert list(text_index.buckets) == [("http://localhost:5600/api/0", "second")]
+
+    text_index.max_bytes = size - 1
+    text_index.fit()
+
+    assert text_index.buckets == {}
+    assert text_index.bucket("http://localhost:5600/api/0", "second").days == set()
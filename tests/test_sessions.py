@@ -0,0 +1,177 @@
+"""Tests for sessions tool."""
+
+import json
+import re
+import sys
+
+import pytest
+from mcp_server_activitywatch.columnar import EventColumns, to_epoch_us
+from mcp_server_activitywatch.sessionize import Sessionizer
+from mcp_server_activitywatch.tools.sessions import sessions
+from tests.conftest import serve_events
+
+WINDOW_URL = re.compile(r"http://localhost:5600/api/0/buckets/aw-watcher-window_hostname/events.*")
+AFK_URL = re.compile(r"http://localhost:5600/api/0/buckets/aw-watcher-afk_hostname/events.*")
+
+
+@pytest.fixture
+def mock_events():
+    """Window events with a short gap, a long gap and a midnight crossing."""
+    return [
+        {"id": 1, "timestamp": "2024-02-19T10:00:00+00:00", "duration": 600.0, "data": {"app": "Code"}},
+        {"id": 2, "timestamp": "2024-02-19T10:12:00+00:00", "duration": 300.0, "data": {"app": "Firefox"}},
+        {"id": 3, "timestamp": "2024-02-19T12:00:00+00:00", "duration": 60.0, "data": {"app": "Slack"}},
+        {"id": 4, "timestamp": "2024-02-19T23:50:00+00:00", "duration": 1200.0, "data": {"app": "Code"}},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sessions_split_on_gaps(httpx_mock, mock_events, mock_ctx):
+    """Test that long gaps split sessions and midnight does not."""
+    httpx_mock.add_callback(serve_events(mock_events), url=WINDOW_URL, is_reusable=True)
+
+    result = await sessions(
+        bucket_id="aw-watcher-window_hostname",
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-21T00:00:00Z",
+        ctx=mock_ctx,
+    )
+
+    parsed = json.loads(result)
+    assert parsed["count"] == 3
+    assert parsed["sessions"][0] == {
+        "start": "2024-02-19T10:00:00+00:00",
+        "end": "2024-02-19T10:17:00+00:00",
+        "duration": 1020.0,
+        "active": 900.0,
+        "events": 2,
+        "dominant": "Code",
+        "dominant_share": 600.0 / 900.0,
+    }
+    assert parsed["sessions"][2]["start"] == "2024-02-19T23:50:00+00:00"
+    assert parsed["sessions"][2]["active"] == 1200.0
+
+
+@pytest.mark.asyncio
+async def test_afk_periods_split_sessions(httpx_mock, mock_events, mock_ctx):
+    """Test that AFK time is not active and long AFK periods split sessions."""
+    afk_events = [
+        {"id": 1, "timestamp": "2024-02-19T10:00:00+00:00", "duration": 300.0, "data": {"status": "not-afk"}},
+        {"id": 2, "timestamp": "2024-02-19T10:05:00+00:00", "duration": 420.0, "data": {"status": "afk"}},
+        {"id": 3, "timestamp": "2024-02-19T10:12:00+00:00", "duration": 600.0, "data": {"status": "not-afk"}},
+    ]
+    httpx_mock.add_callback(serve_events(mock_events), url=WINDOW_URL, is_reusable=True)
+    httpx_mock.add_callback(serve_events(afk_events), url=AFK_URL, is_reusable=True)
+
+    result = await sessions(
+        bucket_id="aw-watcher-window_hostname",
+        afk_bucket_id="aw-watcher-afk_hostname",
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-20T00:00:00Z",
+        ctx=mock_ctx,
+    )
+
+    parsed = json.loads(result)
+    assert [(session["dominant"], session["active"]) for session in parsed["sessions"]] == [
+        ("Code", 300.0),
+        ("Firefox", 300.0),
+    ]
+
+
+def test_overlapping_events_are_not_double_counted():
+    """Test that active time counts overlapping events once."""
+    sessionizer = Sessionizer(gap_us=60_000_000)
+    sessionizer.add_chunk(
+        EventColumns.from_wire(
+            [
+                {"timestamp": "2024-02-19T10:00:00+00:00", "duration": 120.0, "data": {"app": "a"}},
+                {"timestamp": "2024-02-19T10:01:00+00:00", "duration": 120.0, "data": {"app": "b"}},
+            ]
+        )
+    )
+
+    (session,) = sessionizer.finish()
+
+    assert session.active == 180_000_000
+    assert session.end == to_epoch_us("2024-02-19T10:03:00Z")
+    assert session.durations == {"a": 120_000_000, "b": 60_000_000}
+
+
+@pytest.mark.asyncio
+async def test_handle_bucket_not_found(httpx_mock, mock_ctx):
+    """Test handling 404 error when bucket not found."""
+    httpx_mock.add_response(url=re.compile(r".*/buckets/missing/events.*"), status_code=404)
+
+    result = await sessions(bucket_id="missing", start="2024-02-19T00:00:00Z", end="2024-02-19T12:00:00Z", ctx=mock_ctx)
+
+    assert "Bucket not found: missing" in result
+
+
+@pytest.mark.asyncio
+async def test_afk_chunks_are_closed_on_error(monkeypatch, mock_ctx):
+    """Test that the AFK chunk stream is closed when the window bucket fails midway."""
+    closed = []
+
+    async def fake_chunks(ctx, client, bucket_id, start_us, end_us, progress=None):
+        try:
+            yield EventColumns()
+            if bucket_id == "aw-watcher-window_hostname":
+                raise ValueError("upstream went away")
+            yield EventColumns()
+        finally:
+            closed.append(bucket_id)
+
+    # The tools package re-exports the tool function under the module's name.
+    monkeypatch.setattr(sys.modules["mcp_server_activitywatch.tools.sessions"], "iter_event_chunks", fake_chunks)
+    monkeypatch.setattr(sys.modules["mcp_server_activitywatch.sessionize"], "iter_event_chunks", fake_chunks)
+
+    result = await sessions(
+        bucket_id="aw-watcher-window_hostname",
+        afk_bucket_id="aw-watcher-afk_hostname",
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-21T00:00:00Z",
+        ctx=mock_ctx,
+    )
+
+    assert result == "Failed to compute sessions: upstream went away"
+    assert sorted(closed) == ["aw-watcher-afk_hostname", "aw-watcher-window_hostname"]
+
+
+@pytest.mark.asyncio
+async def test_dominant_category(httpx_mock, mock_events, mock_ctx):
+    """Test that sessions take their dominant value from categories when given."""
+    httpx_mock.add_callback(serve_events(mock_events), url=WINDOW_URL, is_reusable=True)
+
+    result = await sessions(
+        bucket_id="aw-watcher-window_hostname",
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-20T00:00:00Z",
+        categories={"Browsing": "firefox", "Work": "code|firefox"},
+        ctx=mock_ctx,
+    )
+
+    parsed = json.loads(result)
+    assert [(session["dominant"], session["dominant_share"]) for session in parsed["sessions"]] == [
+        ("Work", 600.0 / 900.0),
+        ("Uncategorized", 1.0),
+        ("Work", 600.0 / 600.0),
+    ]
+
+
+def test_list_valued_key():
+    """Test that list values such as tags are tallied by their JSON form."""
+    sessionizer = Sessionizer(gap_us=60_000_000, key="tags")
+    sessionizer.add_chunk(
+        EventColumns.from_wire(
+            [
+                {"timestamp": "2024-02-19T10:00:00+00:00", "duration": 60.0, "data": {"tags": ["a", "b"]}},
+                {"timestamp": "2024-02-19T10:01:00+00:00", "duration": 30.0, "data": {"tags": ["a", "b"]}},
+                {"timestamp": "2024-02-19T10:01:30+00:00", "duration": 30.0, "data": {"tags": []}},
+            ]
+        )
+    )
+
+    (session,) = sessionizer.finish()
+
+    assert session.durations == {'["a", "b"]': 90_000_000, "[]": 30_000_000}
+    assert session.dominant() == ('["a", "b"]', 90_000_000)
@@ -0,0 +1,116 @@
+"""Tests for cache snapshots."""
+
+import os
+
+import httpx
+import pytest
+from mcp_server_activitywatch.cache import CachedValue, EventCache
+from mcp_server_activitywatch.columnar import EventColumns
+from mcp_server_activitywatch.snapshot import (
+    HEADER,
+    MAGIC,
+    Snapshot,
+    restore_snapshot,
+    save_snapshot,
+    write_snapshot,
+)
+
+API_BASE = "http://localhost:5600/api/0"
+
+QUERY_KEY = ("query", API_BASE, 'RETURN=query_bucket("aw-watcher-afk_host");', ("2024-02-19/2024-02-20",))
+
+
+@pytest.fixture
+def buckets():
+    """Bucket metadata at the time the snapshot is written."""
+    return {
+        "aw-watcher-window_host": {"created": "2024-01-01T00:00:00", "last_updated": "2024-02-20T10:00:00"},
+        "aw-watcher-afk_host": {"created": "2024-01-01T00:00:00", "last_updated": "2024-02-20T10:00:00"},
+    }
+
+
+@pytest.fixture
+def warm_cache():
+    """A cache holding an event chunk, a query result and short-lived bucket metadata."""
+    cache = EventCache()
+    events = [{"id": 1, "timestamp": "2024-02-19T10:00:00+00:00", "duration": 60.0, "data": {"app": "Code"}}]
+    cache.put((API_BASE, "aw-watcher-window_host", 0), EventColumns.from_wire(events))
+    cache.put(QUERY_KEY, CachedValue([[{"duration": 60.0}]], 32))
+    cache.put(("buckets", API_BASE), CachedValue({}, 2), ttl=5)
+    return cache
+
+
+def test_round_trip(tmp_path, warm_cache, buckets):
+    """Test that entries that do not expire are restored lazily."""
+    path = tmp_path / "snapshot.bin"
+    assert write_snapshot(warm_cache, path, API_BASE, buckets) == 2
+
+    snapshot = Snapshot.open(path)
+    assert snapshot.validate(API_BASE, buckets) == 0
+    cache = EventCache()
+    cache.snapshot = snapshot
+
+    assert cache.stats()["chunks"] == 0
+    chunk = cache.get((API_BASE, "aw-watcher-window_host", 0))
+    assert chunk[0]["data"] == {"app": "Code"}
+    assert cache.get(QUERY_KEY).value == [[{"duration": 60.0}]]
+    assert cache.get(("buckets", API_BASE)) is None
+    assert len(snapshot) == 0
+
+
+def test_validation_against_bucket_metadata(tmp_path, warm_cache, buckets):
+    """Test that entries of recreated buckets are dropped and those of buckets with new events kept."""
+    path = tmp_path / "snapshot.bin"
+    write_snapshot(warm_cache, path, API_BASE, buckets)
+    current = {
+        "aw-watcher-window_host": {"created": "2024-01-01T00:00:00", "last_updated": "2024-02-21T08:00:00"},
+        "aw-watcher-afk_host": {"created": "2024-02-21T00:00:00", "last_updated": "2024-02-21T08:00:00"},
+    }
+
+    snapshot = Snapshot.open(path)
+
+    assert snapshot.validate(API_BASE, current) == 1
+    assert snapshot.take(QUERY_KEY) is None
+    assert snapshot.take((API_BASE, "aw-watcher-window_host", 0)) is not None
+    assert Snapshot.open(path).validate("http://elsewhere:5600/api/0", buckets) == 2
+
+
+def test_other_version_is_ignored(tmp_path):
+    """Test that snapshots written by another format version are not read."""
+    path = tmp_path / "snapshot.bin"
+    path.write_bytes(HEADER.pack(MAGIC, 0) + b"{}")
+
+    assert Snapshot.open(path) is None
+    assert Snapshot.open(tmp_path / "missing.bin") is None
+
+
+def test_written_for_the_current_user_only(tmp_path, warm_cache, buckets, monkeypatch):
+    """Test that snapshots are private to their user and those of other users are not read."""
+    path = tmp_path / "snapshots" / "snapshot.bin"
+    write_snapshot(warm_cache, path, API_BASE, buckets)
+
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+    assert path.stat().st_mode & 0o777 == 0o600
+    assert [entry.name for entry in path.parent.iterdir()] == ["snapshot.bin"]
+    monkeypatch.setattr(os, "getuid", lambda: path.stat().st_uid + 1)
+    assert Snapshot.open(path) is None
+    with pytest.raises(PermissionError, match="belongs to another user"):
+        write_snapshot(warm_cache, path, API_BASE, buckets)
+
+
+@pytest.mark.asyncio
+async def test_restarts_keep_unused_entries(httpx_mock, tmp_path, warm_cache, buckets):
+    """Test that entries not used in a run are carried over to the next snapshot."""
+    httpx_mock.add_response(url=f"{API_BASE}/buckets", json=buckets, is_reusable=True)
+    path = tmp_path / "snapshot.bin"
+
+    async with httpx.AsyncClient() as client:
+        assert await save_snapshot(warm_cache, path, API_BASE, client) == 2
+        second_run = EventCache()
+        assert await restore_snapshot(second_run, path, API_BASE, client) == 2
+        second_run.get(QUERY_KEY)
+        assert await save_snapshot(second_run, path, API_BASE, client) == 2
+        third_run = EventCache()
+        assert await restore_snapshot(third_run, path, API_BASE, client) == 2
+
+    assert third_run.get((API_BASE, "aw-watcher-window_host", 0)) is not None
@@ -0,0 +1,143 @@
+"""Tests for stats tool and the streaming sketches."""
+
+import json
+import random
+import re
+
+import pytest
+from mcp_server_activitywatch.cache import EventCache
+from mcp_server_activitywatch.sketches import HyperLogLog, KLLSketch
+from mcp_server_activitywatch.tools.stats import stats
+from tests.conftest import MockContext, serve_events
+
+EVENTS_URL = re.compile(r"http://localhost:5600/api/0/buckets/aw-watcher-window_hostname/events.*")
+
+
+@pytest.fixture
+def mock_events():
+    """Window events over two days; the first two form one focus span."""
+    return [
+        {"id": 1, "timestamp": "2024-02-19T10:00:00+00:00", "duration": 60.0, "data": {"app": "Code", "title": "a.py"}},
+        {"id": 2, "timestamp": "2024-02-19T10:01:00+00:00", "duration": 60.0, "data": {"app": "Code", "title": "b.py"}},
+        {
+            "id": 3,
+            "timestamp": "2024-02-19T10:02:00+00:00",
+            "duration": 30.0,
+            "data": {"app": "Firefox", "title": "Docs"},
+        },
+        {
+            "id": 4,
+            "timestamp": "2024-02-20T09:00:00+00:00",
+            "duration": 300.0,
+            "data": {"app": "Code", "title": "a.py"},
+        },
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stats_per_app(httpx_mock, mock_events, mock_ctx):
+    """Test statistics over focus spans across days."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+
+    result = await stats(
+        bucket_id="aw-watcher-window_hostname",
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-21T00:00:00Z",
+        ctx=mock_ctx,
+    )
+
+    parsed = json.loads(result)
+    code = parsed["groups"][0]
+    assert code["value"] == "Code"
+    assert (code["count"], code["total_duration"], code["mean"]) == (2, 420.0, 210.0)
+    assert code["p50"] == 120.0
+    assert code["p99"] == 300.0
+    assert code["distinct_titles"] == 2
+    assert parsed["overall"]["count"] == 3
+    assert parsed["overall"]["distinct_titles"] == 3
+
+
+@pytest.mark.asyncio
+async def test_daily_sketches_are_cached(httpx_mock, mock_events):
+    """Test that past days are answered from cached sketches."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+    ctx = MockContext(lifespan_context={"api_base": "http://localhost:5600/api/0", "event_cache": EventCache()})
+    kwargs = {"bucket_id": "aw-watcher-window_hostname", "start": "2024-02-19T00:00:00Z", "end": "2024-02-21T00:00:00Z"}
+
+    first = json.loads(await stats(ctx=ctx, **kwargs))
+    second = json.loads(await stats(ctx=ctx, **kwargs))
+
+    assert len(httpx_mock.get_requests()) == 2
+    assert (first["cached_days"], second["cached_days"]) == (0, 2)
+    assert second["groups"] == first["groups"]
+
+
+@pytest.mark.asyncio
+async def test_stats_per_category(httpx_mock, mock_events):
+    """Test grouping by category, cached separately from grouping by key."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+    ctx = MockContext(lifespan_context={"api_base": "http://localhost:5600/api/0", "event_cache": EventCache()})
+    kwargs = {"bucket_id": "aw-watcher-window_hostname", "start": "2024-02-19T00:00:00Z", "end": "2024-02-21T00:00:00Z"}
+
+    await stats(ctx=ctx, **kwargs)
+    parsed = json.loads(await stats(ctx=ctx, categories={"Programming": r"\.py$"}, **kwargs))
+
+    assert parsed["cached_days"] == 0
+    assert [(group["value"], group["count"], group["total_duration"]) for group in parsed["groups"]] == [
+        ("Programming", 2, 420.0),
+        ("Uncategorized", 1, 30.0),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stats_by_list_valued_key(httpx_mock, mock_ctx):
+    """Test that list values such as tags are grouped by their JSON form."""
+    events = [
+        {"id": 1, "timestamp": "2024-02-19T10:00:00+00:00", "duration": 60.0, "data": {"tags": ["a", "b"]}},
+        {"id": 2, "timestamp": "2024-02-19T11:00:00+00:00", "duration": 30.0, "data": {"tags": ["a", "b"]}},
+    ]
+    httpx_mock.add_callback(serve_events(events), url=EVENTS_URL, is_reusable=True)
+
+    result = await stats(
+        bucket_id="aw-watcher-window_hostname",
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-20T00:00:00Z",
+        key="tags",
+        ctx=mock_ctx,
+    )
+
+    parsed = json.loads(result)
+    assert [(group["value"], group["count"]) for group in parsed["groups"]] == [('["a", "b"]', 2)]
+
+
+def test_kll_merged_quantiles_are_close():
+    """Test quantile accuracy of merged sketches."""
+    rng = random.Random(7)
+    values = [rng.expovariate(1 / 60) for _ in range(50_000)]
+    parts = [KLLSketch() for _ in range(5)]
+    for index, value in enumerate(values):
+        parts[index % 5].update(value)
+
+    merged = KLLSketch()
+    for part in parts:
+        merged.merge(part)
+
+    ordered = sorted(values)
+    assert merged.count == len(values)
+    assert merged.nbytes() < 64 * 1024
+    for fraction, estimate in zip((0.5, 0.9, 0.99), merged.quantiles([0.5, 0.9, 0.99]), strict=True):
+        rank = sum(1 for value in ordered if value <= estimate) / len(ordered)
+        assert abs(rank - fraction) < 0.02
+
+
+def test_hyperloglog_merge_counts_union():
+    """Test distinct counts of merged sketches."""
+    left, right = HyperLogLog(), HyperLogLog()
+    for index in range(4000):
+        left.add(f"title {index}")
+    for index in range(2000, 6000):
+        right.add(f"title {index}")
+
+    left.merge(right)
+
+    assert abs(left.count() - 6000) < 6000 * 0.1
@@ -0,0 +1,113 @@
+"""Tests for timeline tool and binning."""
+
+import json
+import random
+import re
+
+import pytest
+from mcp_server_activitywatch.columnar import EventColumns, from_epoch_us, to_epoch_us
+from mcp_server_activitywatch.timeline import Categorizer, bin_chunks
+from mcp_server_activitywatch.tools.timeline import timeline
+from tests.conftest import serve_events
+
+WINDOW_URL = re.compile(r"http://localhost:5600/api/0/buckets/aw-watcher-window_hostname/events.*")
+WEB_URL = re.compile(r"http://localhost:5600/api/0/buckets/aw-watcher-web_hostname/events.*")
+
+
+@pytest.fixture
+def mock_events():
+    """Window events within two hours, one crossing the hour."""
+    return [
+        {
+            "id": 1,
+            "timestamp": "2024-02-19T10:00:00+00:00",
+            "duration": 1200.0,
+            "data": {"app": "Code", "title": "a.py"},
+        },
+        {
+            "id": 2,
+            "timestamp": "2024-02-19T10:50:00+00:00",
+            "duration": 1200.0,
+            "data": {"app": "Firefox", "title": "GitHub"},
+        },
+    ]
+
+
+@pytest.mark.asyncio
+async def test_hourly_timeline(httpx_mock, mock_events, mock_ctx):
+    """Test active seconds, dominant app and categories per hourly bin."""
+    web_events = [
+        {
+            "id": 1,
+            "timestamp": "2024-02-19T10:55:00+00:00",
+            "duration": 600.0,
+            "data": {"title": "GitHub", "url": "https://github.com"},
+        },
+    ]
+    httpx_mock.add_callback(serve_events(mock_events), url=WINDOW_URL, is_reusable=True)
+    httpx_mock.add_callback(serve_events(web_events), url=WEB_URL, is_reusable=True)
+
+    result = await timeline(
+        bucket_ids=["aw-watcher-window_hostname", "aw-watcher-web_hostname"],
+        start="2024-02-19T10:00:00Z",
+        end="2024-02-19T12:00:00Z",
+        categories={"Programming": "code|github"},
+        ctx=mock_ctx,
+    )
+
+    parsed = json.loads(result)
+    assert parsed["first_bin"] == "2024-02-19T10:00:00+00:00"
+    assert parsed["active"] == [1800.0, 600.0]
+    assert parsed["dominant"] == ["Code", "Firefox"]
+    assert parsed["categories"] == {"Programming": [2100.0, 900.0], "Uncategorized": [0.0, 0.0]}
+
+
+@pytest.mark.asyncio
+async def test_bin_size_must_divide_a_day(mock_ctx):
+    """Test rejecting bins that would straddle midnight."""
+    result = await timeline(
+        bucket_ids=["aw-watcher-window_hostname"], start="2024-02-19T00:00:00Z", bin_size=7 * 60, ctx=mock_ctx
+    )
+
+    assert "bin_size must divide a day" in result
+
+
+def test_numpy_and_python_binning_agree():
+    """Test that the vectorized path matches the per-event loop."""
+    pytest.importorskip("numpy")
+    rng = random.Random(3)
+    start = to_epoch_us("2024-02-19T00:00:00Z")
+    events = []
+    for _ in range(500):
+        start += rng.randint(0, 400) * 1_000_000
+        events.append(
+            {
+                "timestamp": from_epoch_us(start),
+                "duration": rng.uniform(0, 900),
+                "data": {"app": rng.choice(["a", "b", "c"]), "title": rng.choice(["x", "y"])},
+            }
+        )
+    chunk = EventColumns.from_wire(events)
+    categorizer = Categorizer({"first": "^a$", "why": "y"})
+    origin = to_epoch_us("2024-02-19T00:00:00Z")
+
+    fast = bin_chunks([chunk], origin, 300_000_000, 288, categorizer=categorizer, vectorized=True)
+    slow = bin_chunks([chunk], origin, 300_000_000, 288, categorizer=categorizer, vectorized=False)
+
+    assert fast.active == pytest.approx(slow.active)
+    assert fast.by_value == [pytest.approx(row) for row in slow.by_value]
+    assert fast.categories == [pytest.approx(row) for row in slow.categories]
+    assert [value for value, _ in fast.dominant()] == [value for value, _ in slow.dominant()]
+
+
+def test_list_valued_key_across_chunks():
+    """Test that equal list values, e.g. tags, from different chunks share one value."""
+    chunks = [
+        EventColumns.from_wire([{"timestamp": timestamp, "duration": 600.0, "data": {"tags": ["a", "b"]}}])
+        for timestamp in ("2024-02-19T10:00:00+00:00", "2024-02-19T10:30:00+00:00")
+    ]
+
+    bins = bin_chunks(chunks, to_epoch_us("2024-02-19T10:00:00Z"), 3_600_000_000, 1, key="tags", vectorized=False)
+
+    assert bins.values == [["a", "b"]]
+    assert bins.dominant() == [(["a", "b"], 1200.0)]
@@ -0,0 +1,108 @@
+"""Tests for top tool."""
+
+import json
+import re
+
+import pytest
+from mcp_server_activitywatch.cache import EventCache
+from mcp_server_activitywatch.tools.top import TopAccumulator, top
+from tests.conftest import MockContext, serve_events
+
+EVENTS_URL = re.compile(r"http://localhost:5600/api/0/buckets/aw-watcher-window_hostname/events.*")
+
+
+@pytest.fixture
+def mock_events():
+    """Window events over two days, one of them crossing midnight."""
+    return [
+        {"id": 1, "timestamp": "2024-02-19T10:00:00+00:00", "duration": 600.0, "data": {"app": "Firefox"}},
+        {"id": 2, "timestamp": "2024-02-19T11:00:00+00:00", "duration": 300.0, "data": {"app": "Code"}},
+        {"id": 3, "timestamp": "2024-02-19T23:50:00+00:00", "duration": 1200.0, "data": {"app": "Code"}},
+        {"id": 4, "timestamp": "2024-02-20T09:00:00+00:00", "duration": 60.0, "data": {"app": "Slack"}},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_top_apps_over_range(httpx_mock, mock_events, mock_ctx):
+    """Test top values across day chunks without double counting midnight."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+
+    result = await top(
+        bucket_id="aw-watcher-window_hostname",
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-21T00:00:00Z",
+        k=2,
+        ctx=mock_ctx,
+    )
+
+    parsed = json.loads(result)
+    assert parsed["days"] == 2
+    assert parsed["total_duration"] == 2160.0
+    assert [(item["value"], item["duration"]) for item in parsed["top"]] == [("Code", 1500.0), ("Firefox", 600.0)]
+    assert "approximate" not in parsed
+
+
+@pytest.mark.asyncio
+async def test_settled_days_are_cached(httpx_mock, mock_events):
+    """Test that a second aggregation over past days is served from the cache."""
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+    cache = EventCache()
+    ctx = MockContext(lifespan_context={"api_base": "http://localhost:5600/api/0", "event_cache": cache})
+
+    first = await top(
+        bucket_id="aw-watcher-window_hostname", start="2024-02-19T00:00:00Z", end="2024-02-21T00:00:00Z", ctx=ctx
+    )
+    second = await top(
+        bucket_id="aw-watcher-window_hostname", start="2024-02-19T12:00:00Z", end="2024-02-20T00:00:00Z", ctx=ctx
+    )
+
+    requests = [request.url.path for request in httpx_mock.get_requests()]
+    assert requests.count("/api/0/buckets/aw-watcher-window_hostname/events") == 2
+    assert requests.count("/api/0/buckets/aw-watcher-window_hostname/events/count") == 1
+    assert json.loads(first)["top"][0]["value"] == "Code"
+    assert json.loads(second)["top"] == [{"value": "Code", "duration": 600.0, "share": 1.0}]
+
+
+def test_accumulator_prunes_with_error_bound():
+    """Test that memory stays bounded and the error bound is reported."""
+    accumulator = TopAccumulator(max_tracked=2)
+
+    accumulator.add({"a": 10.0, "b": 5.0, "c": 1.0})
+    accumulator.add({"a": 1.0, "d": 7.0})
+
+    assert len(accumulator.totals) <= 2
+    assert accumulator.top(1) == [("a", 11.0)]
+    assert accumulator.error_bound == 6.0
+
+
+@pytest.mark.asyncio
+async def test_handle_bucket_not_found(httpx_mock, mock_ctx):
+    """Test handling 404 error when bucket not found."""
+    httpx_mock.add_response(url=re.compile(r".*/buckets/missing/events.*"), status_code=404)
+
+    result = await top(bucket_id="missing", start="2024-02-19T00:00:00Z", end="2024-02-19T12:00:00Z", ctx=mock_ctx)
+
+    assert "Bucket not found: missing" in result
+
+
+@pytest.mark.asyncio
+async def test_cached_days_are_compacted(httpx_mock):
+    """Test that with a compaction gap configured, cached days hold merged runs keyed with the gap."""
+    heartbeats = [
+        {"id": i, "timestamp": f"2024-02-19T10:00:{i * 10:02d}+00:00", "duration": 10.0, "data": {"app": "Code"}}
+        for i in range(6)
+    ]
+    httpx_mock.add_callback(serve_events(heartbeats), url=EVENTS_URL, is_reusable=True)
+    cache = EventCache()
+    ctx = MockContext(
+        lifespan_context={"api_base": "http://localhost:5600/api/0", "event_cache": cache, "compact_gap": 0.0}
+    )
+
+    result = await top(
+        bucket_id="aw-watcher-window_hostname", start="2024-02-19T00:00:00Z", end="2024-02-20T00:00:00Z", ctx=ctx
+    )
+
+    ((key, chunk),) = cache.items()
+    assert key[3:] == (0,)
+    assert len(chunk) == 1
+    assert json.loads(result)["top"] == [{"value": "Code", "duration": 60.0, "share": 1.0}]
@@ -0,0 +1,115 @@
+"""Tests for watch tool."""
+
+import asyncio
+import contextlib
+import json
+import re
+
+import httpx
+import pytest
+from mcp_server_activitywatch.tools.watch import watch
+from mcp_server_activitywatch.watcher import BucketWatcher
+from tests.conftest import MockContext, serve_events
+
+API_BASE = "http://localhost:5600/api/0"
+WINDOW_BUCKET = "aw-watcher-window_hostname"
+EVENTS_URL = re.compile(rf"{API_BASE}/buckets/{WINDOW_BUCKET}/events.*")
+
+
+@pytest.fixture
+def mock_events():
+    """Window events, the latest still being extended by heartbeats."""
+    return [
+        {"id": 1, "timestamp": "2024-02-19T10:00:00+00:00", "duration": 60.0, "data": {"app": "Code"}},
+        {"id": 2, "timestamp": "2024-02-19T10:01:00+00:00", "duration": 30.0, "data": {"app": "Firefox"}},
+    ]
+
+
+@pytest.fixture
+def watching(httpx_mock, mock_events):
+    """Context with a bucket watcher polling a bucket whose last_updated can be changed."""
+    buckets = {WINDOW_BUCKET: {"type": "currentwindow", "last_updated": "2024-02-19T10:01:30"}}
+    httpx_mock.add_callback(
+        lambda request: httpx.Response(200, json=buckets), url=f"{API_BASE}/buckets", is_reusable=True
+    )
+    httpx_mock.add_callback(serve_events(mock_events), url=EVENTS_URL, is_reusable=True)
+
+    watcher = BucketWatcher(API_BASE, interval=0.05, min_interval=0.01)
+    return MockContext(lifespan_context={"api_base": API_BASE, "bucket_watcher": watcher}), buckets
+
+
+@contextlib.asynccontextmanager
+async def running(ctx: MockContext):
+    """Run the bucket watcher of ``ctx`` in the background."""
+    task = asyncio.create_task(ctx.lifespan_context["bucket_watcher"].run())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_watch_returns_new_and_extended_events(watching, mock_events):
+    """Test that a watch starts at the latest event, then waits for new and extended ones."""
+    ctx, buckets = watching
+
+    async def heartbeat():
+        await asyncio.sleep(0.1)
+        mock_events[1]["duration"] = 45.0
+        mock_events.append(
+            {"id": 3, "timestamp": "2024-02-19T10:01:45+00:00", "duration": 0.0, "data": {"app": "Slack"}}
+        )
+        buckets[WINDOW_BUCKET]["last_updated"] = "2024-02-19T10:01:45"
+
+    async with running(ctx):
+        first = json.loads(await watch(bucket_ids=[WINDOW_BUCKET], ctx=ctx))
+        idle = json.loads(
+            await watch(bucket_ids=[WINDOW_BUCKET], since_token=first["since_token"], timeout=0.2, ctx=ctx)
+        )
+        changed, _ = await asyncio.gather(
+            watch(bucket_ids=[WINDOW_BUCKET], since_token=idle["since_token"], timeout=5.0, ctx=ctx), heartbeat()
+        )
+
+    assert first["events"] == {WINDOW_BUCKET: [{**mock_events[1], "duration": 30.0}]}
+    assert first["timed_out"] is False
+    assert (idle["count"], idle["timed_out"]) == (0, True)
+    changed = json.loads(changed)
+    assert [event["id"] for event in changed["events"][WINDOW_BUCKET]] == [3, 2]
+    assert changed["updated_ids"] == {WINDOW_BUCKET: ["2"]}
+    assert changed["timed_out"] is False
+
+
+@pytest.mark.asyncio
+async def test_watchers_share_one_poller(watching, httpx_mock):
+    """Test that concurrent watch calls wait on the same bucket polls."""
+    ctx, _ = watching
+    async with running(ctx):
+        token = json.loads(await watch(bucket_ids=[WINDOW_BUCKET], ctx=ctx))["since_token"]
+        polls = len(httpx_mock.get_requests(url=f"{API_BASE}/buckets"))
+        results = await asyncio.gather(
+            *(watch(bucket_ids=[WINDOW_BUCKET], since_token=token, timeout=0.2, ctx=ctx) for _ in range(20))
+        )
+
+    assert all(json.loads(result)["timed_out"] for result in results)
+    # Polls back off to the 0.05s interval however many calls wait.
+    assert len(httpx_mock.get_requests(url=f"{API_BASE}/buckets")) - polls <= 10
+
+
+@pytest.mark.asyncio
+async def test_watch_requires_bucket_watcher(mock_ctx):
+    """Test that watching without the server's watcher is reported."""
+    result = await watch(bucket_ids=[WINDOW_BUCKET], ctx=mock_ctx)
+
+    assert result == "Failed to watch buckets: Watching requires the server's bucket watcher"
+
+
+@pytest.mark.asyncio
+async def test_watch_is_rejected_with_stateless_sessions():
+    """Test that watching is refused when several workers serve stateless sessions."""
+    ctx = MockContext(lifespan_context={"api_base": API_BASE, "bucket_watcher": object(), "stateless": True})
+
+    result = await watch(bucket_ids=[WINDOW_BUCKET], ctx=ctx)
+
+    assert result == "Failed to watch buckets: Watching is not available when the server runs several HTTP workers"
@@ -0,0 +1,146 @@
+"""Tests for the bucket watcher behind resource subscriptions."""
+
+import pytest
+from mcp import types
+from mcp_server_activitywatch.cache import EventCache
+from mcp_server_activitywatch.server import mcp
+from mcp_server_activitywatch.watcher import BucketWatcher
+
+
+class RecordingSession:
+    """Session stand-in that records resource-updated notifications."""
+
+    def __init__(self):
+        self.updated: list[str] = []
+
+    async def send_resource_updated(self, uri: str) -> None:
+        self.updated.append(uri)
+
+
+class ClosedSession:
+    """Session stand-in whose transport has gone away."""
+
+    async def send_resource_updated(self, uri: str) -> None:
+        raise ConnectionError("session closed")
+
+
+def buckets(window_updated: str, extra: dict | None = None) -> dict:
+    """Bucket metadata as returned by GET /buckets."""
+    return {
+        "aw-watcher-window_host": {"type": "currentwindow", "hostname": "host", "last_updated": window_updated},
+        "aw-watcher-afk_host": {"type": "afkstatus", "hostname": "host", "last_updated": "2024-02-19T10:00:00"},
+        **(extra or {}),
+    }
+
+
+@pytest.mark.asyncio
+async def test_notifies_only_changed_buckets(httpx_mock):
+    """Test that only subscribers of the changed bucket are notified."""
+    api_base = "http://localhost:5600/api/0"
+    httpx_mock.add_response(url=f"{api_base}/buckets", json=buckets("2024-02-19T10:00:00"))
+    httpx_mock.add_response(url=f"{api_base}/buckets", json=buckets("2024-02-19T10:05:00"))
+    watcher = BucketWatcher(api_base)
+    session = RecordingSession()
+    watcher.subscribe("activitywatch://events/aw-watcher-window_host", session)
+    watcher.subscribe("activitywatch://events/aw-watcher-afk_host", session)
+    watcher.subscribe("activitywatch://buckets", session)
+
+    assert await watcher.poll_once() == set()
+    notified = await watcher.poll_once()
+
+    assert notified == {"activitywatch://events/aw-watcher-window_host"}
+    assert session.updated == ["activitywatch://events/aw-watcher-window_host"]
+
+
+@pytest.mark.asyncio
+async def test_new_bucket_updates_listing(httpx_mock):
+    """Test that a newly created bucket notifies the bucket listings."""
+    api_base = "http://localhost:5600/api/0"
+    new_bucket = {"aw-watcher-web_host": {"type": "web.tab.current", "hostname": "host", "last_updated": None}}
+    httpx_mock.add_response(url=f"{api_base}/buckets", json=buckets("2024-02-19T10:00:00"))
+    httpx_mock.add_response(url=f"{api_base}/buckets", json=buckets("2024-02-19T10:00:00", new_bucket))
+    watcher = BucketWatcher(api_base)
+    session = RecordingSession()
+    watcher.subscribe("activitywatch://buckets", session)
+    watcher.subscribe("activitywatch://buckets/web", session)
+    watcher.subscribe("activitywatch://buckets/afk", session)
+
+    await watcher.poll_once()
+    notified = await watcher.poll_once()
+
+    assert notified == {"activitywatch://buckets", "activitywatch://buckets/web"}
+
+
+@pytest.mark.asyncio
+async def test_closed_sessions_are_dropped(httpx_mock):
+    """Test that sessions failing to receive notifications are unsubscribed."""
+    api_base = "http://localhost:5600/api/0"
+    httpx_mock.add_response(url=f"{api_base}/buckets", json=buckets("2024-02-19T10:00:00"))
+    httpx_mock.add_response(url=f"{api_base}/buckets", json=buckets("2024-02-19T10:05:00"))
+    watcher = BucketWatcher(api_base)
+    watcher.subscribe("activitywatch://events/aw-watcher-window_host", ClosedSession())
+
+    await watcher.poll_once()
+    await watcher.poll_once()
+
+    assert watcher.subscriptions == {}
+
+
+@pytest.mark.asyncio
+async def test_poll_interval_adapts(httpx_mock):
+    """Test that polls speed up after a change and back off while nothing changes."""
+    api_base = "http://localhost:5600/api/0"
+    for updated in ["2024-02-19T10:00:00", "2024-02-19T10:05:00", *["2024-02-19T10:05:00"] * 4]:
+        httpx_mock.add_response(url=f"{api_base}/buckets", json=buckets(updated))
+    watcher = BucketWatcher(api_base, interval=5.0, min_interval=1.0)
+
+    delays = []
+    for _ in range(6):
+        await watcher.poll_once()
+        delays.append(watcher.delay)
+
+    assert delays == [1.0, 1.0, 2.0, 4.0, 5.0, 5.0]
+
+
+@pytest.mark.asyncio
+async def test_wait_for_update_returns_known_change(httpx_mock):
+    """Test that a waiter behind the latest poll returns at once."""
+    api_base = "http://localhost:5600/api/0"
+    httpx_mock.add_response(url=f"{api_base}/buckets", json=buckets("2024-02-19T10:05:00"))
+    watcher = BucketWatcher(api_base)
+    await watcher.poll_once()
+
+    versions = await watcher.wait_for_update({"aw-watcher-window_host": "2024-02-19T10:00:00"}, timeout=60.0)
+
+    assert versions == {"aw-watcher-window_host": "2024-02-19T10:05:00"}
+
+
+@pytest.mark.asyncio
+async def test_unchanged_metadata_is_not_cached_again(httpx_mock):
+    """Test that polls write the bucket metadata to the cache only when it changed."""
+    api_base = "http://localhost:5600/api/0"
+    for updated in ("2024-02-19T10:00:00", "2024-02-19T10:00:00", "2024-02-19T10:05:00"):
+        httpx_mock.add_response(url=f"{api_base}/buckets", json=buckets(updated))
+    writes = []
+
+    class RecordingCache(EventCache):
+        def put(self, key, chunk, ttl=None, expires=None):
+            writes.append(chunk.value["aw-watcher-window_host"]["last_updated"])
+            super().put(key, chunk, ttl, expires)
+
+    watcher = BucketWatcher(api_base, cache=RecordingCache())
+    for _ in range(3):
+        await watcher.poll_once()
+
+    assert writes == ["2024-02-19T10:00:00", "2024-02-19T10:05:00"]
+
+
+def test_subscriptions_are_advertised():
+    """Test that the subscribe handlers are registered and the capability is advertised to clients."""
+    low_level_server = mcp._mcp_server
+
+    options = low_level_server.create_initialization_options()
+
+    assert options.capabilities.resources.subscribe is True
+    assert types.SubscribeRequest in low_level_server.request_handlers
+    assert types.UnsubscribeRequest in low_level_server.request_handlers
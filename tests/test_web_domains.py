@@ -0,0 +1,170 @@
+"""Tests for web_domains tool and URL normalization."""
+
+import json
+import re
+import sys
+
+import pytest
+from mcp_server_activitywatch.columnar import EventColumns
+from mcp_server_activitywatch.tools.web_domains import web_domains
+from mcp_server_activitywatch.web import parse_url, url_group
+from tests.conftest import serve_events
+
+WEB_URL = re.compile(r"http://localhost:5600/api/0/buckets/aw-watcher-web-firefox/events.*")
+AFK_URL = re.compile(r"http://localhost:5600/api/0/buckets/aw-watcher-afk_hostname/events.*")
+
+
+@pytest.fixture
+def mock_events():
+    """Browser events on two GitHub repositories, a docs subdomain and a UK news site."""
+    return [
+        {
+            "id": 1,
+            "timestamp": "2024-02-19T10:00:00+00:00",
+            "duration": 600.0,
+            "data": {"url": "https://github.com/owner/repo/pull/1?tab=files", "title": "PR"},
+        },
+        {
+            "id": 2,
+            "timestamp": "2024-02-19T10:10:00+00:00",
+            "duration": 300.0,
+            "data": {"url": "https://www.GitHub.com/owner/other#readme", "title": "Other"},
+        },
+        {
+            "id": 3,
+            "timestamp": "2024-02-19T10:15:00+00:00",
+            "duration": 120.0,
+            "data": {"url": "https://docs.github.com/en/actions", "title": "Docs"},
+        },
+        {
+            "id": 4,
+            "timestamp": "2024-02-19T10:17:00+00:00",
+            "duration": 60.0,
+            "data": {"url": "https://news.bbc.co.uk/sport", "title": "News"},
+        },
+        {
+            "id": 5,
+            "timestamp": "2024-02-20T09:00:00+00:00",
+            "duration": 240.0,
+            "data": {"url": "https://github.com/owner/repo", "title": "Repo"},
+        },
+    ]
+
+
+def test_parse_url_normalizes():
+    """Test that scheme, www, case, port, query and fragment do not change the parsed URL."""
+    parsed = parse_url("HTTPS://www.Example.co.uk:8443/a//b/?q=1#top")
+
+    assert parsed == parse_url("http://example.co.uk/a/b")
+    assert (parsed.host, parsed.domain, parsed.segments) == ("example.co.uk", "example.co.uk", ("a", "b"))
+    assert url_group("https://a.b.example.com/x/y/z", "path", 2) == "a.b.example.com/x/y"
+    assert url_group("https://127.0.0.1:5600/api", "domain") == "127.0.0.1"
+    assert url_group("about:blank", "domain") == "about:"
+
+
+def test_unparsable_url_is_grouped_as_invalid():
+    """Test that a URL urlsplit rejects is grouped under the fallback host instead of failing."""
+    assert url_group("http://[::1", "domain") == "invalid:"
+    assert url_group("http://[::1/a/b", "path", 2) == "invalid:/"
+
+
+def test_parse_url_is_memoized():
+    """Test that a repeated URL is parsed once."""
+    parse_url.cache_clear()
+    for _ in range(1000):
+        parse_url("https://github.com/owner/repo")
+
+    info = parse_url.cache_info()
+    assert (info.misses, info.hits) == (1, 999)
+
+
+@pytest.mark.asyncio
+async def test_web_domains_by_domain(httpx_mock, mock_events, mock_ctx):
+    """Test that time is totalled per registered domain across days."""
+    httpx_mock.add_callback(serve_events(mock_events), url=WEB_URL, is_reusable=True)
+
+    result = await web_domains(
+        bucket_id="aw-watcher-web-firefox",
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-21T00:00:00Z",
+        ctx=mock_ctx,
+    )
+
+    parsed = json.loads(result)
+    assert parsed["total_active"] == 1320.0
+    assert [(group["group"], group["active"], group["events"]) for group in parsed["groups"]] == [
+        ("github.com", 1260.0, 4),
+        ("bbc.co.uk", 60.0, 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_web_domains_by_path_with_afk(httpx_mock, mock_events, mock_ctx):
+    """Test grouping by path prefix with time reported as AFK not counted as active."""
+    afk_events = [
+        {"id": 1, "timestamp": "2024-02-19T10:00:00+00:00", "duration": 300.0, "data": {"status": "not-afk"}},
+        {"id": 2, "timestamp": "2024-02-19T10:05:00+00:00", "duration": 600.0, "data": {"status": "afk"}},
+        {"id": 3, "timestamp": "2024-02-19T10:15:00+00:00", "duration": 300.0, "data": {"status": "not-afk"}},
+    ]
+    httpx_mock.add_callback(serve_events(mock_events), url=WEB_URL, is_reusable=True)
+    httpx_mock.add_callback(serve_events(afk_events), url=AFK_URL, is_reusable=True)
+
+    result = await web_domains(
+        bucket_id="aw-watcher-web-firefox",
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-20T00:00:00Z",
+        afk_bucket_id="aw-watcher-afk_hostname",
+        group_by="path",
+        depth=2,
+        ctx=mock_ctx,
+    )
+
+    parsed = json.loads(result)
+    groups = {group["group"]: (group["active"], group["duration"]) for group in parsed["groups"]}
+    assert groups == {
+        "github.com/owner/repo": (300.0, 600.0),
+        "docs.github.com/en/actions": (120.0, 120.0),
+        "news.bbc.co.uk/sport": (60.0, 60.0),
+        "github.com/owner/other": (0.0, 300.0),
+    }
+    assert [group["group"] for group in parsed["groups"]][0] == "github.com/owner/repo"
+
+
+@pytest.mark.asyncio
+async def test_invalid_group_by(mock_ctx):
+    """Test that an unknown grouping is reported."""
+    result = await web_domains(
+        bucket_id="aw-watcher-web-firefox", start="2024-02-19T00:00:00Z", group_by="title", ctx=mock_ctx
+    )
+
+    assert "Failed to aggregate web activity: Unsupported group_by 'title'" in result
+
+
+@pytest.mark.asyncio
+async def test_afk_chunks_are_closed_on_error(monkeypatch, mock_ctx):
+    """Test that the AFK chunk stream is closed when the web bucket fails midway."""
+    closed = []
+
+    async def fake_chunks(ctx, client, bucket_id, start_us, end_us, progress=None):
+        try:
+            yield EventColumns()
+            if bucket_id == "aw-watcher-web-firefox":
+                raise ValueError("upstream went away")
+            yield EventColumns()
+        finally:
+            closed.append(bucket_id)
+
+    # The tools package re-exports the tool function under the module's name.
+    monkeypatch.setattr(sys.modules["mcp_server_activitywatch.tools.web_domains"], "iter_event_chunks", fake_chunks)
+    monkeypatch.setattr(sys.modules["mcp_server_activitywatch.sessionize"], "iter_event_chunks", fake_chunks)
+
+    result = await web_domains(
+        bucket_id="aw-watcher-web-firefox",
+        afk_bucket_id="aw-watcher-afk_hostname",
+        start="2024-02-19T00:00:00Z",
+        end="2024-02-21T00:00:00Z",
+        ctx=mock_ctx,
+    )
+
+    assert result == "Failed to aggregate web activity: upstream went away"
+    assert sorted(closed) == ["aw-watcher-afk_hostname", "aw-watcher-web-firefox"]